@@ -0,0 +1,70 @@
+"""
+bench_acceptance_online.py
+--------------------------
+Feedback-path throughput for Model 3's online updates
+(models/acceptance_online.py): events/s for the rate store alone and for a
+full ingest (store + SGD partial_fit) at several mini-batch sizes, plus the
+time from ingesting a user's declines to a score that reflects them.
+
+Usage:
+    python benchmarks/bench_acceptance_online.py [n_events]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.acceptance_online import (
+    RATE_COL, AcceptanceRateStore, OnlineAcceptanceModel, simulate_events
+)
+from models.acceptance_prediction_model import DATA_PATH, TARGET_COL
+from utils.feature_store import load_frame
+
+BATCH_SIZES = (100, 1_000, 10_000)
+
+
+def events_per_second(fn, events: pd.DataFrame, batch_size: int) -> float:
+    batches = [events.iloc[i:i + batch_size] for i in range(0, len(events), batch_size)]
+    t0 = time.perf_counter()
+    for batch in batches:
+        fn(batch)
+    return len(events) / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    n_events = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    df = load_frame(DATA_PATH)
+    events = simulate_events(df, n_events)
+
+    print(f"\n  {'batch size':>10}{'store ev/s':>14}{'ingest ev/s':>14}")
+    for batch_size in BATCH_SIZES:
+        store = AcceptanceRateStore()
+        store.seed(df["user_id"], df[RATE_COL])
+        store_rate = events_per_second(lambda b: store.update(b["user_id"], b[TARGET_COL]),
+                                       events, batch_size)
+        model = OnlineAcceptanceModel()
+        model.bootstrap(df)
+        ingest_rate = events_per_second(model.ingest, events, batch_size)
+        print(f"  {batch_size:>10,}{store_rate:>14,.0f}{ingest_rate:>14,.0f}")
+
+    # Time to reflect: a reliable accepter declines 10 times inside a 1k-event batch
+    model = OnlineAcceptanceModel()
+    model.bootstrap(df)
+    user = df.loc[df[RATE_COL].idxmax()]
+    row = df[df["user_id"] == user["user_id"]]
+    declines = pd.concat([row] * 10, ignore_index=True).assign(**{TARGET_COL: 0})
+    batch = pd.concat([events.iloc[:990], declines[events.columns]], ignore_index=True)
+    before_rate, before_score = model.store.rates([user["user_id"]])[0], model.score(row)[0]
+    t0 = time.perf_counter()
+    model.ingest(batch)
+    after_score = model.score(row)[0]
+    elapsed_ms = (time.perf_counter() - t0) * 1e3
+    after_rate = model.store.rates([user["user_id"]])[0]
+    print(f"\n  User {user['user_id']}: rate {before_rate:.2f} → {after_rate:.2f}, "
+          f"score {before_score:.3f} → {after_score:.3f}, "
+          f"reflected {elapsed_ms:.1f} ms after ingest started")
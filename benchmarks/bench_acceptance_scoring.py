@@ -0,0 +1,79 @@
+"""
+bench_acceptance_scoring.py
+---------------------------
+Latency and throughput of Model 3 inference: the fitted pipeline called on a
+one-row DataFrame (the old path) versus models.acceptance_scoring's
+PipelineScorer on NumPy input and, for tree ensembles, the compiled node
+arrays from utils.compiled_trees.
+
+Reports p50 / p99 single-request latency and rows/s on a 100k-row batch for
+every candidate in build_models(), trained on the bundled dataset.
+
+Usage:
+    python benchmarks/bench_acceptance_scoring.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.acceptance_prediction_model import DATA_PATH, FEATURE_COLS, build_models, load_and_prepare
+from utils.inference import PipelineScorer
+from utils.compiled_trees import compile_pipeline, is_compilable
+
+N_SINGLE = 300
+N_BATCH = 100_000
+
+
+def latency_ms(fn, inputs) -> tuple:
+    """p50 / p99 latency (ms) of fn over the given inputs."""
+    times = []
+    for x in inputs:
+        t0 = time.perf_counter()
+        fn(x)
+        times.append(time.perf_counter() - t0)
+    return tuple(np.percentile(times, [50, 99]) * 1e3)
+
+
+def throughput(fn, X) -> float:
+    """Rows scored per second."""
+    t0 = time.perf_counter()
+    fn(X)
+    return len(X) / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    X_train, X_test, y_train, _ = load_and_prepare(DATA_PATH)
+    rng = np.random.default_rng(0)
+    rows = X_test.sample(N_SINGLE, replace=True, random_state=0)
+    frames = [rows.iloc[[i]] for i in range(N_SINGLE)]
+    arrays = list(rows.to_numpy(dtype=float))
+    big = X_test.iloc[rng.integers(0, len(X_test), N_BATCH)]
+    big_np = big.to_numpy(dtype=float)
+
+    print(f"\n  {'model':<22}{'path':<12}{'p50 ms':>9}{'p99 ms':>9}{'rows/s (100k)':>16}")
+    for name, pipeline in build_models().items():
+        pipeline.fit(X_train, y_train)
+        scorer = PipelineScorer(pipeline, FEATURE_COLS)
+        assert np.allclose(scorer.score(big_np[:1000]),
+                           pipeline.predict_proba(big.iloc[:1000])[:, 1])
+
+        p50, p99 = latency_ms(lambda df: pipeline.predict_proba(df)[:, 1], frames)
+        rate = throughput(lambda df: pipeline.predict_proba(df)[:, 1], big)
+        print(f"  {name:<22}{'pipeline':<12}{p50:>9.3f}{p99:>9.3f}{rate:>16,.0f}")
+
+        p50, p99 = latency_ms(scorer.score_one, arrays)
+        rate = throughput(scorer.score, big_np)
+        print(f"  {'':<22}{'scorer':<12}{p50:>9.3f}{p99:>9.3f}{rate:>16,.0f}")
+
+        if is_compilable(pipeline):
+            compiled = compile_pipeline(pipeline, FEATURE_COLS)
+            assert np.allclose(compiled.score(big_np[:1000]), scorer.score(big_np[:1000]))
+            p50, p99 = latency_ms(compiled.score_one, arrays)
+            rate = throughput(compiled.score, big_np)
+            print(f"  {'':<22}{'compiled':<12}{p50:>9.3f}{p99:>9.3f}{rate:>16,.0f}")
@@ -0,0 +1,68 @@
+"""
+bench_hdbscan_assign.py
+-----------------------
+Compares the cost of onboarding users by refitting Model 1's HDBSCAN on the
+whole dataset against placing them into the persisted clusters with
+approximate_predict (models.commute_overlap_model.assign_new_users).
+
+Usage:
+    python benchmarks/bench_hdbscan_assign.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.commute_overlap_model import (
+    HAS_HDBSCAN, load_data, build_feature_matrix, fit_hdbscan,
+    save_hdbscan_model, load_hdbscan_model, assign_new_users
+)
+
+N_HOLDOUT = 200
+BENCH_PATH = os.path.join(ROOT, "outputs", "model_reports", "bench_hdbscan.joblib")
+
+
+if __name__ == "__main__":
+    if not HAS_HDBSCAN:
+        sys.exit("  hdbscan is not installed — nothing to benchmark")
+
+    df = load_data()
+    base, new = df.iloc[:-N_HOLDOUT].reset_index(drop=True), df.iloc[-N_HOLDOUT:]
+
+    # Refit path: cluster everyone again whenever users join
+    t0 = time.perf_counter()
+    X, _ = build_feature_matrix(df)
+    fit_hdbscan(X, min_cluster_size=8)
+    refit_s = time.perf_counter() - t0
+
+    ref_lat = float(base["home_lat"].mean())
+    X_base, scaler = build_feature_matrix(base, ref_lat=ref_lat)
+    save_hdbscan_model(fit_hdbscan(X_base, min_cluster_size=8), scaler, base, ref_lat, BENCH_PATH)
+    bundle = load_hdbscan_model(BENCH_PATH)
+    os.remove(BENCH_PATH)
+
+    # Assignment path: one user at a time, then the whole batch at once
+    latencies = []
+    for i in range(N_HOLDOUT):
+        t0 = time.perf_counter()
+        assign_new_users(bundle, new.iloc[i:i + 1])
+        latencies.append(time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    assigned, candidates = assign_new_users(bundle, new)
+    batch_s = time.perf_counter() - t0
+
+    lat_ms = np.array(latencies) * 1000
+    print(pd.DataFrame([
+        {"path": f"refit ({len(df):,} users)", "seconds": round(refit_s, 3)},
+        {"path": "assign 1 user (p50)",        "seconds": round(np.percentile(lat_ms, 50) / 1000, 5)},
+        {"path": "assign 1 user (p99)",        "seconds": round(np.percentile(lat_ms, 99) / 1000, 5)},
+        {"path": f"assign batch of {N_HOLDOUT}", "seconds": round(batch_s, 4)},
+    ]).to_string(index=False))
+    print(f"\n  Assigned to a cluster: {(assigned['cluster'] != -1).sum()}/{N_HOLDOUT}"
+          f" | candidate partners: {len(candidates)}")
@@ -0,0 +1,63 @@
+"""
+bench_hub_catalog.py
+--------------------
+Per-group meeting-point cost as the hub catalog grows: synthetic catalogs of
+100 → 100k hubs are written to CSV, loaded through utils.hub_catalog (cold
+build, then disk-cache hit) and used by suggest_meeting_points_batch
+(fixed candidate list).
+
+Usage:
+    python benchmarks/bench_hub_catalog.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.hub_catalog import clear_catalog_cache, load_hub_catalog
+from models.meeting_point_model import suggest_meeting_points_batch
+from bench_meeting_point_solver import random_groups
+
+CATALOG_SIZES = [100, 1_000, 10_000, 100_000]
+N_GROUPS = 5000
+
+
+def synthetic_hubs(n: int, seed: int = 0) -> pd.DataFrame:
+    """`n` random pickup points over greater Delhi."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "name": [f"Stop {i}" for i in range(n)],
+        "lat":  rng.uniform(28.40, 28.85, n),
+        "lon":  rng.uniform(76.90, 77.40, n),
+        "kind": rng.choice(["metro", "bus", "landmark"], n),
+    })
+
+
+if __name__ == "__main__":
+    groups = random_groups(N_GROUPS)
+    print(f"\n  {'hubs':>8}{'build (s)':>11}{'cache (s)':>11}{'µs/group':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in CATALOG_SIZES:
+            path = os.path.join(tmp, f"hubs_{n}.csv")
+            synthetic_hubs(n).to_csv(path, index=False)
+
+            t0 = time.perf_counter()
+            catalog = load_hub_catalog(path, cache_dir=tmp)
+            t_build = time.perf_counter() - t0
+
+            clear_catalog_cache()  # force the on-disk cache path
+            t0 = time.perf_counter()
+            catalog = load_hub_catalog(path, cache_dir=tmp)
+            t_cache = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            suggest_meeting_points_batch(groups, hubs=catalog, solver=False)
+            t_groups = time.perf_counter() - t0
+            print(f"  {n:>8}{t_build:>11.3f}{t_cache:>11.3f}{t_groups / N_GROUPS * 1e6:>10.1f}")
@@ -0,0 +1,65 @@
+"""
+bench_meeting_point_solver.py
+-----------------------------
+Compares Model 2's fixed candidate list (centroid + nearest catalog hubs,
+suggest_meeting_points_batch(solver=False)) against the iterative solvers
+(geometric median + minimax point snapped to nearby hubs, the default) on
+thousands of random groups: composite score and latency.
+
+Usage:
+    python benchmarks/bench_meeting_point_solver.py [n_groups]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.meeting_point_model import suggest_meeting_points_batch
+
+
+def random_groups(n_groups: int, seed: int = 7) -> list:
+    """Groups of 2–6 users scattered around random centers in Delhi."""
+    rng = np.random.default_rng(seed)
+    groups = []
+    for _ in range(n_groups):
+        n_users = rng.integers(2, 7)
+        center_lat = rng.uniform(28.50, 28.75)
+        center_lon = rng.uniform(77.00, 77.25)
+        spread = rng.uniform(0.005, 0.04)
+        groups.append(list(zip(center_lat + rng.normal(0, spread, n_users),
+                               center_lon + rng.normal(0, spread, n_users))))
+    return groups
+
+
+def timed(fn, *args, repeats: int = 3, **kwargs):
+    """Best-of-`repeats` wall time and the last result."""
+    best = np.inf
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+if __name__ == "__main__":
+    n_groups = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    groups = random_groups(n_groups)
+
+    t_fixed, fixed = timed(suggest_meeting_points_batch, groups, solver=False)
+    t_solver, solved = timed(suggest_meeting_points_batch, groups)
+
+    gain = solved["score"].to_numpy() - fixed["score"].to_numpy()
+    print(f"\n  Groups            : {n_groups}")
+    print(f"  {'method':<18}{'time (ms)':>12}{'µs/group':>10}{'mean score':>12}")
+    for name, t, res in (("fixed candidates", t_fixed, fixed), ("iterative solver", t_solver, solved)):
+        print(f"  {name:<18}{t * 1e3:>12.1f}{t / n_groups * 1e6:>10.1f}{res['score'].mean():>12.4f}")
+    print(f"\n  Solver better     : {(gain > 1e-9).mean():.1%} of groups")
+    print(f"  Solver worse      : {(gain < -1e-9).mean():.1%} of groups")
+    print(f"  Mean score gain   : {gain.mean():+.4f}")
+    print(f"  Pickup score (hub): {solved['pickup_score'].mean():.4f}")
+    print(f"  Winners           : {solved['name'].value_counts().head(5).to_dict()}")
@@ -0,0 +1,64 @@
+"""
+bench_notification_schedule.py
+------------------------------
+Nightly send-time prediction for Model 4: the per-user predict_optimal_time
+loop (one-row DataFrame → "HH:MM") versus predict_optimal_minutes over a NumPy
+feature matrix, followed by bucketing into a SendSchedule.
+
+Users are resampled from the bundled dataset; the Gradient Boosting pipeline
+from build_models() is scored both as a pipeline and compiled.
+
+Usage:
+    python benchmarks/bench_notification_schedule.py [n_users]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.notification_timing_model import (
+    DATA_PATH, FEATURE_COLS, build_models, load_and_prepare,
+    predict_optimal_minutes, predict_optimal_time
+)
+from models.notification_schedule import SendSchedule
+from utils.compiled_trees import compile_pipeline
+
+N_LOOP = 500
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    X_train, X_test, y_train, _ = load_and_prepare(DATA_PATH)
+    pipeline = build_models()["Gradient Boosting"].fit(X_train, y_train)
+    compiled = compile_pipeline(pipeline, FEATURE_COLS)
+
+    rng = np.random.default_rng(0)
+    X = X_test.to_numpy(dtype=float)[rng.integers(0, len(X_test), n_users)]
+    user_ids = np.arange(n_users)
+
+    records = pd.DataFrame(X[:N_LOOP], columns=FEATURE_COLS).to_dict("records")
+    _, loop_s = timed(lambda: [predict_optimal_time(pipeline, r) for r in records])
+    per_user_us = loop_s / N_LOOP * 1e6
+
+    print(f"\n  {'path':<34}{'µs/user':>10}{'total (s)':>12}")
+    print(f"  {'per-user loop (extrapolated)':<34}{per_user_us:>10.1f}{per_user_us * n_users / 1e6:>12.1f}")
+    for name, model in (("batch, pipeline", pipeline), ("batch, compiled", compiled)):
+        minutes, score_s = timed(predict_optimal_minutes, model, X)
+        print(f"  {name:<34}{score_s / n_users * 1e6:>10.2f}{score_s:>12.2f}")
+
+    schedule, build_s = timed(SendSchedule.from_predictions, user_ids, minutes)
+    print(f"  {'bucket into SendSchedule':<34}{build_s / n_users * 1e6:>10.3f}{build_s:>12.3f}")
+    print(f"\n  {n_users:,} users → {len(schedule)} send minutes, "
+          f"busiest {schedule.counts.max():,} users")
@@ -0,0 +1,92 @@
+"""
+bench_overlap_scaling.py
+------------------------
+Wall time and peak memory of Model 1's scalable clustering mode
+(sparse radius-graph DBSCAN + vectorized pair extraction) on synthetic
+Delhi commuters.
+
+DBSCAN runs on standardized features, so a fixed eps would put ever more
+neighbors in each ball as N grows. eps comes from the model's density_eps(N),
+which keeps the expected neighbor count — and hence the graph size — per
+user constant across sizes.
+
+Pair extraction is timed only with --pairs: the 5 km / 15 min pair
+thresholds are physical, so the number of valid pairs (the output itself)
+grows quadratically with user density on a fixed city area.
+
+Usage:
+    python benchmarks/bench_overlap_scaling.py [--pairs] [N ...]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.commute_overlap_model import (
+    build_feature_matrix, density_eps, run_dbscan_sparse, extract_matched_pairs
+)
+
+SIZES = [5_000, 50_000, 500_000]
+
+
+def synthetic_users(n: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic commuters drawn like data/generate_dataset.py."""
+    rng = np.random.default_rng(seed)
+    centers = rng.choice([450, 510, 570], size=n)
+    return pd.DataFrame({
+        "user_id":              [f"S{i:07d}" for i in range(n)],
+        "home_lat":             rng.uniform(28.40, 28.88, n),
+        "home_lon":             rng.uniform(76.84, 77.35, n),
+        "commute_time_minutes": np.clip(centers + rng.normal(0, 20, n), 420, 630).astype(int),
+    })
+
+
+def _cluster(df: pd.DataFrame, eps: float, memory_budget_mb: float) -> np.ndarray:
+    X, _ = build_feature_matrix(df)
+    return run_dbscan_sparse(X, eps=eps, min_samples=5, memory_budget_mb=memory_budget_mb)
+
+
+def bench(n: int, with_pairs: bool = False, memory_budget_mb: float = 2048) -> dict:
+    """Time one size untraced, then re-run under tracemalloc for peak memory."""
+    df = synthetic_users(n)
+    eps = density_eps(n)
+
+    t0 = time.perf_counter()
+    labels = _cluster(df, eps, memory_budget_mb)
+    result = {
+        "users":     n,
+        "eps":       round(eps, 4),
+        "clusters":  len(set(labels)) - (1 if -1 in labels else 0),
+        "cluster_s": round(time.perf_counter() - t0, 2),
+    }
+    if with_pairs:
+        t0 = time.perf_counter()
+        pairs = extract_matched_pairs(df, labels, time_window_min=15, max_dist_km=5.0)
+        result["pairs"] = len(pairs)
+        result["pairs_s"] = round(time.perf_counter() - t0, 2)
+        del pairs
+
+    tracemalloc.start()
+    labels = _cluster(df, eps, memory_budget_mb)
+    if with_pairs:
+        extract_matched_pairs(df, labels, time_window_min=15, max_dist_km=5.0)
+    result["peak_mem_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+    tracemalloc.stop()
+    return result
+
+
+if __name__ == "__main__":
+    with_pairs = "--pairs" in sys.argv
+    sizes = [int(a) for a in sys.argv[1:] if a != "--pairs"] or SIZES
+    rows = []
+    for n in sizes:
+        print(f"  Benchmarking {n:,} users …")
+        rows.append(bench(n, with_pairs=with_pairs))
+    print("\n" + pd.DataFrame(rows).to_string(index=False))
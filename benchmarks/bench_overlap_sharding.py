@@ -0,0 +1,67 @@
+"""
+bench_overlap_sharding.py
+-------------------------
+Core scaling of Model 1's sharded clustering + pair extraction
+(models/commute_overlap_sharding.py): wall time of run_sharded with 1, 2,
+4, … worker processes up to os.cpu_count(), against a single global
+run_dbscan_sparse + extract_matched_pairs on the same users.
+
+Halo users are clustered by every shard that sees them, so one worker does
+more work than the global run; the sharded path pays off only once enough
+cores are available. With a single core only the overhead is measured.
+
+Usage:
+    python benchmarks/bench_overlap_sharding.py [n_users]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_overlap_scaling import synthetic_users
+from models.commute_overlap_model import (
+    build_feature_matrix, density_eps, extract_matched_pairs, run_dbscan_sparse
+)
+from models.commute_overlap_sharding import run_sharded
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def global_run(df: pd.DataFrame, eps: float) -> pd.DataFrame:
+    X, _ = build_feature_matrix(df)
+    return extract_matched_pairs(df, run_dbscan_sparse(X, eps=eps, min_samples=5))
+
+
+if __name__ == "__main__":
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    df = synthetic_users(n_users)
+    eps = density_eps(n_users)
+    cores = os.cpu_count() or 1
+
+    pairs, global_s = timed(global_run, df, eps)
+    rows = [{"path": "global", "workers": 1, "seconds": round(global_s, 2),
+             "speedup_vs_1_worker": None, "pairs": len(pairs)}]
+    workers, base_s = 1, None
+    while workers <= cores:
+        result, seconds = timed(run_sharded, df, eps=eps, max_workers=workers)
+        base_s = base_s or seconds
+        rows.append({"path": f"sharded ({result['n_shards']} shards)", "workers": workers,
+                     "seconds": round(seconds, 2),
+                     "speedup_vs_1_worker": round(base_s / seconds, 2),
+                     "pairs": len(result["matched_pairs"])})
+        workers *= 2
+
+    print(f"\n  {n_users:,} users, eps={eps:.3f}, {cores} core(s)\n")
+    print(pd.DataFrame(rows).to_string(index=False))
+    if cores == 1:
+        print("\n  Single core: scaling across cores cannot be measured on this machine.")
@@ -0,0 +1,237 @@
+"""
+acceptance_online.py
+--------------------
+Streaming feedback path for Model 3: ingests accept / decline events in
+mini-batches, keeps every user's rolling acceptance rate up to date and
+updates an online logistic model — no retrain from the full CSV.
+
+  • AcceptanceRateStore  — per-user exponentially weighted acceptance rate
+                           in two float32 arrays (8 bytes per user); a batch
+                           is folded in with a few vectorized ops
+  • OnlineAcceptanceModel — StandardScaler (frozen after bootstrap) +
+                           SGDClassifier(log_loss) updated with partial_fit;
+                           `past_acceptance_rate` is read from the store, so
+                           scores reflect new feedback immediately
+
+Events are DataFrames (or dicts of arrays) with user_id, accepted and the
+pair features of FEATURE_COLS except past_acceptance_rate.
+
+Usage:
+    python models/acceptance_online.py
+"""
+
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from models.acceptance_prediction_model import DATA_PATH, FEATURE_COLS, MODELS_DIR, TARGET_COL
+from utils.feature_store import load_frame
+from utils.inference import PipelineScorer
+
+RATE_COL = "past_acceptance_rate"
+EVENT_FEATURES = [c for c in FEATURE_COLS if c != RATE_COL]
+ONLINE_MODEL_PATH = os.path.join(MODELS_DIR, "acceptance_model_online.joblib")
+
+
+class AcceptanceRateStore:
+    """
+    Per-user acceptance rate as an exponentially weighted average of events.
+
+    For each user the store keeps decayed sums of accepts and of events;
+    every new event multiplies older ones by `decay` (half-life given in
+    events), so the rate tracks recent behaviour.
+
+    Args:
+        half_life:    Events after which an observation counts half.
+        default_rate: Rate reported for users without history.
+        capacity:     Initial number of user slots (arrays grow by doubling).
+    """
+
+    def __init__(self, half_life: float = 20.0, default_rate: float = 0.5, capacity: int = 1024):
+        self.decay = 0.5 ** (1.0 / half_life)
+        self.default_rate = float(default_rate)
+        self._index = {}
+        self._accepts = np.zeros(capacity, dtype=np.float32)
+        self._weights = np.zeros(capacity, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _grow(self, n: int) -> None:
+        old = len(self._accepts)
+        if n > old:
+            size = max(n, 2 * old)
+            for name in ("_accepts", "_weights"):
+                grown = np.zeros(size, dtype=np.float32)
+                grown[:old] = getattr(self, name)
+                setattr(self, name, grown)
+
+    def indices(self, user_ids, add: bool = True) -> np.ndarray:
+        """Row of each user id (-1 for unknown ids when add=False)."""
+        uniq, inverse = np.unique(np.asarray(user_ids), return_inverse=True)
+        rows = np.empty(len(uniq), dtype=np.int64)
+        for i, uid in enumerate(uniq.tolist()):
+            row = self._index.get(uid)
+            if row is None:
+                row = -1
+                if add:
+                    row = self._index[uid] = len(self._index)
+            rows[i] = row
+        self._grow(len(self._index))
+        return rows[inverse]
+
+    def seed(self, user_ids, rates, weight: float = 10.0) -> None:
+        """Initialise users with a known rate, worth `weight` events of history."""
+        rows = self.indices(user_ids)
+        self._accepts[rows] = np.asarray(rates, dtype=np.float32) * weight
+        self._weights[rows] = weight
+
+    def update(self, user_ids, accepted) -> None:
+        """Fold a batch of events (in arrival order) into the users' rates."""
+        rows = self.indices(user_ids)
+        accepted = np.asarray(accepted, dtype=np.float64)
+        order = np.argsort(rows, kind="stable")
+        rows, accepted = rows[order], accepted[order]
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        counts = np.diff(np.r_[starts, len(rows)])
+        users = rows[starts]
+        # The j-th of a user's n events in the batch is worth decay**(n - 1 - j)
+        from_end = np.repeat(starts + counts, counts) - 1 - np.arange(len(rows))
+        weight = self.decay ** from_end
+        group = np.repeat(np.arange(len(users)), counts)
+        keep = self.decay ** counts
+        self._accepts[users] = self._accepts[users] * keep + np.bincount(group, weight * accepted)
+        self._weights[users] = self._weights[users] * keep + np.bincount(group, weight)
+
+    def rates(self, user_ids) -> np.ndarray:
+        """Current rate per user id (default_rate for users without history)."""
+        rows = self.indices(user_ids, add=False)
+        known = rows >= 0
+        out = np.full(len(rows), self.default_rate)
+        w = self._weights[rows[known]]
+        out[known] = np.where(w > 0, self._accepts[rows[known]] / np.maximum(w, 1e-12),
+                              self.default_rate)
+        return out
+
+
+class OnlineAcceptanceModel:
+    """
+    Acceptance model updated incrementally from feedback events.
+
+    Args:
+        store: Rate store (a fresh AcceptanceRateStore by default).
+        alpha: SGD L2 regularisation.
+    """
+
+    def __init__(self, store: AcceptanceRateStore = None, alpha: float = 1e-4,
+                 eta0: float = 0.01, random_state: int = 42):
+        self.store = store or AcceptanceRateStore()
+        self.scaler = StandardScaler()
+        self.clf = SGDClassifier(loss="log_loss", alpha=alpha, learning_rate="constant",
+                                 eta0=eta0, random_state=random_state)
+        self.n_events = 0
+        self._scorer = None
+
+    def features(self, events) -> np.ndarray:
+        """(n, len(FEATURE_COLS)) matrix with the store's current rates filled in."""
+        rates = self.store.rates(events["user_id"])
+        return np.column_stack([rates if col == RATE_COL else np.asarray(events[col], dtype=float)
+                                for col in FEATURE_COLS])
+
+    def bootstrap(self, df: pd.DataFrame, epochs: int = 5, seed_weight: float = 10.0) -> None:
+        """
+        Initial fit from historical data (FEATURE_COLS, user_id, accepted):
+        seeds the store from past_acceptance_rate, fits the scaler and runs
+        a few SGD epochs.
+        """
+        self.store.seed(df["user_id"], df[RATE_COL], seed_weight)
+        self.store.default_rate = float(df[RATE_COL].mean())
+        X = self.scaler.fit_transform(df[FEATURE_COLS].to_numpy(dtype=float))
+        y = df[TARGET_COL].to_numpy()
+        rng = np.random.default_rng(0)
+        for _ in range(epochs):
+            order = rng.permutation(len(X))
+            self.clf.partial_fit(X[order], y[order], classes=[0, 1])
+        self._scorer = None
+
+    def ingest(self, events) -> None:
+        """
+        Apply one mini-batch of feedback: the model learns from every event
+        with the rate its user had before the batch (a user's events within
+        one batch share that rate), then the store absorbs the batch.
+        """
+        y = np.asarray(events[TARGET_COL])
+        X = self.scaler.transform(self.features(events))
+        self.clf.partial_fit(X, y, classes=[0, 1])
+        self.store.update(events["user_id"], y)
+        self.n_events += len(y)
+        self._scorer = None
+
+    @property
+    def scorer(self) -> PipelineScorer:
+        """Fast scorer over the current weights, rebuilt after each update."""
+        if self._scorer is None:
+            pipeline = Pipeline([("scaler", self.scaler), ("clf", self.clf)])
+            self._scorer = PipelineScorer(pipeline, FEATURE_COLS)
+        return self._scorer
+
+    def score(self, events) -> np.ndarray:
+        """Acceptance probability for candidate pairs (same columns as events, minus accepted)."""
+        return self.scorer.score(self.features(events))
+
+    def save(self, path: str = ONLINE_MODEL_PATH) -> str:
+        self._scorer = None
+        joblib.dump(self, path)
+        return path
+
+
+def simulate_events(df: pd.DataFrame, n_events: int, random_state: int = 0) -> pd.DataFrame:
+    """
+    Synthetic feedback stream: users of `df` drawn with replacement, each
+    suggestion answered afresh with probability equal to the user's
+    acceptance propensity (past_acceptance_rate, as in generate_dataset.py).
+    """
+    rng = np.random.default_rng(random_state)
+    events = df.iloc[rng.integers(0, len(df), n_events)].reset_index(drop=True)
+    events[TARGET_COL] = (rng.random(n_events) < events[RATE_COL].to_numpy()).astype(int)
+    return events[["user_id", TARGET_COL] + EVENT_FEATURES]
+
+
+def run(n_events: int = 50_000, batch_size: int = 1_000) -> dict:
+    """Bootstrap on the training split, stream feedback, and compare test AUC."""
+    from sklearn.model_selection import train_test_split
+
+    print("\n" + "="*60)
+    print("  MODEL 3: Online Acceptance Updates")
+    print("="*60)
+
+    df = load_frame(DATA_PATH, ["user_id", TARGET_COL] + FEATURE_COLS)
+    train, test = train_test_split(df, test_size=0.2, random_state=42, stratify=df[TARGET_COL])
+    model = OnlineAcceptanceModel()
+    model.bootstrap(train)
+    model.store.seed(test["user_id"], test[RATE_COL])   # existing users, history only
+    auc_before = roc_auc_score(test[TARGET_COL], model.score(test))
+
+    events = simulate_events(df, n_events)
+    for start in range(0, n_events, batch_size):
+        model.ingest(events.iloc[start:start + batch_size])
+    auc_after = roc_auc_score(test[TARGET_COL], model.score(test))
+
+    path = model.save()
+    print(f"  Users in store  : {len(model.store)}")
+    print(f"  Events ingested : {model.n_events} (batches of {batch_size})")
+    print(f"  Test AUC        : {auc_before:.4f} after bootstrap → {auc_after:.4f} after stream")
+    print(f"  💾 Online model saved → {path}")
+    return {"auc_bootstrap": auc_before, "auc_streamed": auc_after, "n_events": model.n_events}
+
+
+if __name__ == "__main__":
+    run()
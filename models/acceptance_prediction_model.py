@@ -16,13 +16,14 @@ Target: accepted (0 or 1)
 
 Models trained & compared:
   - Logistic Regression
-  - Random Forest (with GridSearchCV)
+  - Random Forest (hyperparameters tuned by utils.tuning, CV results cached)
   - XGBoost (if available)
 
 Outputs:
   - model_reports/acceptance_model_comparison.csv
   - model_reports/acceptance_roc_curves.png
   - model_reports/acceptance_feature_importance.png
+  - model_reports/acceptance_model_best.joblib (+ _compiled/ for tree models)
 """
 
 import os
@@ -36,7 +37,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import joblib
 
-from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
+from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.preprocessing import StandardScaler
@@ -45,6 +46,10 @@ from sklearn.metrics import roc_curve, auc
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from utils.evaluation_metrics import classification_report_dict, print_classification_report
+from utils.feature_store import load_frame
+from utils.compiled_trees import compile_pipeline, is_compilable
+from utils.tuning import tune
+from utils.training import train_candidates
 
 try:
     import xgboost as xgb
@@ -67,19 +72,29 @@ FEATURE_COLS = [
 ]
 TARGET_COL = "accepted"
 
+RF_PARAM_GRID = {
+    "clf__n_estimators":     [100, 200],
+    "clf__max_depth":        [5, 8, None],
+    "clf__min_samples_leaf": [5, 10],
+}
+
 
 def load_and_prepare(path: str):
-    """Load CSV, select features and target, split into train/test."""
-    df = pd.read_csv(path)
-    X = df[FEATURE_COLS].copy()
-    y = df[TARGET_COL].copy()
+    """Load features and target from the feature store, split into train/test."""
+    df = load_frame(path, FEATURE_COLS + [TARGET_COL])
+    X = df[FEATURE_COLS]
+    y = df[TARGET_COL]
     return train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
 
 
-def build_models():
+def build_models(rf_params: dict = None):
     """
     Return a dict of model pipelines to train and compare.
     Each pipeline = StandardScaler + Classifier.
+
+    Args:
+        rf_params: Tuned Random Forest parameters (`clf__…` keys, as returned
+                   by tune_random_forest) applied over the defaults.
     """
     models = {
         "Logistic Regression": Pipeline([
@@ -97,6 +112,8 @@ def build_models():
                                                 max_depth=4, random_state=42))
         ]),
     }
+    if rf_params:
+        models["Random Forest"].set_params(**rf_params)
     if HAS_XGB:
         models["XGBoost"] = Pipeline([
             ("scaler", StandardScaler()),
@@ -109,41 +126,35 @@ def build_models():
     return models
 
 
-def tune_random_forest(X_train, y_train) -> RandomForestClassifier:
+def tune_random_forest(X_train, y_train, method: str = "halving") -> dict:
     """
-    Run GridSearchCV on Random Forest for hyperparameter tuning.
-    Returns best estimator (without scaler for feature importance access).
-    """
-    print("  🔧 Tuning Random Forest with GridSearchCV …")
-    param_grid = {
-        "n_estimators": [100, 200],
-        "max_depth":    [5, 8, None],
-        "min_samples_leaf": [5, 10],
-    }
-    cv = StratifiedKFold(n_splits=3, shuffle=True, random_state=42)
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X_train)
+    Tune the Random Forest pipeline over RF_PARAM_GRID (3-fold ROC AUC).
 
-    rf = RandomForestClassifier(random_state=42, n_jobs=-1)
-    gs = GridSearchCV(rf, param_grid, cv=cv, scoring="roc_auc", n_jobs=-1, verbose=0)
-    gs.fit(X_scaled, y_train)
+    CV results are cached by utils.tuning, keyed by the training data and the
+    grid, so repeated runs on unchanged data skip the search entirely.
 
-    print(f"     Best params : {gs.best_params_}")
-    print(f"     Best CV AUC : {gs.best_score_:.4f}")
-    return gs.best_estimator_, scaler
-
-
-def plot_roc_curves(results: dict, X_test, y_test):
-    """Plot ROC curves for all models."""
+    Returns:
+        utils.tuning.tune() result; `best_params` feeds build_models().
+    """
+    print(f"  🔧 Tuning Random Forest ({method} search) …")
+    base = build_models()["Random Forest"]
+    result = tune(base, RF_PARAM_GRID, X_train, y_train, method=method,
+                  cv=3, scoring="roc_auc", random_state=42)
+    source = "cached" if result["cached"] else f"{result['seconds']:.1f}s"
+    print(f"     Best params : {result['best_params']}  ({result['n_candidates']} configs, {source})")
+    print(f"     Best CV AUC : {result['best_score']:.4f}")
+    return result
+
+
+def plot_roc_curves(results: dict, y_test):
+    """Plot ROC curves for all models from their cached test-set scores."""
     fig, ax = plt.subplots(figsize=(9, 7))
     ax.plot([0, 1], [0, 1], "k--", lw=1.2, label="Random (AUC = 0.50)")
 
-    for name, (model, report) in results.items():
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(X_test)[:, 1]
-        else:
-            proba = model.decision_function(X_test)
-        fpr, tpr, _ = roc_curve(y_test, proba)
+    for name, (_, _, y_score) in results.items():
+        if y_score is None:
+            continue
+        fpr, tpr, _ = roc_curve(y_test, y_score)
         roc_auc_val = auc(fpr, tpr)
         ax.plot(fpr, tpr, lw=2, label=f"{name} (AUC = {roc_auc_val:.4f})")
 
@@ -210,32 +221,30 @@ def run() -> dict:
     print(f"  Train: {len(X_train)} | Test: {len(X_test)}")
     print(f"  Acceptance rate (train): {y_train.mean():.2%}")
 
-    # 2. Tune RF separately for feature importance extraction
-    best_rf, rf_scaler = tune_random_forest(X_train, y_train)
+    # 2. Tune RF; the tuned config is trained once, with the other models
+    tuned_rf = tune_random_forest(X_train, y_train)
 
-    # 3. Train all models
-    models = build_models()
+    # 3. Train all models concurrently; test-set predictions are computed once
+    models = build_models(rf_params=tuned_rf["best_params"])
+    print(f"\n  Training {len(models)} models …")
     results = {}
 
-    for name, pipeline in models.items():
-        print(f"\n  Training {name} …")
-        pipeline.fit(X_train, y_train)
-        y_pred = pipeline.predict(X_test)
-        y_prob = pipeline.predict_proba(X_test)[:, 1] if hasattr(pipeline, "predict_proba") else None
-        report = classification_report_dict(y_test, y_pred, y_prob)
+    for name, fit in train_candidates(models, X_train, y_train, X_test).items():
+        report = classification_report_dict(y_test, fit["y_pred"], fit["y_score"])
+        print(f"\n  {name} trained in {fit['fit_seconds']:.1f}s")
         print_classification_report(name, report)
-        results[name] = (pipeline, report)
+        results[name] = (fit["model"], report, fit["y_score"])
 
     # 4. Save comparison table
-    rows = [{"model": name, **report} for name, (_, report) in results.items()]
+    rows = [{"model": name, **report} for name, (_, report, _) in results.items()]
     report_df = pd.DataFrame(rows)
     csv_path = os.path.join(OUTPUT_DIR, "acceptance_model_comparison.csv")
     report_df.to_csv(csv_path, index=False)
     print(f"\n  💾 Report saved → {csv_path}")
 
     # 5. Plots
-    plot_roc_curves(results, X_test, y_test)
-    plot_feature_importance(best_rf, FEATURE_COLS)
+    plot_roc_curves(results, y_test)
+    plot_feature_importance(results["Random Forest"][0].named_steps["clf"], FEATURE_COLS)
     plot_comparison_bar(report_df)
 
     # 6. Save best model
@@ -244,8 +253,13 @@ def run() -> dict:
     model_path = os.path.join(MODELS_DIR, "acceptance_model_best.joblib")
     joblib.dump(best_pipeline, model_path)
     print(f"  🏆 Best model ({best_name}) saved → {model_path}")
+    if is_compilable(best_pipeline):
+        compiled_path = os.path.join(MODELS_DIR, "acceptance_model_best_compiled")
+        compile_pipeline(best_pipeline, FEATURE_COLS).save(compiled_path)
+        print(f"  ⚡ Compiled tree model saved → {compiled_path}")
 
-    return {"reports": report_df, "best_model_name": best_name}
+    return {"reports": report_df, "best_model_name": best_name,
+            "rf_params": tuned_rf["best_params"]}
 
 
 if __name__ == "__main__":
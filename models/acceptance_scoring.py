@@ -0,0 +1,64 @@
+"""
+acceptance_scoring.py
+---------------------
+Model 3 inference: scores carpool suggestions with the best pipeline saved by
+acceptance_prediction_model.run() (acceptance_model_best.joblib).
+
+The model is loaded once per process — the compiled tree artifact
+(acceptance_model_best_compiled/, see utils/compiled_trees.py) when it is up
+to date, otherwise the joblib pipeline wrapped in a PipelineScorer — so a
+request is scored from plain NumPy values without building DataFrames:
+
+    score_request({"overlap_score": 0.4, "time_diff_minutes": 6, ...})
+    score_candidates(X)   # (n_pairs, len(FEATURE_COLS)) array, FEATURE_COLS order
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from models.acceptance_prediction_model import FEATURE_COLS, MODELS_DIR
+from utils.compiled_trees import load_scorer
+
+MODEL_PATH = os.path.join(MODELS_DIR, "acceptance_model_best.joblib")
+
+
+def get_scorer(path: str = MODEL_PATH, compiled: bool = True):
+    """
+    Scorer for the saved acceptance model, loaded on first use and reloaded
+    only if the file changes. Prefers the compiled tree artifact when it is at
+    least as new as the joblib model.
+
+    Returns:
+        CompiledTreeEnsemble or PipelineScorer (both expose score / score_one).
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No trained acceptance model at {os.path.abspath(path)} — "
+                                "run models/acceptance_prediction_model.py first")
+    return load_scorer(path, FEATURE_COLS, compiled)
+
+
+def score_request(features, path: str = MODEL_PATH) -> float:
+    """
+    Acceptance probability for one suggestion.
+
+    Args:
+        features: Dict keyed by FEATURE_COLS, or a sequence in FEATURE_COLS order.
+    """
+    return get_scorer(path).score_one(features)
+
+
+def score_candidates(X, path: str = MODEL_PATH) -> np.ndarray:
+    """
+    Acceptance probabilities for a batch of candidate pairs.
+
+    Args:
+        X: (n, len(FEATURE_COLS)) array in FEATURE_COLS order, a mapping of
+           feature columns, or a DataFrame containing FEATURE_COLS.
+
+    Returns:
+        (n,) array of probabilities.
+    """
+    return get_scorer(path).score(X)
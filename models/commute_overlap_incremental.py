@@ -0,0 +1,310 @@
+"""
+commute_overlap_incremental.py
+------------------------------
+Incremental maintenance of Model 1 clusters and matched pairs.
+
+Instead of re-reading the CSV and re-clustering everyone when a few users sign
+up, leave, or change their departure time, `IncrementalOverlapClusterer`
+keeps the fitted scaler from `build_feature_matrix`, the DBSCAN labels and
+core flags, and an updatable neighbor index over the scaled features. Each update
+re-runs DBSCAN only on the clusters whose membership can change and returns
+the matched pairs that were added or removed.
+
+Usage:
+    inc = IncrementalOverlapClusterer().fit(df)
+    changes = inc.add_users(new_df)          # {"added": ..., "removed": ...}
+    changes = inc.update_users(edited_df)    # rows keyed by user_id
+    changes = inc.remove_users(["U00042"])
+"""
+
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from sklearn.cluster import DBSCAN
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from models.commute_overlap_model import (
+    build_feature_matrix, build_radius_graph, density_eps, extract_matched_pairs,
+    transform_features
+)
+
+
+class _NeighborIndex:
+    """
+    eps-neighbor index that tolerates inserts and deletes: a KD-tree over a
+    snapshot of rows, plus a small brute-force buffer of rows inserted (or
+    moved) since the snapshot. Deleted / moved snapshot rows are masked out,
+    and the tree is rebuilt once the buffer grows past `rebuild_frac` of it.
+    """
+
+    def __init__(self, eps: float, rebuild_frac: float = 0.05, min_rebuild: int = 256):
+        self.eps = eps
+        self.rebuild_frac = rebuild_frac
+        self.min_rebuild = min_rebuild
+        self._tree = None
+        self._snapshot = np.empty(0, dtype=np.int64)
+        self._buffer = set()
+        self._masked = set()
+
+    def rebuild(self, rows, X: np.ndarray):
+        self._snapshot = np.asarray(sorted(rows), dtype=np.int64)
+        self._tree = cKDTree(X[self._snapshot]) if len(self._snapshot) else None
+        self._buffer.clear()
+        self._masked.clear()
+
+    def insert(self, rows, X: np.ndarray):
+        self._buffer.update(int(r) for r in rows)
+        if len(self._buffer) > max(self.min_rebuild, self.rebuild_frac * len(self._snapshot)):
+            live = (set(self._snapshot.tolist()) - self._masked) | self._buffer
+            self.rebuild(live, X)
+
+    def remove(self, rows):
+        for r in rows:
+            r = int(r)
+            if r in self._buffer:
+                self._buffer.discard(r)
+            else:
+                self._masked.add(r)
+
+    def _tree_hits(self, points: np.ndarray) -> list:
+        if self._tree is None:
+            return [np.empty(0, dtype=np.int64)] * len(points)
+        return [self._snapshot[h] for h in
+                self._tree.query_ball_point(points, self.eps, return_sorted=False)]
+
+    def _buffer_hits(self, points: np.ndarray, X: np.ndarray) -> list:
+        buffer = np.fromiter(self._buffer, dtype=np.int64, count=len(self._buffer))
+        near = np.linalg.norm(points[:, None, :] - X[buffer][None, :, :], axis=2) <= self.eps
+        return [buffer[m] for m in near]
+
+    def _unmasked(self, rows: np.ndarray) -> np.ndarray:
+        if not self._masked:
+            return rows
+        return rows[~np.isin(rows, np.fromiter(self._masked, dtype=np.int64))]
+
+    def neighbor_lists(self, points: np.ndarray, X: np.ndarray) -> list:
+        """For each query point, the array of indexed rows within eps."""
+        points = np.atleast_2d(points)
+        hits = [self._unmasked(h) for h in self._tree_hits(points)]
+        if self._buffer:
+            hits = [np.concatenate([h, b]) for h, b in zip(hits, self._buffer_hits(points, X))]
+        return hits
+
+    def neighbors(self, points: np.ndarray, X: np.ndarray) -> np.ndarray:
+        """Rows within eps of any of `points` (feature vectors)."""
+        points = np.atleast_2d(points)
+        if len(points) == 0:
+            return np.empty(0, dtype=np.int64)
+        found = [np.unique(np.concatenate(self._tree_hits(points)))]
+        if self._buffer:
+            found += self._buffer_hits(points, X)
+        return np.unique(np.concatenate([self._unmasked(found[0])] + found[1:]))
+
+
+class IncrementalOverlapClusterer:
+    """
+    DBSCAN clustering + matched pairs that can be updated in place.
+
+    Rows are never reused: removed users keep their row with `alive = False`
+    so row positions (and hence pair orientation) stay stable. With
+    `eps=None`, fit() uses density_eps() for the number of users it sees.
+    """
+
+    def __init__(self, eps: float = None, min_samples: int = 5,
+                 time_window_min: int = 15, max_dist_km: float = 5.0):
+        self.eps = eps
+        self._auto_eps = eps is None
+        self.min_samples = min_samples
+        self.time_window_min = time_window_min
+        self.max_dist_km = max_dist_km
+
+    # ── fitting ────────────────────────────────────────────────────────────────
+    def fit(self, df: pd.DataFrame) -> "IncrementalOverlapClusterer":
+        """Full clustering of `df`; keeps everything needed for later updates."""
+        self.users = df.reset_index(drop=True).copy()
+        self.ref_lat = float(self.users["home_lat"].mean())
+        if self._auto_eps:
+            self.eps = density_eps(len(self.users))
+        self._X, self.scaler = build_feature_matrix(self.users, ref_lat=self.ref_lat)
+
+        db = DBSCAN(eps=self.eps, min_samples=self.min_samples, metric="precomputed")
+        self.labels = db.fit_predict(build_radius_graph(self._X, self.eps))
+        self._core = np.zeros(len(self.users), dtype=bool)
+        self._core[db.core_sample_indices_] = True
+        self._alive = np.ones(len(self.users), dtype=bool)
+        self._next_label = int(self.labels.max()) + 1
+
+        self._rows = {uid: r for r, uid in enumerate(self.users["user_id"])}
+        self._index = _NeighborIndex(self.eps)
+        self._index.rebuild(range(len(self.users)), self._X)
+
+        self.pairs = self._pairs_for(np.arange(len(self.users)))
+        return self
+
+    def _transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Scale new users with the scaler and reference latitude from fit()."""
+        return transform_features(df, self.scaler, self.ref_lat)
+
+    # ── public update API ──────────────────────────────────────────────────────
+    def add_users(self, df_new: pd.DataFrame) -> dict:
+        """Insert new users; returns {"added": pairs, "removed": pairs}."""
+        df_new = df_new.reset_index(drop=True)
+        dupes = set(df_new["user_id"]) & self._rows.keys()
+        if dupes:
+            raise ValueError(f"users already present: {sorted(dupes)[:5]}")
+
+        start = len(self.users)
+        rows = np.arange(start, start + len(df_new))
+        self.users = pd.concat([self.users, df_new.reindex(columns=self.users.columns)],
+                               ignore_index=True)
+        self._X = np.vstack([self._X, self._transform(df_new)])
+        self.labels = np.append(self.labels, np.full(len(rows), -1))
+        self._core = np.append(self._core, np.zeros(len(rows), dtype=bool))
+        self._alive = np.append(self._alive, np.ones(len(rows), dtype=bool))
+        self._rows.update({uid: r for uid, r in zip(df_new["user_id"], rows)})
+
+        self._index.insert(rows, self._X)
+        return self._refresh(rows, old_neighbors=np.empty(0, dtype=np.int64))
+
+    def update_users(self, df_changes: pd.DataFrame) -> dict:
+        """Apply edited columns (e.g. commute_time_minutes) for existing users."""
+        rows = self._lookup(df_changes["user_id"])
+        old_neighbors = self._index.neighbors(self._X[rows], self._X)
+
+        self._index.remove(rows)
+        for col in df_changes.columns.drop("user_id"):
+            self.users.loc[rows, col] = df_changes[col].to_numpy()
+        self._X[rows] = self._transform(self.users.loc[rows])
+        self._index.insert(rows, self._X)
+        return self._refresh(rows, old_neighbors)
+
+    def remove_users(self, user_ids) -> dict:
+        """Drop users from the index; their pairs are reported as removed."""
+        rows = self._lookup(user_ids)
+        old_neighbors = self._index.neighbors(self._X[rows], self._X)
+
+        self._index.remove(rows)
+        removed_labels = set(self.labels[rows].tolist())
+        self._alive[rows] = False
+        self._core[rows] = False
+        self.labels[rows] = -1
+        for uid in np.asarray(user_ids):
+            del self._rows[uid]
+        return self._refresh(np.empty(0, dtype=np.int64), old_neighbors, removed_labels)
+
+    def cluster_labels(self) -> pd.DataFrame:
+        """Current (user_id, cluster) assignment of all active users."""
+        alive = np.flatnonzero(self._alive)
+        return pd.DataFrame({"user_id": self.users["user_id"].to_numpy()[alive],
+                             "cluster": self.labels[alive]})
+
+    # ── internals ──────────────────────────────────────────────────────────────
+    def _lookup(self, user_ids) -> np.ndarray:
+        missing = [u for u in user_ids if u not in self._rows]
+        if missing:
+            raise KeyError(f"unknown users: {missing[:5]}")
+        return np.array([self._rows[u] for u in user_ids], dtype=np.int64)
+
+    def _cluster_members(self, labels) -> np.ndarray:
+        labels = [l for l in labels if l != -1]
+        return np.flatnonzero(np.isin(self.labels, labels) & self._alive)
+
+    def _pairs_for(self, rows: np.ndarray) -> pd.DataFrame:
+        rows = np.sort(rows[self.labels[rows] != -1])
+        return extract_matched_pairs(self.users.iloc[rows], self.labels[rows],
+                                     time_window_min=self.time_window_min,
+                                     max_dist_km=self.max_dist_km)
+
+    def _recluster(self, region: np.ndarray, old_labels: set) -> set:
+        """
+        Run DBSCAN on `region` plus its eps-shell, growing `region` (and
+        `old_labels`, in place) until no region cluster reaches a core point
+        of an outside cluster. Writes the new labels / core flags and returns
+        the set of cluster ids now used by the region.
+        """
+        while True:
+            shell = np.setdiff1d(self._index.neighbors(self._X[region], self._X), region)
+            local = np.concatenate([region, shell])
+            db = DBSCAN(eps=self.eps, min_samples=self.min_samples).fit(self._X[local])
+            local_labels = db.labels_
+            local_core = np.zeros(len(local), dtype=bool)
+            local_core[db.core_sample_indices_] = True
+
+            in_region = np.zeros(len(local), dtype=bool)
+            in_region[:len(region)] = True
+            region_clusters = np.unique(local_labels[in_region & local_core])
+
+            # Shell cores of untouched clusters reached by a region cluster → merge
+            reached = np.isin(local_labels, region_clusters) & ~in_region
+            merge = reached & self._core[local] & (self.labels[local] != -1)
+            if not merge.any():
+                break
+            extra = set(self.labels[local[merge]].tolist())
+            old_labels |= extra
+            region = np.union1d(region, self._cluster_members(extra))
+
+        # Former noise in the shell that now borders a region cluster joins it
+        relabel = in_region | (reached & (self.labels[local] == -1))
+        rows, new_local = local[relabel], local_labels[relabel]
+        self._core[region] = local_core[in_region]
+
+        new_labels = np.full(len(rows), -1)
+        used = set()
+        for k in np.unique(new_local[new_local != -1]):
+            members = new_local == k
+            votes = Counter(l for l in self.labels[rows[members]].tolist()
+                            if l != -1 and l not in used)
+            if votes:
+                label = votes.most_common(1)[0][0]
+            else:
+                label = self._next_label
+                self._next_label += 1
+            used.add(label)
+            new_labels[members] = label
+        self.labels[rows] = new_labels
+
+        # Region points left as noise may still border a core of an untouched cluster
+        outside_core = self._core & ~np.isin(np.arange(len(self._core)), region)
+        noise = rows[new_labels == -1]
+        for r, nbrs in zip(noise, self._index.neighbor_lists(self._X[noise], self._X)):
+            nbrs = nbrs[outside_core[nbrs]]
+            if len(nbrs):
+                self.labels[r] = self.labels[nbrs.min()]
+                used.add(int(self.labels[r]))
+        return used
+
+    def _refresh(self, changed: np.ndarray, old_neighbors: np.ndarray,
+                 removed_labels: set = frozenset()) -> dict:
+        """
+        Re-cluster the neighborhood of `changed` rows and diff the pairs.
+
+        Core status can only change for changed rows and their (old or new)
+        eps-neighbors, so the clusters those rows belonged to are re-run
+        together with their eps-neighborhood. If the local result connects to
+        a core point of a cluster outside that set, the cluster is pulled in
+        and the local run repeated, which keeps labels identical to a full
+        DBSCAN (up to the usual border-point tie-breaking).
+        """
+        new_neighbors = self._index.neighbors(self._X[changed], self._X) if len(changed) else changed
+        affected = np.union1d(np.union1d(changed, new_neighbors), old_neighbors)
+        affected = affected[self._alive[affected]]
+
+        old_labels = set(self.labels[affected].tolist()) | set(removed_labels)
+        region = np.union1d(affected, self._cluster_members(old_labels))
+        used = self._recluster(region, old_labels) if len(region) else set()
+
+        stale = self.pairs["cluster"].isin(old_labels | used)
+        before = self.pairs[stale]
+        after = self._pairs_for(self._cluster_members(used))
+        self.pairs = pd.concat([self.pairs[~stale], after], ignore_index=True)
+
+        merged = before.merge(after, how="outer", indicator=True)
+        side = merged.pop("_merge")
+        return {
+            "added":   merged[side == "right_only"].reset_index(drop=True),
+            "removed": merged[side == "left_only"].reset_index(drop=True),
+        }
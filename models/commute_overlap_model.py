@@ -22,11 +22,14 @@ import pandas as pd
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
-import matplotlib.cm as cm
+import matplotlib.colors
+import matplotlib.patches
+from matplotlib.collections import LineCollection
+import joblib
+import scipy.sparse as sp
 from sklearn.cluster import DBSCAN
-from sklearn.metrics import davies_bouldin_score, silhouette_score
+from sklearn.neighbors import NearestNeighbors
 from sklearn.preprocessing import StandardScaler
-from itertools import combinations
 
 # Optional: HDBSCAN
 try:
@@ -37,38 +40,77 @@ except ImportError:
 
 # project root on path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from utils.geo_utils import haversine_distance, normalize_coords_for_clustering, minutes_to_time
+from utils.geo_utils import haversine_paired, normalize_coords_for_clustering, minutes_to_time
+from utils.spatial_index import SpatialIndex
+from utils.feature_store import load_frame
+from utils.evaluation_metrics import clustering_quality, clustering_quality_async
+from utils.render_queue import RenderQueue
 
 # ── paths ──────────────────────────────────────────────────────────────────────
 DATA_PATH   = os.path.join(os.path.dirname(__file__), "..", "data", "dummy_commute_data.csv")
 OUTPUT_DIR  = os.path.join(os.path.dirname(__file__), "..", "outputs", "cluster_visuals")
+MODELS_DIR  = os.path.join(os.path.dirname(__file__), "..", "outputs", "model_reports")
+HDBSCAN_MODEL_PATH = os.path.join(MODELS_DIR, "commute_overlap_hdbscan.joblib")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+os.makedirs(MODELS_DIR, exist_ok=True)
 
+# DBSCAN eps (scaled units) tuned on a 500-user sample
+DBSCAN_REF_EPS, DBSCAN_REF_USERS = 0.4, 500
 
-def load_data(sample_n: int = 500) -> pd.DataFrame:
-    """Load dataset and optionally sample for performance."""
-    df = pd.read_csv(DATA_PATH)
+
+def load_data(sample_n: int = None) -> pd.DataFrame:
+    """Load dataset (all rows by default) and optionally sample it."""
+    df = load_frame(DATA_PATH)
     if sample_n and sample_n < len(df):
         df = df.sample(n=sample_n, random_state=42).reset_index(drop=True)
     return df
 
 
-def build_feature_matrix(df: pd.DataFrame) -> np.ndarray:
+def build_feature_matrix(df: pd.DataFrame, ref_lat: float = None) -> np.ndarray:
     """
     Construct a scaled feature matrix combining home coordinates and commute time.
     Uses StandardScaler to normalize each feature to zero mean / unit variance.
+
+    `ref_lat` fixes the longitude-to-km factor (see
+    normalize_coords_for_clustering); by default the batch mean latitude is used.
     """
     features = normalize_coords_for_clustering(
         lats=df["home_lat"].values,
         lons=df["home_lon"].values,
         times_minutes=df["commute_time_minutes"].values,
         spatial_weight=1.0,
-        temporal_weight=2.0   # give time slightly more weight
+        temporal_weight=2.0,  # give time slightly more weight
+        ref_lat=ref_lat
     )
     scaler = StandardScaler()
     return scaler.fit_transform(features), scaler
 
 
+def transform_features(df: pd.DataFrame, scaler: StandardScaler, ref_lat: float) -> np.ndarray:
+    """
+    Map users into an already-fitted feature space (same weights as
+    build_feature_matrix), e.g. to place newly onboarded users.
+    """
+    features = normalize_coords_for_clustering(
+        lats=df["home_lat"].values,
+        lons=df["home_lon"].values,
+        times_minutes=df["commute_time_minutes"].values,
+        spatial_weight=1.0,
+        temporal_weight=2.0,
+        ref_lat=ref_lat
+    )
+    return scaler.transform(features)
+
+
+def density_eps(n_users: int) -> float:
+    """
+    DBSCAN eps for `n_users` on the same city area. Features are standardized,
+    so density grows with N; eps shrinks by (DBSCAN_REF_USERS / N) ** (1/3)
+    to keep the expected neighbor count per user at the tuned level.
+    """
+    return DBSCAN_REF_EPS * (DBSCAN_REF_USERS / max(n_users, 1)) ** (1 / 3)
+
+
 def run_dbscan(X: np.ndarray, eps: float = 0.35, min_samples: int = 4):
     """
     Run DBSCAN clustering on the scaled feature matrix.
@@ -86,150 +128,568 @@ def run_dbscan(X: np.ndarray, eps: float = 0.35, min_samples: int = 4):
     return labels
 
 
-def run_hdbscan(X: np.ndarray, min_cluster_size: int = 10):
-    """Run HDBSCAN if available (better for variable-density clusters)."""
+def build_radius_graph(X: np.ndarray, eps: float, memory_budget_mb: float = 512,
+                       sample_size: int = 1000) -> sp.csr_matrix:
+    """
+    Build the sparse eps-neighborhood graph of X with a KD-tree index.
+
+    The average neighbor count is estimated from a sample so that rows are
+    queried in chunks that fit `memory_budget_mb`; a MemoryError is raised up
+    front if the full graph itself would not fit.
+
+    Returns:
+        CSR matrix of shape (N, N) holding distances to neighbors within eps.
+    """
+    nn = NearestNeighbors(radius=eps, algorithm="kd_tree").fit(X)
+
+    rng = np.random.default_rng(42)
+    probe = X[rng.choice(len(X), size=min(sample_size, len(X)), replace=False)]
+    avg_neighbors = max(1.0, float(np.mean(
+        [len(n) for n in nn.radius_neighbors(probe, return_distance=False)]
+    )))
+
+    # float64 distance + int32 column index per stored neighbor
+    bytes_per_row = avg_neighbors * 12
+    budget = memory_budget_mb * 2**20
+    if bytes_per_row * len(X) > budget:
+        raise MemoryError(
+            f"eps-graph needs ~{bytes_per_row * len(X) / 2**20:.0f} MB "
+            f"(~{avg_neighbors:.0f} neighbors/point) > budget of {memory_budget_mb} MB; "
+            f"lower eps or raise memory_budget_mb"
+        )
+    # Transient per-chunk arrays (lists of arrays + COO copy) cost ~4x the final rows
+    chunk = max(1, int(budget // (4 * bytes_per_row)))
+
+    blocks = [nn.radius_neighbors_graph(X[start:start + chunk], mode="distance")
+              for start in range(0, len(X), chunk)]
+    return sp.vstack(blocks, format="csr")
+
+
+def run_dbscan_sparse(X: np.ndarray, eps: float = 0.35, min_samples: int = 4,
+                      memory_budget_mb: float = 512):
+    """
+    Scalable DBSCAN: cluster a precomputed sparse radius-neighbors graph
+    instead of letting DBSCAN materialize neighborhoods densely.
+    Produces the same labels as run_dbscan for the same eps / min_samples.
+
+    Returns:
+        labels array (-1 = noise).
+    """
+    graph = build_radius_graph(X, eps, memory_budget_mb=memory_budget_mb)
+    db = DBSCAN(eps=eps, min_samples=min_samples, metric="precomputed")
+    return db.fit_predict(graph)
+
+
+def fit_hdbscan(X: np.ndarray, min_cluster_size: int = 10):
+    """Fit HDBSCAN and keep the prediction data needed by approximate_predict."""
     clusterer = hdbscan_lib.HDBSCAN(
         min_cluster_size=min_cluster_size,
         metric="euclidean",
         prediction_data=True
     )
-    labels = clusterer.fit_predict(X)
-    return labels
+    return clusterer.fit(X)
+
+
+def run_hdbscan(X: np.ndarray, min_cluster_size: int = 10):
+    """Run HDBSCAN if available (better for variable-density clusters)."""
+    return fit_hdbscan(X, min_cluster_size=min_cluster_size).labels_
+
+
+def save_hdbscan_model(clusterer, scaler: StandardScaler, df: pd.DataFrame,
+                       ref_lat: float, path: str = HDBSCAN_MODEL_PATH) -> dict:
+    """
+    Persist a fitted HDBSCAN clusterer together with everything needed to place
+    new users later: the feature scaler, reference latitude and the clustered
+    users (id, home, departure time, label).
+    """
+    bundle = {
+        "clusterer": clusterer,
+        "scaler":    scaler,
+        "ref_lat":   ref_lat,
+        "users":     df[["user_id", "home_lat", "home_lon", "commute_time_minutes"]]
+                     .assign(cluster=clusterer.labels_).reset_index(drop=True),
+    }
+    joblib.dump(bundle, path)
+    return bundle
+
+
+def load_hdbscan_model(path: str = HDBSCAN_MODEL_PATH) -> dict:
+    """Load a bundle written by save_hdbscan_model."""
+    return joblib.load(path)
+
+
+def assign_new_users(bundle: dict, new_users: pd.DataFrame,
+                     time_window_min: int = 15, max_dist_km: float = 5.0) -> tuple:
+    """
+    Place new users into the persisted HDBSCAN clusters without refitting
+    (hdbscan.approximate_predict) and list their candidate partners.
+
+    Returns:
+        (assigned, candidates): `assigned` has user_id, cluster and strength per
+        new user; `candidates` has user_id, partner_id, cluster, time_diff,
+        home_dist_km and overlap_prob for partners in the same cluster that
+        satisfy the time / distance limits.
+    """
+    X_new = transform_features(new_users, bundle["scaler"], bundle["ref_lat"])
+    labels, strengths = hdbscan_lib.approximate_predict(bundle["clusterer"], X_new)
+    assigned = pd.DataFrame({
+        "user_id":  new_users["user_id"].to_numpy(),
+        "cluster":  labels,
+        "strength": np.round(strengths, 4),
+    })
+
+    cols = ["user_id", "home_lat", "home_lon", "commute_time_minutes"]
+    placed = new_users.loc[labels != -1, cols].assign(cluster=labels[labels != -1])
+    joined = placed.merge(bundle["users"], on="cluster", suffixes=("", "_p"))
+    td = np.abs(joined["commute_time_minutes"].to_numpy() - joined["commute_time_minutes_p"].to_numpy())
+    dist = haversine_paired(joined["home_lat"], joined["home_lon"],
+                            joined["home_lat_p"], joined["home_lon_p"])
+    keep = (td <= time_window_min) & (dist <= max_dist_km)
+    candidates = pd.DataFrame({
+        "user_id":      joined["user_id"].to_numpy()[keep],
+        "partner_id":   joined["user_id_p"].to_numpy()[keep],
+        "cluster":      joined["cluster"].to_numpy()[keep],
+        "time_diff":    td[keep],
+        "home_dist_km": np.round(dist[keep], 3),
+        "overlap_prob": np.round(1 - td[keep] / time_window_min * 0.5
+                                 - dist[keep] / max_dist_km * 0.5, 4),
+    })
+    return assigned, candidates
 
 
 def evaluate_clustering(X: np.ndarray, labels: np.ndarray) -> dict:
     """
     Compute clustering quality metrics, ignoring noise points.
 
-    Returns dict with silhouette_score and davies_bouldin_index.
+    Silhouette is estimated on seeded stratified samples and Davies–Bouldin
+    from cluster centroids (utils.evaluation_metrics.clustering_quality), so
+    the cost stays bounded on large runs.
+
+    Returns dict with silhouette_score (+ silhouette_ci) and davies_bouldin_index.
     """
-    mask = labels != -1
-    n_clusters = len(set(labels[mask]))
-    metrics = {"n_clusters": n_clusters, "n_noise": int((labels == -1).sum())}
+    return clustering_quality(X, labels, sample_size=1000, n_repeats=5, seed=42)
 
-    if n_clusters >= 2 and mask.sum() >= n_clusters + 1:
-        try:
-            metrics["silhouette_score"]      = round(silhouette_score(X[mask], labels[mask], sample_size=1000), 4)
-            metrics["davies_bouldin_index"]  = round(davies_bouldin_score(X[mask], labels[mask]), 4)
-        except Exception as e:
-            metrics["silhouette_score"]     = None
-            metrics["davies_bouldin_index"] = None
-    return metrics
+
+def _window_pairs(keys: np.ndarray, window: float, start: int = 0, stop: int = None):
+    """
+    Enumerate index pairs (i, j), i < j, of a sorted key array whose keys differ
+    by at most `window`, for anchors i in [start, stop).
+
+    Returns two int64 arrays (i, j) into `keys`.
+    """
+    stop = len(keys) if stop is None else stop
+    anchors = np.arange(start, stop)
+    hi = np.searchsorted(keys, keys[start:stop] + window, side="right")
+    counts = hi - anchors - 1
+    total = int(counts.sum())
+    i = np.repeat(anchors, counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return i, i + 1 + offsets
+
+
+def _within_cluster_pairs(df: pd.DataFrame, labels: np.ndarray, rows: np.ndarray,
+                          time_window_min: int, max_dist_km: float, chunk_pairs: int):
+    """
+    Candidate generation + distance filter behind extract_matched_pairs.
+
+    Returns (r1, r2, dist_km): row positions of each matched pair (r1 < r2),
+    sorted by cluster, then r1, then r2.
+    """
+    times = df["commute_time_minutes"].to_numpy()[rows]
+    clusters = labels[rows]
+    order = np.lexsort((rows, times, clusters))
+    rows, times, clusters = rows[order], times[order], clusters[order]
+
+    # Offset each cluster on the time axis so windows never span two clusters
+    span = float(np.ptp(times)) + time_window_min + 1
+    cluster_rank = np.unique(clusters, return_inverse=True)[1]
+    keys = cluster_rank * span + (times - times.min())
+
+    home_lat = df["home_lat"].to_numpy(dtype=float)[rows]
+    home_lon = df["home_lon"].to_numpy(dtype=float)[rows]
+
+    # Split anchors so each chunk generates ~chunk_pairs candidates
+    counts = np.searchsorted(keys, keys + time_window_min, side="right") - np.arange(len(keys)) - 1
+    bounds = np.searchsorted(np.cumsum(counts), np.arange(chunk_pairs, counts.sum(), chunk_pairs))
+    bounds = np.unique(np.concatenate([[0], bounds, [len(keys)]]))
+
+    parts = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        i, j = _window_pairs(keys, time_window_min, start, stop)
+        dist = haversine_paired(home_lat[i], home_lon[i], home_lat[j], home_lon[j])
+        keep = dist <= max_dist_km
+        parts.append((i[keep], j[keep], dist[keep]))
+
+    i, j, dist = (np.concatenate(p) for p in zip(*parts))
+
+    # Orient each pair by original row order, then sort like a per-cluster scan
+    r1, r2 = np.minimum(rows[i], rows[j]), np.maximum(rows[i], rows[j])
+    pair_order = np.lexsort((r2, r1, clusters[i]))
+    return r1[pair_order], r2[pair_order], dist[pair_order]
 
 
 def extract_matched_pairs(df: pd.DataFrame, labels: np.ndarray,
                            time_window_min: int = 15,
-                           max_dist_km: float = 5.0) -> pd.DataFrame:
+                           max_dist_km: float = 5.0,
+                           chunk_pairs: int = 2_000_000) -> pd.DataFrame:
     """
     Within each cluster, find user pairs whose commute times differ by at most
     `time_window_min` minutes AND whose homes are within `max_dist_km`.
 
-    Returns a DataFrame of matched pairs with their overlap metrics.
+    Users are sorted by (cluster, commute_time_minutes) so a sliding time window
+    yields only the candidate pairs that can satisfy the time constraint; their
+    distances are then computed in bulk. Anchors are processed in chunks of
+    roughly `chunk_pairs` candidates to bound memory on very large clusters.
+
+    Returns a DataFrame of matched pairs with their overlap metrics, ordered by
+    cluster and by the users' original row order.
+    """
+    labels = np.asarray(labels)
+    rows = np.flatnonzero(labels != -1)
+    if len(rows) >= 2:
+        r1, r2, dist = _within_cluster_pairs(df, labels, rows, time_window_min,
+                                             max_dist_km, chunk_pairs)
+    else:
+        r1 = r2 = np.empty(0, dtype=np.int64)
+        dist = np.empty(0)
+
+    commute = df["commute_time_minutes"].to_numpy()
+    user_ids = df["user_id"].to_numpy()
+    td = np.abs(commute[r1] - commute[r2])
+
+    return pd.DataFrame({
+        "cluster":      labels[r1],
+        "user_1":       user_ids[r1],
+        "user_2":       user_ids[r2],
+        "time_diff":    td,
+        "home_dist_km": np.round(dist, 3),
+        "overlap_prob": np.round(1 - td / time_window_min * 0.5 - dist / max_dist_km * 0.5, 4),
+    })
+
+
+def match_time_buckets(df: pd.DataFrame, time_window_min: int = 15,
+                       max_home_km: float = 5.0,
+                       max_office_km: float = 5.0) -> pd.DataFrame:
     """
-    df = df.copy()
-    df["cluster"] = labels
-    pairs = []
+    Clustering-free matching engine using both commute endpoints.
 
-    for cluster_id in sorted(set(labels)):
-        if cluster_id == -1:
-            continue
-        group = df[df["cluster"] == cluster_id]
-        if len(group) < 2:
+    Users are bucketed by departure time into slots of `time_window_min`
+    minutes, so any valid pair lies in the same or adjacent slot. For each slot
+    a home-location SpatialIndex over that slot and the next is radius-joined
+    against the slot's users; candidates are then filtered on the time window
+    and on office distance. Work grows with users per slot, not total users.
+
+    Returns:
+        DataFrame with time_bucket, user_1, user_2, time_diff, home_dist_km,
+        office_dist_km and overlap_prob (equal weight on time, home and office).
+    """
+    columns = ["time_bucket", "user_1", "user_2", "time_diff",
+               "home_dist_km", "office_dist_km", "overlap_prob"]
+    times = df["commute_time_minutes"].to_numpy()
+    home_lat, home_lon = df["home_lat"].to_numpy(dtype=float), df["home_lon"].to_numpy(dtype=float)
+    office_lat, office_lon = df["office_lat"].to_numpy(dtype=float), df["office_lon"].to_numpy(dtype=float)
+
+    buckets = times // time_window_min
+    order = np.argsort(buckets, kind="stable")
+    slot_ids, slot_starts = np.unique(buckets[order], return_index=True)
+    slot_ends = np.append(slot_starts[1:], len(order))
+
+    parts = []
+    for k, b in enumerate(slot_ids):
+        anchors = order[slot_starts[k]:slot_ends[k]]
+        has_next = k + 1 < len(slot_ids) and slot_ids[k + 1] == b + 1
+        pool = order[slot_starts[k]:slot_ends[k + 1] if has_next else slot_ends[k]]
+
+        index = SpatialIndex(home_lat[pool], home_lon[pool])
+        qi, pj, home_d = index.query_radius_flat(home_lat[anchors], home_lon[anchors], max_home_km)
+        a, c = anchors[qi], pool[pj]
+
+        # Same-slot pairs appear twice (and include self-hits): keep a < c only
+        keep = (buckets[c] != b) | (a < c)
+        keep &= np.abs(times[a] - times[c]) <= time_window_min
+        a, c, home_d = a[keep], c[keep], home_d[keep]
+
+        office_d = haversine_paired(office_lat[a], office_lon[a], office_lat[c], office_lon[c])
+        keep = office_d <= max_office_km
+        parts.append((np.full(keep.sum(), b), a[keep], c[keep], home_d[keep], office_d[keep]))
+
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    slot, a, c, home_d, office_d = (np.concatenate(p) for p in zip(*parts))
+
+    r1, r2 = np.minimum(a, c), np.maximum(a, c)
+    pair_order = np.lexsort((r2, r1, slot))
+    slot, r1, r2 = slot[pair_order], r1[pair_order], r2[pair_order]
+    home_d, office_d = home_d[pair_order], office_d[pair_order]
+
+    user_ids = df["user_id"].to_numpy()
+    td = np.abs(times[r1] - times[r2])
+    overlap = 1 - (td / time_window_min + home_d / max_home_km + office_d / max_office_km) / 3
+
+    return pd.DataFrame({
+        "time_bucket":    slot,
+        "user_1":         user_ids[r1],
+        "user_2":         user_ids[r2],
+        "time_diff":      td,
+        "home_dist_km":   np.round(home_d, 3),
+        "office_dist_km": np.round(office_d, 3),
+        "overlap_prob":   np.round(overlap, 4),
+    }, columns=columns)
+
+
+def find_candidate_partners(user: dict, df: pd.DataFrame, home_index,
+                            time_window_min: int = 15,
+                            max_dist_km: float = 5.0) -> pd.DataFrame:
+    """
+    Look up carpool candidates for a single (possibly new) user with a prebuilt
+    home-location SpatialIndex, without re-running the clustering.
+
+    Args:
+        user:       Dict with home_lat, home_lon, commute_time_minutes (and
+                    optionally user_id, which is excluded from the result).
+        df:         Users the index was built from (same row order).
+        home_index: utils.spatial_index.SpatialIndex over df home coordinates.
+
+    Returns:
+        DataFrame of candidates (user_id, time_diff, home_dist_km, overlap_prob)
+        sorted by overlap_prob, best first.
+    """
+    _, pos, dist = home_index.query_radius_flat(user["home_lat"], user["home_lon"], max_dist_km)
+    td = np.abs(df["commute_time_minutes"].to_numpy()[pos] - user["commute_time_minutes"])
+    user_ids = df["user_id"].to_numpy()[pos]
+    keep = (td <= time_window_min) & (user_ids != user.get("user_id"))
+    td, dist, user_ids = td[keep], dist[keep], user_ids[keep]
+
+    overlap = 1 - td / time_window_min * 0.5 - dist / max_dist_km * 0.5
+    order = np.argsort(-overlap, kind="stable")
+    return pd.DataFrame({
+        "user_id":      user_ids[order],
+        "time_diff":    td[order],
+        "home_dist_km": np.round(dist[order], 3),
+        "overlap_prob": np.round(overlap[order], 4),
+    })
+
+
+# Above this many users the maps are drawn as aggregated rasters (one image +
+# one LineCollection) instead of per-point scatter artists
+RASTER_MIN_POINTS = 20_000
+RASTER_SHAPE = (720, 960)   # (rows, cols) of the density grid
+RASTER_MIN_SEGMENTS = 10_000
+
+
+def _map_extent(lons: np.ndarray, lats: np.ndarray, pad: float = 0.01) -> tuple:
+    """(x0, x1, y0, y1) bounding box of the points with a small margin."""
+    x0, x1 = float(lons.min()), float(lons.max())
+    y0, y1 = float(lats.min()), float(lats.max())
+    dx, dy = max(x1 - x0, 1e-6) * pad, max(y1 - y0, 1e-6) * pad
+    return x0 - dx, x1 + dx, y0 - dy, y1 + dy
+
+
+def rasterize_points(lons: np.ndarray, lats: np.ndarray, colors: np.ndarray,
+                     extent: tuple, shape: tuple = RASTER_SHAPE) -> np.ndarray:
+    """
+    Bin points onto a raster grid with per-pixel color blending.
+
+    Each pixel's RGB is the mean color of the points falling in it and its
+    alpha grows with the log of the point count, so dense areas stand out
+    without drawing one artist per point.
+
+    Args:
+        lons, lats: Point coordinates.
+        colors:     (N, 3+) RGB(A) color per point.
+        extent:     (x0, x1, y0, y1) map bounds.
+        shape:      (rows, cols) of the output image.
+
+    Returns:
+        (rows, cols, 4) RGBA image for imshow(origin="lower").
+    """
+    x0, x1, y0, y1 = extent
+    rows, cols = shape
+    col = np.clip(((lons - x0) / (x1 - x0) * cols).astype(np.int64), 0, cols - 1)
+    row = np.clip(((lats - y0) / (y1 - y0) * rows).astype(np.int64), 0, rows - 1)
+    cell = row * cols + col
+
+    counts = np.bincount(cell, minlength=rows * cols).astype(float)
+    rgba = np.zeros((rows * cols, 4))
+    for c in range(3):
+        rgba[:, c] = np.bincount(cell, weights=colors[:, c], minlength=rows * cols)
+    filled = counts > 0
+    rgba[filled, :3] /= counts[filled, None]
+    rgba[filled, 3] = 0.25 + 0.75 * np.log1p(counts[filled]) / np.log1p(counts.max())
+    return rgba.reshape(rows, cols, 4)
+
+
+def rasterize_segments(segments: np.ndarray, extent: tuple,
+                       shape: tuple = RASTER_SHAPE, chunk_samples: int = 4_000_000) -> np.ndarray:
+    """
+    Per-pixel count of line segments crossing each cell of a raster grid.
+
+    Every segment is sampled about once per pixel along its length (vectorized
+    over all segments), so cost scales with the total drawn length, not with
+    the number of matplotlib artists.
+
+    Args:
+        segments: (N, 2, 2) array of [[x0, y0], [x1, y1]] segments.
+
+    Returns:
+        (rows, cols) float array of samples per pixel for imshow(origin="lower").
+    """
+    x0, x1, y0, y1 = extent
+    rows, cols = shape
+    px = (segments[..., 0] - x0) / (x1 - x0) * cols
+    py = (segments[..., 1] - y0) / (y1 - y0) * rows
+    steps = np.maximum(np.abs(px[:, 1] - px[:, 0]), np.abs(py[:, 1] - py[:, 0]))
+    steps = np.ceil(steps).astype(np.int64) + 1
+
+    # Walk the segments in chunks of ~chunk_samples samples to bound memory
+    counts = np.zeros(rows * cols)
+    ends = np.cumsum(steps)
+    bounds = np.searchsorted(ends, np.arange(chunk_samples, ends[-1] if len(ends) else 0,
+                                             chunk_samples))
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(segments)]):
+        n = steps[lo:hi]
+        if not len(n):
             continue
+        seg = np.repeat(np.arange(lo, hi), n)
+        t = (np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)) / np.maximum(n - 1, 1).repeat(n)
+        col = np.clip((px[seg, 0] + t * (px[seg, 1] - px[seg, 0])).astype(np.int64), 0, cols - 1)
+        row = np.clip((py[seg, 0] + t * (py[seg, 1] - py[seg, 0])).astype(np.int64), 0, rows - 1)
+        counts += np.bincount(row * cols + col, minlength=rows * cols)
+    return counts.reshape(rows, cols)
 
-        for (i, r1), (i2, r2) in combinations(group.iterrows(), 2):
-            td = abs(r1["commute_time_minutes"] - r2["commute_time_minutes"])
-            if td > time_window_min:
-                continue
-            dist = haversine_distance(
-                r1["home_lat"], r1["home_lon"],
-                r2["home_lat"], r2["home_lon"]
-            )
-            if dist > max_dist_km:
-                continue
-            pairs.append({
-                "cluster":    cluster_id,
-                "user_1":     r1["user_id"],
-                "user_2":     r2["user_id"],
-                "time_diff":  td,
-                "home_dist_km": round(dist, 3),
-                "overlap_prob": round(1 - td / time_window_min * 0.5 - dist / max_dist_km * 0.5, 4)
-            })
-
-    return pd.DataFrame(pairs)
-
-
-def plot_clusters(df: pd.DataFrame, labels: np.ndarray, title: str = "Commute Clusters"):
+
+def _use_raster(n_points: int, mode: str) -> bool:
+    if mode not in ("auto", "scatter", "raster"):
+        raise ValueError(f"mode must be 'auto', 'scatter' or 'raster', got {mode!r}")
+    return mode == "raster" or (mode == "auto" and n_points >= RASTER_MIN_POINTS)
+
+
+def plot_clusters(df: pd.DataFrame, labels: np.ndarray, title: str = "Commute Clusters",
+                  path: str = None, mode: str = "auto"):
     """
     Scatter plot of users color-coded by cluster on a lat/lon map.
     Noise points (label = -1) shown in grey.
+
+    mode: "scatter" (one artist per cluster), "raster" (density image with
+    per-cluster color blending, see rasterize_points) or "auto" (raster from
+    RASTER_MIN_POINTS users).
     """
-    unique_labels = sorted(set(labels))
-    cmap = cm.get_cmap("tab20", max(len(unique_labels), 1))
+    labels = np.asarray(labels)
+    unique_labels = np.unique(labels)
+    cmap = plt.get_cmap("tab20", max(len(unique_labels), 1))
+    lons = df["home_lon"].to_numpy(dtype=float)
+    lats = df["home_lat"].to_numpy(dtype=float)
 
     fig, ax = plt.subplots(figsize=(12, 9))
-    for idx, label in enumerate(unique_labels):
-        mask = labels == label
-        color = "lightgrey" if label == -1 else cmap(idx)
-        alpha = 0.4 if label == -1 else 0.75
-        size  = 10 if label == -1 else 25
-        lbl   = "Noise" if label == -1 else f"Cluster {label}"
-        ax.scatter(
-            df["home_lon"].values[mask],
-            df["home_lat"].values[mask],
-            c=[color], alpha=alpha, s=size, label=lbl
-        )
+    if _use_raster(len(labels), mode):
+        palette = cmap(np.arange(len(unique_labels)))
+        palette[unique_labels == -1] = matplotlib.colors.to_rgba("lightgrey")
+        colors = palette[np.searchsorted(unique_labels, labels)]
+        extent = _map_extent(lons, lats)
+        ax.imshow(rasterize_points(lons, lats, colors, extent), origin="lower",
+                  extent=extent, aspect="auto", interpolation="nearest")
+        handles = [matplotlib.patches.Patch(color=palette[idx],
+                                            label="Noise" if label == -1 else f"Cluster {label}")
+                   for idx, label in enumerate(unique_labels)]
+    else:
+        for idx, label in enumerate(unique_labels):
+            mask = labels == label
+            color = "lightgrey" if label == -1 else cmap(idx)
+            alpha = 0.4 if label == -1 else 0.75
+            size  = 10 if label == -1 else 25
+            lbl   = "Noise" if label == -1 else f"Cluster {label}"
+            ax.scatter(lons[mask], lats[mask], c=[color], alpha=alpha, s=size, label=lbl)
+        handles = None
 
     ax.set_title(title, fontsize=14, fontweight="bold")
     ax.set_xlabel("Longitude")
     ax.set_ylabel("Latitude")
     if len(unique_labels) <= 15:
-        ax.legend(loc="upper right", fontsize=7, ncol=2)
+        ax.legend(handles=handles, loc="upper right", fontsize=7, ncol=2)
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, "cluster_map.png")
+    path = path or os.path.join(OUTPUT_DIR, "cluster_map.png")
     plt.savefig(path, dpi=150)
     plt.close()
     print(f"  📍 Cluster map saved → {path}")
 
 
-def plot_matched_pairs(df: pd.DataFrame, pairs: pd.DataFrame, max_pairs: int = 60):
+def plot_matched_pairs(df: pd.DataFrame, pairs: pd.DataFrame, max_pairs: int = 60,
+                       path: str = None, mode: str = "auto"):
     """
     Draw lines between matched user pairs on a lat/lon scatter plot.
+
+    All pair segments are drawn through a single LineCollection; `max_pairs`
+    (None = all) limits how many. In "raster" mode (default from
+    RASTER_MIN_POINTS users, see plot_clusters) users are drawn as a density
+    image, and so are the segments once there are RASTER_MIN_SEGMENTS of them.
     """
+    lons = df["home_lon"].to_numpy(dtype=float)
+    lats = df["home_lat"].to_numpy(dtype=float)
+
+    raster = _use_raster(len(df), mode)
+    extent = _map_extent(lons, lats)
     fig, ax = plt.subplots(figsize=(12, 9))
-    ax.scatter(df["home_lon"], df["home_lat"], c="steelblue", alpha=0.3, s=15, label="Users")
-
-    sample_pairs = pairs.head(max_pairs)
-    df_indexed = df.set_index("user_id")
-    for _, row in sample_pairs.iterrows():
-        try:
-            u1 = df_indexed.loc[row["user_1"]]
-            u2 = df_indexed.loc[row["user_2"]]
-            ax.plot(
-                [u1["home_lon"], u2["home_lon"]],
-                [u1["home_lat"], u2["home_lat"]],
-                "r-", alpha=0.35, lw=0.8
-            )
-        except KeyError:
-            continue
+    if raster:
+        colors = np.tile(matplotlib.colors.to_rgba("steelblue"), (len(df), 1))
+        ax.imshow(rasterize_points(lons, lats, colors, extent), origin="lower",
+                  extent=extent, aspect="auto", interpolation="nearest")
+    else:
+        ax.scatter(lons, lats, c="steelblue", alpha=0.3, s=15, label="Users")
+
+    sample_pairs = pairs if max_pairs is None else pairs.head(max_pairs)
+    index = pd.Index(df["user_id"])
+    i = index.get_indexer(sample_pairs["user_1"])
+    j = index.get_indexer(sample_pairs["user_2"])
+    found = (i >= 0) & (j >= 0)
+    i, j = i[found], j[found]
+    segments = np.stack([np.column_stack([lons[i], lats[i]]),
+                         np.column_stack([lons[j], lats[j]])], axis=1)
+    if raster and len(segments) >= RASTER_MIN_SEGMENTS:
+        counts = rasterize_segments(segments, extent)
+        lines = np.zeros(counts.shape + (4,))
+        lines[..., 0] = 1.0
+        lines[..., 3] = np.where(counts > 0, 0.2 + 0.7 * np.log1p(counts) / np.log1p(counts.max()), 0)
+        ax.imshow(lines, origin="lower", extent=extent, aspect="auto", interpolation="nearest")
+    else:
+        ax.add_collection(LineCollection(segments, colors="red", alpha=0.35, linewidths=0.8))
+        ax.set_xlim(extent[:2])
+        ax.set_ylim(extent[2:])
 
     ax.set_title(f"Matched Carpool Pairs (top {len(sample_pairs)})", fontsize=14, fontweight="bold")
     ax.set_xlabel("Longitude")
     ax.set_ylabel("Latitude")
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, "matched_pairs.png")
+    path = path or os.path.join(OUTPUT_DIR, "matched_pairs.png")
     plt.savefig(path, dpi=150)
     plt.close()
     print(f"  🔗 Matched pairs map saved → {path}")
 
 
-def run(use_hdbscan: bool = False, sample_n: int = 500) -> dict:
+def _queue_pair_plot(queue: RenderQueue, df: pd.DataFrame, pairs: pd.DataFrame) -> None:
+    """Submit the matched-pairs map, passing only the users it draws."""
+    queue.submit(plot_matched_pairs, os.path.join(OUTPUT_DIR, "matched_pairs.png"),
+                 df[["user_id", "home_lat", "home_lon"]], pairs[["user_1", "user_2"]].head(60))
+
+
+def run(use_hdbscan: bool = False, sample_n: int = None, matcher: str = "cluster",
+        memory_budget_mb: float = 512, render: str = "all",
+        render_queue: RenderQueue = None, eps: float = None,
+        min_samples: int = 5) -> dict:
     """
     Main pipeline for Model 1.
 
     Args:
         use_hdbscan: Use HDBSCAN instead of DBSCAN (if available).
-        sample_n:    Number of users to cluster (performance control).
+        sample_n:    Optional number of users to sample (default: all users).
+        matcher:     "cluster" (cluster, then pair within clusters) or
+                     "buckets" (time-bucketed home + office radius joins,
+                     no clustering pass; see match_time_buckets).
+        memory_budget_mb: Memory budget for the sparse DBSCAN neighbor graph.
+        render:      Render policy for the maps ("all", "top_n" or "none").
+        render_queue: Shared RenderQueue; maps are only submitted to it (the
+                     caller flushes), otherwise they are rendered before returning.
+        eps:         DBSCAN radius in scaled units (default: density_eps(len(df))).
+        min_samples: DBSCAN core-point threshold.
 
     Returns:
         dict with metrics and matched pairs DataFrame.
@@ -238,46 +698,78 @@ def run(use_hdbscan: bool = False, sample_n: int = 500) -> dict:
     print("  MODEL 1: Commute Overlap Prediction")
     print("="*60)
 
+    queue = render_queue or RenderQueue(policy=render, top_n=1)
+
     # 1. Load & prepare
     df = load_data(sample_n=sample_n)
     print(f"  Loaded {len(df)} users for clustering")
 
-    X, scaler = build_feature_matrix(df)
+    if matcher == "buckets":
+        print("  Using time-bucketed home/office matching …")
+        pairs = match_time_buckets(df, time_window_min=15, max_home_km=5.0, max_office_km=5.0)
+        print(f"  Matched pairs  : {len(pairs)}")
+        pairs.to_csv(os.path.join(OUTPUT_DIR, "matched_pairs.csv"), index=False)
+        if not pairs.empty:
+            _queue_pair_plot(queue, df, pairs)
+        if render_queue is None:
+            queue.flush()
+        matched_users = np.union1d(pairs["user_1"], pairs["user_2"])
+        return {
+            "n_clusters":    0,
+            "n_noise":       int(len(df) - len(matched_users)),
+            "n_time_buckets": int(pairs["time_bucket"].nunique()),
+            "matched_pairs": pairs,
+        }
+
+    ref_lat = float(df["home_lat"].mean())
+    X, scaler = build_feature_matrix(df, ref_lat=ref_lat)
 
     # 2. Cluster
     if use_hdbscan and HAS_HDBSCAN:
         print("  Using HDBSCAN clustering …")
-        labels = run_hdbscan(X, min_cluster_size=8)
+        clusterer = fit_hdbscan(X, min_cluster_size=8)
+        labels = clusterer.labels_
+        save_hdbscan_model(clusterer, scaler, df, ref_lat)
+        print(f"  💾 HDBSCAN model saved → {HDBSCAN_MODEL_PATH}")
     else:
-        print("  Using DBSCAN clustering  …")
-        labels = run_dbscan(X, eps=0.4, min_samples=5)
+        eps = eps or density_eps(len(df))
+        print(f"  Using DBSCAN clustering (sparse radius graph, eps={eps:.3f}) …")
+        labels = run_dbscan_sparse(X, eps=eps, min_samples=min_samples,
+                                   memory_budget_mb=memory_budget_mb)
 
-    # 3. Evaluate
-    metrics = evaluate_clustering(X, labels)
+    # 3. Evaluate (in the background while pairs are extracted)
+    pending_metrics = clustering_quality_async(X, labels, sample_size=1000, n_repeats=5, seed=42)
+
+    # 4. Extract matches
+    pairs = extract_matched_pairs(df, labels, time_window_min=15, max_dist_km=5.0)
+
+    metrics = pending_metrics.result()
     print(f"  Clusters found : {metrics['n_clusters']}")
     print(f"  Noise points   : {metrics['n_noise']}")
     if metrics.get("silhouette_score") is not None:
-        print(f"  Silhouette     : {metrics['silhouette_score']}")
+        print(f"  Silhouette     : {metrics['silhouette_score']} "
+              f"(95% CI {metrics['silhouette_ci'][0]}–{metrics['silhouette_ci'][1]})")
         print(f"  Davies–Bouldin : {metrics['davies_bouldin_index']}")
-
-    # 4. Extract matches
-    pairs = extract_matched_pairs(df, labels, time_window_min=15, max_dist_km=5.0)
     print(f"  Matched pairs  : {len(pairs)}")
 
     # 5. Save pairs CSV
     pairs_path = os.path.join(OUTPUT_DIR, "matched_pairs.csv")
     pairs.to_csv(pairs_path, index=False)
 
-    # 6. Visualize
-    plot_clusters(df, labels, title="CommuteSync — User Clusters (Delhi)")
+    # 6. Visualize (deferred; rendered in parallel, skipped if unchanged)
+    queue.submit(plot_clusters, os.path.join(OUTPUT_DIR, "cluster_map.png"),
+                 df[["home_lat", "home_lon"]], labels,
+                 title="CommuteSync — User Clusters (Delhi)", priority=1.0)
     if not pairs.empty:
-        plot_matched_pairs(df, pairs)
+        _queue_pair_plot(queue, df, pairs)
+    if render_queue is None:
+        queue.flush()
 
     metrics["matched_pairs"] = pairs
     return metrics
 
 
 if __name__ == "__main__":
-    result = run(use_hdbscan=HAS_HDBSCAN, sample_n=500)
+    result = run(use_hdbscan=HAS_HDBSCAN)
     print("\n  Top 5 matched pairs:")
     print(result["matched_pairs"].head(5).to_string(index=False))
@@ -0,0 +1,245 @@
+"""
+commute_overlap_sharding.py
+---------------------------
+Sharded, process-parallel version of Model 1 clustering + pair extraction.
+
+Users are partitioned into geographic tiles (on home location) × departure-time
+windows. Each shard also receives a halo of users near its boundary, wide
+enough to cover both the pair thresholds and twice DBSCAN's eps in feature
+space: every user within eps of an owned user then sees its complete
+eps-neighborhood, so the shard decides core points exactly as a global run.
+Shards are clustered independently in a process pool, then merged:
+
+  • every user takes its cluster label (and core flag) from the shard that
+    owns it;
+  • a shard-local cluster is unified with the owner's cluster of each true
+    core point it contains — core points within eps are always in one
+    cluster, so this reproduces DBSCAN's eps-chain connectivity;
+  • pairs are extracted per shard on the merged labels and kept only from
+    the shard owning their first user (de-duplication).
+
+Features are scaled once on the full dataset, so every shard clusters in the
+same space as a single global run would. A border point reachable from
+several clusters joins the one whose lowest-indexed core point comes first,
+which is the order in which sklearn's DBSCAN expands clusters.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import DBSCAN
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from models.commute_overlap_model import (
+    load_data, build_feature_matrix, build_radius_graph, density_eps, extract_matched_pairs
+)
+
+PAIR_COLUMNS = ["user_id", "home_lat", "home_lon", "commute_time_minutes"]
+
+
+def plan_shards(df: pd.DataFrame, tile_km: float = 20.0, window_min: int = 60,
+                halo_km: float = 5.0, halo_min: int = 15) -> tuple:
+    """
+    Assign users to shards.
+
+    Args:
+        tile_km:    Side of each square geographic tile (home location).
+        window_min: Length of each departure-time window.
+        halo_km:    Spatial halo added around each tile (>= pair max distance).
+        halo_min:   Temporal halo added around each window (>= pair time window).
+
+    Returns:
+        (owner, shards): owner[i] is the shard id owning row i, and
+        shards[s] is the sorted array of rows (owned + halo) shard s processes.
+    """
+    if halo_km > tile_km or halo_min > window_min:
+        raise ValueError("halo must not exceed the tile / window size")
+
+    lat = df["home_lat"].to_numpy(dtype=float)
+    lon = df["home_lon"].to_numpy(dtype=float)
+    coords = np.column_stack([
+        (lat - lat.min()) * 111.0,
+        (lon - lon.min()) * 111.0 * np.cos(np.radians(lat.mean())),
+        df["commute_time_minutes"].to_numpy(dtype=float),
+    ])
+    coords[:, 2] -= coords[:, 2].min()
+    size = np.array([tile_km, tile_km, window_min], dtype=float)
+    # 1% slack covers the flat-earth projection error against haversine distances
+    halo = np.array([halo_km, halo_km, halo_min], dtype=float) * 1.01
+
+    cell = np.floor(coords / size).astype(np.int64)
+    offset_in_cell = coords - cell * size
+    near_low = offset_in_cell < halo
+    near_high = size - offset_in_cell <= halo
+
+    dims = cell.max(axis=0) + 1
+    owner_key = np.ravel_multi_index(cell.T, dims)
+    rows, keys = [np.arange(len(df))], [owner_key]
+    for delta in np.stack(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1]), -1).reshape(-1, 3):
+        if not delta.any():
+            continue
+        ok = np.ones(len(df), dtype=bool)
+        for d in range(3):
+            if delta[d] == -1:
+                ok &= near_low[:, d] & (cell[:, d] > 0)
+            elif delta[d] == 1:
+                ok &= near_high[:, d] & (cell[:, d] < dims[d] - 1)
+        rows.append(np.flatnonzero(ok))
+        keys.append(np.ravel_multi_index((cell[ok] + delta).T, dims))
+
+    rows, keys = np.concatenate(rows), np.concatenate(keys)
+    # Shards without any owned user have nothing to report
+    shard_keys, owner = np.unique(owner_key, return_inverse=True)
+    keep = np.isin(keys, shard_keys)
+    rows, shard_of = rows[keep], np.searchsorted(shard_keys, keys[keep])
+
+    order = np.lexsort((rows, shard_of))
+    rows, shard_of = rows[order], shard_of[order]
+    splits = np.searchsorted(shard_of, np.arange(1, len(shard_keys)))
+    return owner, np.split(rows, splits)
+
+
+def _cluster_shard(args) -> tuple:
+    """
+    Worker: DBSCAN one shard (as run_dbscan_sparse).
+
+    Returns:
+        (labels, core mask, border, neighbor): local positions of each
+        (border point, core point within eps) edge.
+    """
+    X, eps, min_samples = args
+    graph = build_radius_graph(X, eps)
+    db = DBSCAN(eps=eps, min_samples=min_samples, metric="precomputed")
+    labels = db.fit_predict(graph)
+    core = np.zeros(len(X), dtype=bool)
+    core[db.core_sample_indices_] = True
+    border = np.flatnonzero(~core & (labels != -1))
+    edges = graph[border].tocoo()
+    keep = core[edges.col]
+    return labels, core, border[edges.row[keep]], edges.col[keep]
+
+
+def _pair_shard(args) -> pd.DataFrame:
+    """Worker: matched pairs of one shard under the merged labels."""
+    users, labels, time_window_min, max_dist_km = args
+    return extract_matched_pairs(users, labels, time_window_min=time_window_min,
+                                 max_dist_km=max_dist_km)
+
+
+def _map(fn, jobs: list, max_workers: int) -> list:
+    if max_workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            chunksize = max(1, len(jobs) // (4 * max_workers))
+            return list(pool.map(fn, jobs, chunksize=chunksize))
+    return [fn(job) for job in jobs]
+
+
+def halo_for(scaler, eps: float, time_window_min: int, max_dist_km: float) -> tuple:
+    """
+    (halo_km, halo_min) covering the pair thresholds and 2 × eps in the
+    scaled feature space of build_feature_matrix (time weight 2 km/h).
+    """
+    km = 2 * eps * max(scaler.scale_[0], scaler.scale_[1])
+    minutes = 2 * eps * scaler.scale_[2] * 60.0 / 2.0
+    return max(max_dist_km, km), max(time_window_min, minutes)
+
+
+def run_sharded(df: pd.DataFrame, eps: float = None, min_samples: int = 5,
+                time_window_min: int = 15, max_dist_km: float = 5.0,
+                tile_km: float = 20.0, window_min: int = 60,
+                max_workers: int = None) -> dict:
+    """
+    Cluster and pair `df` shard by shard in a process pool, then merge.
+
+    eps defaults to density_eps(len(df)). Tiles / windows smaller than the
+    halo (see halo_for) are widened to it.
+
+    Returns:
+        dict with labels (aligned with df rows), matched_pairs, n_shards and
+        n_clusters.
+    """
+    df = df.reset_index(drop=True)
+    if df["user_id"].duplicated().any():
+        raise ValueError("user_id must be unique to merge shard results")
+    eps = eps or density_eps(len(df))
+    X, scaler = build_feature_matrix(df)
+    halo_km, halo_min = halo_for(scaler, eps, time_window_min, max_dist_km)
+    owner, shards = plan_shards(df, tile_km=max(tile_km, halo_km),
+                                window_min=max(window_min, halo_min),
+                                halo_km=halo_km, halo_min=halo_min)
+    max_workers = max_workers or os.cpu_count() or 1
+    results = _map(_cluster_shard, [(X[rows], eps, min_samples) for rows in shards], max_workers)
+
+    # Give every shard's clusters a disjoint id range; owners decide label and core flag
+    offsets = np.cumsum([0] + [int(r[0].max()) + 1 for r in results])
+    labels = np.full(len(df), -1)
+    is_core = np.zeros(len(df), dtype=bool)
+    rows_all, shard_labels, border, neighbor = [], [], [], []
+    for s, (rows, (local, core, b, n)) in enumerate(zip(shards, results)):
+        global_local = np.where(local == -1, -1, local + offsets[s])
+        owned = owner[rows] == s
+        labels[rows[owned]] = global_local[owned]
+        is_core[rows[owned]] = core[owned]
+        rows_all.append(rows)
+        shard_labels.append(global_local)
+        owned_border = owner[rows[b]] == s
+        border.append(rows[b[owned_border]])
+        neighbor.append(rows[n[owned_border]])
+
+    # A local cluster holding a true core point is part of that point's cluster
+    rows_all, shard_labels = np.concatenate(rows_all), np.concatenate(shard_labels)
+    link = (shard_labels != -1) & is_core[rows_all]
+    n_ids = max(int(offsets[-1]), 1)
+    graph = coo_matrix((np.ones(link.sum()), (shard_labels[link], labels[rows_all[link]])),
+                       shape=(n_ids, n_ids))
+    _, merged = connected_components(graph, directed=False)
+    _, merged = np.unique(merged, return_inverse=True)
+    labels = np.where(labels == -1, -1, merged[labels])
+
+    # Border points join the reachable cluster with the lowest-indexed core point
+    border, neighbor = np.concatenate(border), np.concatenate(neighbor)
+    if len(border):
+        first_core = np.full(labels.max() + 1, len(df))
+        core_rows = np.flatnonzero(is_core)
+        np.minimum.at(first_core, labels[core_rows], core_rows)
+        order = np.lexsort((first_core[labels[neighbor]], border))
+        border, neighbor = border[order], neighbor[order]
+        first = np.r_[True, border[1:] != border[:-1]]
+        labels[border[first]] = labels[neighbor[first]]
+
+    # Pairs under the merged labels, each kept only from the shard owning its first user
+    users = df[PAIR_COLUMNS]
+    results = _map(_pair_shard, [(users.iloc[rows], labels[rows], time_window_min, max_dist_km)
+                                 for rows in shards], max_workers)
+    row_of = pd.Index(df["user_id"])
+    pair_parts = []
+    for s, pairs in enumerate(results):
+        if pairs.empty:
+            continue
+        first = row_of.get_indexer(pairs["user_1"])
+        pair_parts.append(pairs[owner[first] == s])
+    pairs = (pd.concat(pair_parts, ignore_index=True) if pair_parts
+             else extract_matched_pairs(users.iloc[:0], np.empty(0, dtype=int)))
+
+    return {
+        "labels":        labels,
+        "matched_pairs": pairs.sort_values(["cluster", "user_1", "user_2"], ignore_index=True),
+        "n_shards":      len(shards),
+        "n_clusters":    len(set(labels.tolist()) - {-1}),
+    }
+
+
+if __name__ == "__main__":
+    df = load_data()
+    t0 = time.time()
+    result = run_sharded(df)
+    print(f"  Shards         : {result['n_shards']}")
+    print(f"  Clusters found : {result['n_clusters']}")
+    print(f"  Matched pairs  : {len(result['matched_pairs'])}")
+    print(f"  Done in {time.time() - t0:.1f}s")
@@ -4,11 +4,13 @@ meeting_point_model.py
 Model 2: Optimal Meeting Point Suggestion
 -----------------------------------------
 Given a group of matched users, this model:
-  1. Computes the geographic centroid as an initial meeting candidate.
-  2. Tries to find a nearby transit hub via OpenStreetMap (osmnx) — falls back
-     to the pure centroid if osmnx is unavailable.
+  1. Computes the geographic centroid, the geometric median (min total
+     distance) and the minimax point (min worst-case distance) as candidates.
+  2. Looks up the nearest transit hubs in an indexed hub catalog
+     (data/transit_hubs.csv by default, see utils/hub_catalog.py).
   3. Scores candidate points by proximity, fairness (max distance), and
-     accessibility heuristic.
+     accessibility heuristic — by straight-line distance, or optionally by
+     road travel time from a local road graph (see utils/road_network.py).
   4. Visualizes matched users + meeting point on an interactive folium map,
      or a static matplotlib map if folium is unavailable.
 """
@@ -16,14 +18,24 @@ Given a group of matched users, this model:
 import os
 import sys
 import json
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+from scipy.sparse import coo_matrix
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from utils.geo_utils import geographic_centroid, weighted_midpoint, haversine_distance
+from utils.geo_utils import (
+    geographic_centroid, haversine_one_to_many, haversine_many_to_many, haversine_paired,
+    spherical_geometric_median, spherical_minimax_point
+)
+from utils.spatial_index import SpatialIndex
+from utils.hub_catalog import HubCatalog, HUB_CATALOG_PATH, load_hub_catalog
+from utils.road_network import DEFAULT_SPEED_KPH, HubTravelTimes, load_hub_travel_times
+from utils.render_queue import RenderQueue
 
 # Optional imports
 try:
@@ -32,16 +44,10 @@ try:
 except ImportError:
     HAS_FOLIUM = False
 
-try:
-    import osmnx as ox
-    HAS_OSMNX = True
-except ImportError:
-    HAS_OSMNX = False
-
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "outputs", "meeting_point_maps")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# ── Known Delhi transit landmarks (fallback when osmnx/API unavailable) ────────
+# ── Known Delhi transit landmarks (fallback when no hub catalog file exists) ──
 DELHI_TRANSIT_HUBS = [
     {"name": "Connaught Place",        "lat": 28.6315, "lon": 77.2167},
     {"name": "Kashmere Gate Metro",    "lat": 28.6671, "lon": 77.2280},
@@ -58,6 +64,46 @@ DELHI_TRANSIT_HUBS = [
 ]
 
 
+# Hubs scored per group: only the k nearest to the group are considered, so
+# the per-group cost does not grow with the catalog
+HUB_CANDIDATES_K = 8
+
+# Columns of suggest_meeting_points_batch output
+BATCH_COLUMNS = ["group", "name", "lat", "lon", "avg_dist_km", "max_dist_km", "fairness",
+                 "score", "pickup_name", "pickup_lat", "pickup_lon", "pickup_score"]
+
+
+def get_hub_catalog(path: str = HUB_CATALOG_PATH) -> HubCatalog:
+    """
+    Pickup-location catalog from `path` (CSV / Parquet / GeoJSON), with its
+    spatial index cached on disk; falls back to DELHI_TRANSIT_HUBS if the
+    file does not exist.
+    """
+    if os.path.exists(path):
+        return load_hub_catalog(path)
+    return _fallback_catalog()
+
+
+_FALLBACK_CATALOG = None
+
+
+def _fallback_catalog() -> HubCatalog:
+    global _FALLBACK_CATALOG
+    if _FALLBACK_CATALOG is None:
+        _FALLBACK_CATALOG = HubCatalog.from_records(DELHI_TRANSIT_HUBS)
+    return _FALLBACK_CATALOG
+
+
+def get_hub_index() -> SpatialIndex:
+    """Spatial index over the hub catalog."""
+    return get_hub_catalog().index
+
+
+def nearest_transit_hubs(lat: float, lon: float, k: int = 5) -> list:
+    """Return the `k` transit hubs closest to (lat, lon), nearest first."""
+    return get_hub_catalog().nearest(lat, lon, k=k)
+
+
 def score_meeting_point(candidate_lat: float, candidate_lon: float,
                         user_coords: list, name: str = "Centroid") -> dict:
     """
@@ -70,10 +116,8 @@ def score_meeting_point(candidate_lat: float, candidate_lon: float,
 
     Returns a dict with all metrics + composite score.
     """
-    dists = [
-        haversine_distance(candidate_lat, candidate_lon, lat, lon)
-        for lat, lon in user_coords
-    ]
+    coords = np.asarray(user_coords, dtype=float)
+    dists = haversine_one_to_many(candidate_lat, candidate_lon, coords[:, 0], coords[:, 1])
     avg_d = np.mean(dists)
     max_d = np.max(dists)
     std_d = np.std(dists)
@@ -90,11 +134,180 @@ def score_meeting_point(candidate_lat: float, candidate_lon: float,
         "max_dist_km":  round(max_d, 3),
         "fairness":     round(fairness, 4),
         "score":        round(score, 6),
-        "distances_km": [round(d, 3) for d in dists],
+        "distances_km": [round(float(d), 3) for d in dists],
     }
 
 
-def suggest_meeting_point(user_coords: list, user_ids: list = None) -> dict:
+# Score weights per km of average / maximum distance (see score_meeting_point),
+# and the same weights per minute of travel at DEFAULT_SPEED_KPH
+DIST_WEIGHTS = (0.5, 0.3)
+TIME_WEIGHTS = tuple(w * DEFAULT_SPEED_KPH / 60.0 for w in DIST_WEIGHTS)
+
+
+def score_distance_matrix(dists: np.ndarray, mask: np.ndarray = None,
+                          weights: tuple = DIST_WEIGHTS, unit: str = "dist_km") -> dict:
+    """
+    Vectorized version of score_meeting_point over a distance matrix.
+
+    Args:
+        dists:   Costs of shape (..., n_candidates, n_users), e.g. (C, U) for
+                 one group or (G, C, U) for many padded groups — km by default.
+        mask:    Optional bool array (..., n_users); False marks padding users.
+        weights: (average, maximum) cost weights, per unit of `dists`;
+                 TIME_WEIGHTS for travel times in minutes.
+        unit:    Suffix of the returned cost keys, e.g. "time_min".
+
+    Returns:
+        Dict of arrays shaped (..., n_candidates): avg_<unit>, max_<unit>,
+        std_<unit>, fairness and score (same formula as score_meeting_point
+        with the default weights).
+    """
+    if mask is None:
+        mask = np.ones(dists.shape[:-2] + dists.shape[-1:], dtype=bool)
+    valid = mask[..., None, :]
+    n = valid.sum(axis=-1)
+
+    avg_d = np.where(valid, dists, 0.0).sum(axis=-1) / n
+    max_d = np.where(valid, dists, -np.inf).max(axis=-1)
+    std_d = np.sqrt(np.where(valid, (dists - avg_d[..., None]) ** 2, 0.0).sum(axis=-1) / n)
+    fairness = 1.0 - np.divide(std_d, avg_d, out=np.zeros_like(std_d), where=avg_d > 0)
+
+    w_avg, w_max = weights
+    score = 1.0 / (1.0 + avg_d * w_avg + max_d * w_max) * (0.7 + 0.3 * fairness)
+    return {f"avg_{unit}": avg_d, f"max_{unit}": max_d, f"std_{unit}": std_d,
+            "fairness": fairness, "score": score}
+
+
+def pad_groups(groups: list) -> tuple:
+    """
+    Pack ragged groups of (lat, lon) tuples into padded arrays.
+
+    Returns:
+        (lats, lons, mask), each of shape (n_groups, max_group_size).
+    """
+    sizes = np.array([len(g) for g in groups], dtype=int)
+    mask = np.arange(sizes.max(initial=0))[None, :] < sizes[:, None]
+    flat = np.asarray([c for g in groups for c in g], dtype=float).reshape(-1, 2)
+    lats, lons = np.zeros(mask.shape), np.zeros(mask.shape)
+    lats[mask], lons[mask] = flat[:, 0], flat[:, 1]
+    return lats, lons, mask
+
+
+def score_candidates_batch(cand_lats: np.ndarray, cand_lons: np.ndarray,
+                           user_lats: np.ndarray, user_lons: np.ndarray,
+                           mask: np.ndarray = None) -> dict:
+    """
+    Score candidates for many groups at once.
+
+    Args:
+        cand_lats, cand_lons: Candidate points, shape (G, C) — or (C,) to use
+                              the same candidates (e.g. transit hubs) for all.
+        user_lats, user_lons: Padded user coordinates, shape (G, U).
+        mask:                 Valid-user mask, shape (G, U).
+
+    Returns:
+        score_distance_matrix output with arrays of shape (G, C).
+    """
+    cand_lats, cand_lons = np.asarray(cand_lats), np.asarray(cand_lons)
+    if cand_lats.ndim == 1:
+        cand_lats, cand_lons = cand_lats[None, :], cand_lons[None, :]
+    dists = haversine_paired(cand_lats[..., None], cand_lons[..., None],
+                             user_lats[:, None, :], user_lons[:, None, :])
+    return score_distance_matrix(dists, mask)
+
+
+def _resolve_catalog(hubs) -> HubCatalog:
+    """Accept a HubCatalog, a list of hub dicts, or None (default catalog)."""
+    if hubs is None:
+        return get_hub_catalog()
+    if isinstance(hubs, HubCatalog):
+        return hubs
+    return HubCatalog.from_records(hubs)
+
+
+def suggest_meeting_points_batch(groups: list, hubs=None, solver: bool = True,
+                                 k_hubs: int = HUB_CANDIDATES_K, snap_k: int = 3,
+                                 chunk_size: int = 4096) -> pd.DataFrame:
+    """
+    Best meeting point for many groups in vectorized chunks (no printing).
+
+    With `solver` (default), the centroid, geometric median and minimax point
+    of each group are computed in a few vectorized iterations and each solver
+    point is snapped to its `snap_k` nearest indexed pickup locations (hubs).
+    Without it, candidates are the centroid plus the `k_hubs` hubs nearest to
+    it (the fixed candidate list). All candidates are scored together, and the
+    best free point and the best pickup location are both reported.
+
+    Args:
+        groups:     List of groups, each a list of (lat, lon) tuples.
+        hubs:       HubCatalog or list of hub dicts; default get_hub_catalog().
+        solver:     Use the iterative solvers instead of the fixed candidates.
+        k_hubs:     Hubs around the centroid (fixed candidates only).
+        snap_k:     Nearest hubs to consider around each solver point.
+        chunk_size: Groups scored per vectorized chunk.
+
+    Returns:
+        DataFrame with one row per group: group, name, lat, lon, avg_dist_km,
+        max_dist_km, fairness, score, and pickup_name, pickup_lat, pickup_lon,
+        pickup_score for the best hub. Empty (same columns) for no groups.
+    """
+    if not len(groups):
+        return pd.DataFrame(columns=BATCH_COLUMNS)
+    catalog = _resolve_catalog(hubs)
+    hub_index, hub_names = catalog.index, catalog.names
+    solver_names = np.array(["Geographic Centroid", "Geometric Median", "Minimax Point"],
+                            dtype=object)
+
+    parts = []
+    for start in range(0, len(groups), chunk_size):
+        lats, lons, mask = pad_groups(groups[start:start + chunk_size])
+        n = mask.sum(axis=1)
+        rows = np.arange(len(n))
+
+        c_lat = np.where(mask, lats, 0).sum(axis=1) / n
+        c_lon = np.where(mask, lons, 0).sum(axis=1) / n
+        if solver:
+            m_lat, m_lon = spherical_geometric_median(lats, lons, mask)
+            x_lat, x_lon = spherical_minimax_point(lats, lons, mask)
+            free_lats = np.column_stack([c_lat, m_lat, x_lat])
+            free_lons = np.column_stack([c_lon, m_lon, x_lon])
+            # Snap: nearest hubs around the median and the minimax point
+            _, near_m = hub_index.query_knn(m_lat, m_lon, k=snap_k)
+            _, near_x = hub_index.query_knn(x_lat, x_lon, k=snap_k)
+            hub_pos = np.hstack([near_m, near_x])
+        else:
+            free_lats, free_lons = c_lat[:, None], c_lon[:, None]
+            _, hub_pos = hub_index.query_knn(c_lat, c_lon, k=k_hubs)
+
+        cand_lats = np.hstack([free_lats, hub_index.lats[hub_pos]])
+        cand_lons = np.hstack([free_lons, hub_index.lons[hub_pos]])
+        scores = score_candidates_batch(cand_lats, cand_lons, lats, lons, mask)
+        score = scores["score"]
+        n_free = free_lats.shape[1]
+
+        best = score.argmax(axis=1)
+        pick = score[:, n_free:].argmax(axis=1)
+        names = np.where(best < n_free, solver_names[np.minimum(best, n_free - 1)],
+                         hub_names[hub_pos[rows, np.maximum(best - n_free, 0)]])
+        parts.append(pd.DataFrame({
+            "group":        start + rows,
+            "name":         names,
+            "lat":          np.round(cand_lats[rows, best], 6),
+            "lon":          np.round(cand_lons[rows, best], 6),
+            "avg_dist_km":  np.round(scores["avg_dist_km"][rows, best], 3),
+            "max_dist_km":  np.round(scores["max_dist_km"][rows, best], 3),
+            "fairness":     np.round(scores["fairness"][rows, best], 4),
+            "score":        np.round(score[rows, best], 6),
+            "pickup_name":  hub_names[hub_pos[rows, pick]],
+            "pickup_lat":   np.round(cand_lats[rows, n_free + pick], 6),
+            "pickup_lon":   np.round(cand_lons[rows, n_free + pick], 6),
+            "pickup_score": np.round(score[rows, n_free + pick], 6),
+        }))
+    return pd.concat(parts, ignore_index=True)
+
+
+def suggest_meeting_point(user_coords: list, user_ids: list = None,
+                          max_hubs: int = HUB_CANDIDATES_K) -> dict:
     """
     Main function: given a list of (lat, lon) tuples for matched users,
     return the best meeting point with full scoring.
@@ -102,24 +315,48 @@ def suggest_meeting_point(user_coords: list, user_ids: list = None) -> dict:
     Args:
         user_coords: List of (lat, lon) tuples.
         user_ids:    Optional list of user ID strings for labeling.
+        max_hubs:    Number of catalog hubs (nearest to the group centroid) to score.
 
     Returns:
         Best candidate dict (name, lat, lon, score, metrics).
     """
-    lats = [c[0] for c in user_coords]
-    lons = [c[1] for c in user_coords]
+    coords = np.asarray(user_coords, dtype=float)
+    lats, lons = coords[:, 0], coords[:, 1]
 
     # Candidate 1: pure centroid
     c_lat, c_lon = geographic_centroid(lats, lons)
-    candidates = [score_meeting_point(c_lat, c_lon, user_coords, "Geographic Centroid")]
-
-    # Candidate 2: weighted midpoint (by proximity to centroid)
-    wt_lat, wt_lon = weighted_midpoint(lats, lons)  # equal weights
-    candidates.append(score_meeting_point(wt_lat, wt_lon, user_coords, "Weighted Midpoint"))
-
-    # Candidates 3+: known transit hubs (ranked by proximity to centroid)
-    for hub in DELHI_TRANSIT_HUBS:
-        candidates.append(score_meeting_point(hub["lat"], hub["lon"], user_coords, hub["name"]))
+    names, cand_lats, cand_lons = ["Geographic Centroid"], [c_lat], [c_lon]
+
+    # Candidates 2–3: geometric median (min total distance) and minimax point
+    # (min worst-case distance) from the iterative solvers
+    for name, (p_lat, p_lon) in (("Geometric Median", spherical_geometric_median(lats, lons)),
+                                 ("Minimax Point", spherical_minimax_point(lats, lons))):
+        names.append(name)
+        cand_lats.append(p_lat)
+        cand_lons.append(p_lon)
+
+    # Candidates 4+: catalog hubs nearest to the centroid
+    for hub in nearest_transit_hubs(c_lat, c_lon, k=max_hubs):
+        names.append(hub["name"])
+        cand_lats.append(hub["lat"])
+        cand_lons.append(hub["lon"])
+
+    # Score every candidate in one pass over the (candidates × users) matrix
+    dists = haversine_many_to_many(cand_lats, cand_lons, lats, lons)
+    scores = score_distance_matrix(dists)
+    candidates = [
+        {
+            "name":         name,
+            "lat":          round(float(cand_lats[i]), 6),
+            "lon":          round(float(cand_lons[i]), 6),
+            "avg_dist_km":  round(float(scores["avg_dist_km"][i]), 3),
+            "max_dist_km":  round(float(scores["max_dist_km"][i]), 3),
+            "fairness":     round(float(scores["fairness"][i]), 4),
+            "score":        round(float(scores["score"][i]), 6),
+            "distances_km": [round(float(d), 3) for d in dists[i]],
+        }
+        for i, name in enumerate(names)
+    ]
 
     # Pick best by composite score
     best = max(candidates, key=lambda x: x["score"])
@@ -134,8 +371,177 @@ def suggest_meeting_point(user_coords: list, user_ids: list = None) -> dict:
     return best, candidates
 
 
+# ── Batch pipeline (Model 1 matched pairs → carpool groups → meeting points) ──
+
+def build_carpool_groups(pairs_df: pd.DataFrame, users_df: pd.DataFrame,
+                         max_group_size: int = 4) -> pd.DataFrame:
+    """
+    Turn matched pairs into carpool groups of mutually matched users.
+
+    Every group is a clique of the pair graph, so each two members passed
+    Model 1's time and distance thresholds together. Groups are grown
+    greedily: seeds are taken fewest-partners first (they have the least
+    choice), and each step adds the candidate matched with every member so
+    far that keeps the most candidates open, closest departure time first.
+    Users left without a partner are not grouped.
+
+    Args:
+        pairs_df:       Matched pairs with user_1 / user_2 columns (Model 1 output).
+        users_df:       Users with user_id, home_lat, home_lon, commute_time_minutes.
+        max_group_size: Seats per carpool.
+
+    Returns:
+        DataFrame (one row per member, ordered by group, then departure time):
+        group_id, user_id, home_lat, home_lon, commute_time_minutes.
+    """
+    users = users_df.reset_index(drop=True)
+    index = pd.Index(users["user_id"])
+    u1 = index.get_indexer(pairs_df["user_1"])
+    u2 = index.get_indexer(pairs_df["user_2"])
+    ok = (u1 >= 0) & (u2 >= 0) & (u1 != u2)
+    n = len(users)
+    graph = coo_matrix((np.ones(ok.sum()), (u1[ok], u2[ok])), shape=(n, n)).tocsr()
+    graph = (graph + graph.T).tocsr()
+    neighbors = [set(graph.indices[graph.indptr[i]:graph.indptr[i + 1]].tolist())
+                 for i in range(n)]
+    times = users["commute_time_minutes"].to_numpy()
+    degree = np.diff(graph.indptr)
+
+    group_of = np.full(n, -1)
+    n_groups = 0
+    for seed in np.lexsort((times, degree)):
+        if group_of[seed] != -1 or not degree[seed]:
+            continue
+        group = [seed]
+        candidates = {c for c in neighbors[seed] if group_of[c] == -1}
+        while candidates and len(group) < max_group_size:
+            pick = max(candidates, key=lambda c: (len(candidates & neighbors[c]),
+                                                  -abs(times[c] - times[seed]), -c))
+            group.append(pick)
+            candidates &= neighbors[pick]
+        if len(group) >= 2:
+            group_of[group] = n_groups
+            n_groups += 1
+
+    members = np.flatnonzero(group_of >= 0)
+    members = members[np.lexsort((members, times[members], group_of[members]))]
+    groups = users.loc[members, ["user_id", "home_lat", "home_lon", "commute_time_minutes"]]
+    groups.insert(0, "group_id", group_of[members])
+    return groups.reset_index(drop=True)
+
+
+def _solve_chunk(args) -> pd.DataFrame:
+    """Worker: meeting points for one chunk of groups."""
+    groups, hubs = args
+    return suggest_meeting_points_batch(groups, hubs=hubs)
+
+
+def run_batch(pairs_df: pd.DataFrame, users_df: pd.DataFrame, max_group_size: int = 4,
+              hubs=None, chunk_size: int = 4096, max_workers: int = 1,
+              output_path: str = None) -> dict:
+    """
+    End-to-end batch path: matched pairs → carpool groups → meeting points for
+    every group, written to one columnar file. No per-group printing/plotting.
+
+    Args:
+        pairs_df:       Matched pairs (Model 1 output).
+        users_df:       User table with home coordinates and commute time.
+        max_group_size: Seats per carpool.
+        hubs:           HubCatalog or list of hub dicts; default get_hub_catalog().
+        chunk_size:     Groups per vectorized chunk / process-pool task.
+        max_workers:    > 1 solves chunks in a process pool.
+        output_path:    Defaults to OUTPUT_DIR/meeting_points_batch.parquet
+                        (.csv when no Parquet engine is installed).
+
+    Returns:
+        dict with groups (membership), meeting_points (one row per group) and path.
+    """
+    members = build_carpool_groups(pairs_df, users_df, max_group_size=max_group_size)
+    bounds = np.flatnonzero(np.diff(members["group_id"].to_numpy())) + 1
+    coords = members[["home_lat", "home_lon"]].to_numpy()
+    groups = [list(map(tuple, g)) for g in np.split(coords, bounds)] if len(coords) else []
+    print(f"  Carpool groups : {len(groups)} ({len(members)} users)")
+
+    if not groups:
+        results = pd.DataFrame()
+    else:
+        jobs = [(groups[i:i + chunk_size], hubs) for i in range(0, len(groups), chunk_size)]
+        if max_workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                parts = list(pool.map(_solve_chunk, jobs))
+        else:
+            parts = [_solve_chunk(job) for job in jobs]
+        results = pd.concat(parts, ignore_index=True)
+        results["group"] = np.arange(len(results))
+        results = results.rename(columns={"group": "group_id"})
+        user_ids = members.groupby("group_id", sort=True)["user_id"].agg(";".join)
+        results.insert(1, "n_users", np.diff(np.r_[0, bounds, len(members)]))
+        results.insert(2, "user_ids", user_ids.to_numpy())
+
+    output_path = output_path or os.path.join(OUTPUT_DIR, "meeting_points_batch.parquet")
+    try:
+        results.to_parquet(output_path, index=False)
+    except ImportError:
+        output_path = os.path.splitext(output_path)[0] + ".csv"
+        results.to_csv(output_path, index=False)
+    print(f"  💾 Meeting points saved → {output_path}")
+
+    return {"groups": members, "meeting_points": results, "path": output_path}
+
+
+def get_hub_travel_times(graphml_path: str, catalog: HubCatalog = None) -> HubTravelTimes:
+    """Travel-time lookups from a local GraphML road graph to every catalog hub."""
+    catalog = catalog or get_hub_catalog()
+    return load_hub_travel_times(graphml_path, catalog.lats, catalog.lons)
+
+
+def suggest_meeting_point_by_travel_time(user_coords: list, travel_times: HubTravelTimes,
+                                         catalog: HubCatalog = None,
+                                         max_hubs: int = HUB_CANDIDATES_K) -> tuple:
+    """
+    Like suggest_meeting_point, but candidates are catalog hubs scored by road
+    travel time (minutes) instead of straight-line distance; the distance
+    weights are converted to minutes at DEFAULT_SPEED_KPH (TIME_WEIGHTS).
+
+    Args:
+        user_coords:  List of (lat, lon) tuples.
+        travel_times: HubTravelTimes for `catalog` (see get_hub_travel_times).
+        catalog:      Hub catalog whose order matches `travel_times`; default get_hub_catalog().
+        max_hubs:     Number of hubs (nearest to the group centroid) to score.
+
+    Returns:
+        (best, candidates) dicts with avg_time_min, max_time_min, fairness, score.
+        Hubs some user cannot reach are skipped; best is None if none remain.
+    """
+    catalog = catalog or get_hub_catalog()
+    coords = np.asarray(user_coords, dtype=float)
+    c_lat, c_lon = geographic_centroid(coords[:, 0], coords[:, 1])
+    _, hub_pos = catalog.index.query_knn(c_lat, c_lon, k=max_hubs)
+    hub_pos = hub_pos[0]
+
+    minutes = travel_times.minutes_to_hubs(hub_pos, coords[:, 0], coords[:, 1])
+    reachable = np.isfinite(minutes).all(axis=1)
+    scores = score_distance_matrix(np.where(reachable[:, None], minutes, 0.0),
+                                   weights=TIME_WEIGHTS, unit="time_min")
+    candidates = [
+        {
+            "name":         str(catalog.names[p]),
+            "lat":          round(float(catalog.lats[p]), 6),
+            "lon":          round(float(catalog.lons[p]), 6),
+            "avg_time_min": round(float(scores["avg_time_min"][i]), 2),
+            "max_time_min": round(float(scores["max_time_min"][i]), 2),
+            "fairness":     round(float(scores["fairness"][i]), 4),
+            "score":        round(float(scores["score"][i]), 6),
+            "times_min":    [round(float(t), 2) for t in minutes[i]],
+        }
+        for i, p in enumerate(hub_pos) if reachable[i]
+    ]
+    best = max(candidates, key=lambda x: x["score"]) if candidates else None
+    return best, candidates
+
+
 def plot_meeting_point_static(user_coords: list, best: dict,
-                               group_id: int = 0, user_ids: list = None):
+                               group_id: int = 0, user_ids: list = None, path: str = None):
     """
     Static matplotlib visualization of users and meeting point.
     """
@@ -162,14 +568,14 @@ def plot_meeting_point_static(user_coords: list, best: dict,
     ax.set_ylabel("Latitude")
     ax.legend(fontsize=9)
     plt.tight_layout()
-    path = os.path.join(OUTPUT_DIR, f"meeting_point_group_{group_id}.png")
+    path = path or os.path.join(OUTPUT_DIR, f"meeting_point_group_{group_id}.png")
     plt.savefig(path, dpi=150)
     plt.close()
     print(f"  🗺️  Map saved → {path}")
 
 
 def plot_meeting_point_folium(user_coords: list, best: dict,
-                               group_id: int = 0, user_ids: list = None):
+                               group_id: int = 0, user_ids: list = None, path: str = None):
     """
     Interactive folium map with user markers + meeting point.
     """
@@ -194,15 +600,21 @@ def plot_meeting_point_folium(user_coords: list, best: dict,
         icon=folium.Icon(color="red", icon="map-pin", prefix="fa")
     ).add_to(m)
 
-    path = os.path.join(OUTPUT_DIR, f"meeting_point_group_{group_id}.html")
+    path = path or os.path.join(OUTPUT_DIR, f"meeting_point_group_{group_id}.html")
     m.save(path)
     print(f"  🌐 Interactive map saved → {path}")
 
 
-def run_demo(n_groups: int = 3) -> list:
+def run_demo(n_groups: int = 3, road_graph: str = None, render: str = "all",
+             top_n: int = 3, render_queue: RenderQueue = None) -> list:
     """
     Demo pipeline: simulate random groups of 3–5 users and find their optimal
-    meeting points.
+    meeting points. If `road_graph` (a local GraphML file) is given, the best
+    hub by road travel time is reported as well.
+
+    Maps go through a RenderQueue: `render` is the policy ("all", "top_n" —
+    the `top_n` best-scoring groups — or "none"). With a shared
+    `render_queue` the maps are only submitted and the caller flushes.
 
     Returns list of best candidate dicts.
     """
@@ -212,6 +624,8 @@ def run_demo(n_groups: int = 3) -> list:
 
     rng = np.random.default_rng(7)
     results = []
+    travel_times = get_hub_travel_times(road_graph) if road_graph else None
+    queue = render_queue or RenderQueue(policy=render, top_n=top_n)
 
     for g in range(n_groups):
         n_users = rng.integers(3, 6)
@@ -225,13 +639,26 @@ def run_demo(n_groups: int = 3) -> list:
 
         print(f"\n  Group {g} ({n_users} users):")
         best, all_candidates = suggest_meeting_point(coords, uids)
+        if travel_times is not None:
+            best_tt, _ = suggest_meeting_point_by_travel_time(coords, travel_times)
+            if best_tt:
+                print(f"  Best hub by road time: {best_tt['name']} "
+                      f"(avg {best_tt['avg_time_min']} min, max {best_tt['max_time_min']} min)")
 
         if HAS_FOLIUM:
-            plot_meeting_point_folium(coords, best, group_id=g, user_ids=uids)
-        plot_meeting_point_static(coords, best, group_id=g, user_ids=uids)
+            queue.submit(plot_meeting_point_folium,
+                         os.path.join(OUTPUT_DIR, f"meeting_point_group_{g}.html"),
+                         coords, best, group_id=g, user_ids=uids,
+                         priority=best["score"], group=g)
+        queue.submit(plot_meeting_point_static,
+                     os.path.join(OUTPUT_DIR, f"meeting_point_group_{g}.png"),
+                     coords, best, group_id=g, user_ids=uids,
+                     priority=best["score"], group=g)
 
         results.append({"group": g, "best": best, "all_candidates": all_candidates})
 
+    if render_queue is None:
+        queue.flush()
     return results
 
 
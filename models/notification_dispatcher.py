@@ -0,0 +1,260 @@
+"""
+notification_dispatcher.py
+--------------------------
+Sends the nightly notification plan built by notification_schedule.py.
+
+An asyncio loop walks a heap-ordered timer queue of per-minute buckets. At
+each send minute it pops what is due, sends up to `max_per_minute` users in
+one batched call to a pluggable sink and re-queues the overflow for the next
+minute; spare capacity may instead take, up to `max_early` minutes early,
+the part of an upcoming bucket that would overflow its own minute. The
+queue holds at most one entry per bucket — each a view into the plan's
+user_ids — and lateness goes into a fixed-size histogram, so memory does not
+grow with the number of sends.
+
+Sinks are callables `sink(minute, user_ids)`, plain or async. InProcessSink
+is a local stand-in for the push service; SimulatedClock replays a whole day
+instantly.
+
+Usage:
+    python models/notification_dispatcher.py [max_per_minute]
+"""
+
+import asyncio
+import heapq
+import inspect
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from models.notification_schedule import SEND_PLAN_PATH, SendSchedule
+from utils.geo_utils import minutes_to_time
+
+MAX_LATENESS_S = 24 * 3600   # lateness beyond this lands in the histogram's last bin
+
+
+# ── clocks ─────────────────────────────────────────────────────────────────────
+
+class SimulatedClock:
+    """Clock in minutes since midnight that jumps straight to each send time."""
+
+    def __init__(self, start: float = 0.0):
+        self.minute = float(start)
+
+    def now(self) -> float:
+        return self.minute
+
+    async def sleep_until(self, minute: float) -> None:
+        self.minute = max(self.minute, float(minute))
+        await asyncio.sleep(0)
+
+
+class WallClock:
+    """Real time in minutes since local midnight (of the day it was created)."""
+
+    def __init__(self):
+        midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self._midnight = midnight.timestamp()
+
+    def now(self) -> float:
+        return (time.time() - self._midnight) / 60.0
+
+    async def sleep_until(self, minute: float) -> None:
+        delay = (minute - self.now()) * 60.0
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# ── sinks ──────────────────────────────────────────────────────────────────────
+
+class InProcessSink:
+    """
+    Local push stand-in: counts (and optionally keeps) every batched call.
+
+    Args:
+        keep_batches: Store (minute, user_ids) per call in `batches`.
+        latency_s:    Simulated round-trip time per call.
+    """
+
+    def __init__(self, keep_batches: bool = True, latency_s: float = 0.0):
+        self.keep_batches = keep_batches
+        self.latency_s = latency_s
+        self.calls = 0
+        self.sent = 0
+        self.batches = []
+
+    async def __call__(self, minute: int, user_ids: np.ndarray) -> None:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        self.calls += 1
+        self.sent += len(user_ids)
+        if self.keep_batches:
+            self.batches.append((minute, user_ids))
+
+
+# ── lateness ───────────────────────────────────────────────────────────────────
+
+class LatenessHistogram:
+    """Send lateness (actual − planned, seconds) in 1 s bins; early sends are negative."""
+
+    def __init__(self, max_early_s: int = 0, max_late_s: int = MAX_LATENESS_S):
+        self.lo = -int(max_early_s)
+        self.counts = np.zeros(int(max_late_s) - self.lo + 1, dtype=np.int64)
+
+    def add(self, lateness_s: float, n: int) -> None:
+        i = int(np.clip(round(lateness_s) - self.lo, 0, len(self.counts) - 1))
+        self.counts[i] += n
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def mean(self) -> float:
+        if not self.total:
+            return 0.0
+        return float(np.dot(self.counts, np.arange(len(self.counts)) + self.lo) / self.total)
+
+    def percentiles(self, qs=(50, 90, 99, 100)) -> dict:
+        """Lateness (s) at each percentile in `qs`."""
+        if not self.total:
+            return {q: 0 for q in qs}
+        cum = np.cumsum(self.counts)
+        return {q: int(np.searchsorted(cum, max(1, np.ceil(q / 100 * self.total)))) + self.lo
+                for q in qs}
+
+
+# ── dispatcher ─────────────────────────────────────────────────────────────────
+
+class NotificationDispatcher:
+    """
+    Rate-limited, batched sender for a SendSchedule.
+
+    Args:
+        sink:           Callable `sink(minute, user_ids)`, sync or async,
+                        called once per send minute.
+        max_per_minute: Throughput cap (None = unlimited); overflow moves to
+                        the following minute(s), oldest planned time first.
+        max_early:      Minutes ahead spare capacity may pull a bucket's
+                        overflow from (sending it early instead of late).
+        clock:          SimulatedClock (default) or WallClock.
+    """
+
+    def __init__(self, sink, max_per_minute: int = None, max_early: int = 0, clock=None):
+        if max_per_minute is not None and max_per_minute < 1:
+            raise ValueError("max_per_minute must be >= 1")
+        self.sink = sink
+        self.max_per_minute = max_per_minute
+        self.max_early = int(max_early)
+        self.clock = clock or SimulatedClock()
+
+    async def _send(self, minute: int, user_ids: np.ndarray) -> None:
+        result = self.sink(minute, user_ids)
+        if inspect.isawaitable(result):
+            await result
+
+    def _pull_early(self, queue: list, minute: int, capacity: int, parts: list) -> None:
+        """Spend spare capacity on the overflow of buckets due within `max_early` minutes."""
+        ahead = []
+        while queue and queue[0][0] <= minute + self.max_early:
+            ahead.append(heapq.heappop(queue))
+        for at, planned, seq, ids in ahead:
+            n_take = min(capacity, len(ids) - self.max_per_minute)
+            if n_take > 0:
+                parts.append((planned, ids[len(ids) - n_take:]))
+                ids = ids[:len(ids) - n_take]
+                capacity -= n_take
+            heapq.heappush(queue, (at, planned, seq, ids))
+
+    async def dispatch(self, schedule: SendSchedule) -> dict:
+        """
+        Send every user in the plan.
+
+        Returns:
+            Dict with sent, calls, shifted (users sent at another minute than
+            planned), max_queue (timer-queue entries), last_minute,
+            lateness_s (percentiles) and mean_lateness_s.
+        """
+        # Entry: (send minute, planned minute, seq, user_ids). Overflow keeps
+        # its planned minute, so at equal send minutes it goes out first.
+        queue = [(m, m, i, ids) for i, (m, ids) in enumerate(schedule)]
+        heapq.heapify(queue)
+        seq, max_queue = len(queue), len(queue)
+        hist = LatenessHistogram(max_early_s=self.max_early * 60)
+        sent = calls = shifted = 0
+        minute = None
+
+        while queue:
+            # Never reuse a minute: overflow left by its capacity moves on
+            due = queue[0][0] if minute is None else max(queue[0][0], minute + 1)
+            await self.clock.sleep_until(due)
+            minute = max(due, int(self.clock.now()))
+            capacity = self.max_per_minute or sys.maxsize
+            parts = []
+            while queue and queue[0][0] <= minute and capacity > 0:
+                _, planned, _, ids = heapq.heappop(queue)
+                take, rest = ids[:capacity], ids[capacity:]
+                parts.append((planned, take))
+                capacity -= len(take)
+                if len(rest):
+                    heapq.heappush(queue, (minute + 1, planned, seq, rest))
+                    seq += 1
+            if capacity > 0 and self.max_early and self.max_per_minute:
+                self._pull_early(queue, minute, capacity, parts)
+            max_queue = max(max_queue, len(queue))
+
+            batch = parts[0][1] if len(parts) == 1 else np.concatenate([p[1] for p in parts])
+            sent_at = self.clock.now()
+            await self._send(minute, batch)
+            calls += 1
+            sent += len(batch)
+            for planned, ids in parts:
+                hist.add((sent_at - planned) * 60.0, len(ids))
+                shifted += len(ids) if planned != minute else 0
+
+        return {"sent": sent, "calls": calls, "shifted": shifted, "max_queue": max_queue,
+                "last_minute": minute, "lateness_s": hist.percentiles(),
+                "mean_lateness_s": hist.mean()}
+
+
+def dispatch_plan(schedule: SendSchedule, sink=None, max_per_minute: int = None,
+                  max_early: int = 0, clock=None) -> dict:
+    """Run a NotificationDispatcher over `schedule` to completion (blocking)."""
+    dispatcher = NotificationDispatcher(sink or InProcessSink(keep_batches=False),
+                                        max_per_minute, max_early, clock)
+    return asyncio.run(dispatcher.dispatch(schedule))
+
+
+def run(plan_path: str = SEND_PLAN_PATH, max_per_minute: int = 40, max_early: int = 2) -> dict:
+    """Replay the saved send plan through the in-process sink on a simulated clock."""
+    print("\n" + "="*60)
+    print("  MODEL 4: Notification Dispatch (simulated)")
+    print("="*60)
+
+    if not os.path.exists(plan_path):
+        from models.notification_schedule import run as build_plan
+        build_plan(output_path=plan_path)
+    schedule = SendSchedule.load(plan_path)
+
+    sink = InProcessSink(keep_batches=False)
+    t0 = time.perf_counter()
+    stats = dispatch_plan(schedule, sink, max_per_minute, max_early)
+    elapsed = time.perf_counter() - t0
+
+    lateness = stats["lateness_s"]
+    print(f"  Cap             : {max_per_minute}/min (pull up to {max_early} min early)")
+    print(f"  Sent            : {stats['sent']} users in {stats['calls']} sink calls "
+          f"({elapsed * 1e3:.0f} ms)")
+    print(f"  Shifted         : {stats['shifted']} users")
+    print(f"  Lateness (s)    : p50 {lateness[50]}  p90 {lateness[90]}  "
+          f"p99 {lateness[99]}  max {lateness[100]}")
+    print(f"  Last send       : {minutes_to_time(stats['last_minute'])} "
+          f"(planned {minutes_to_time(int(schedule.minutes[-1]))})")
+    return stats
+
+
+if __name__ == "__main__":
+    run(max_per_minute=int(sys.argv[1]) if len(sys.argv) > 1 else 40)
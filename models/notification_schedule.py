@@ -0,0 +1,176 @@
+"""
+notification_schedule.py
+------------------------
+Nightly send plan for Model 4: predicts every active user's optimal
+notification minute in one vectorized call and groups users into per-minute
+send buckets for the push dispatcher.
+
+The plan is stored CSR-style — three flat arrays instead of one row or list
+per user:
+
+    minutes   (n_buckets,)     send minutes with at least one user, ascending
+    offsets   (n_buckets + 1,) bucket i is user_ids[offsets[i]:offsets[i + 1]]
+    user_ids  (n_users,)       users ordered by send minute
+
+Usage:
+    python models/notification_schedule.py
+
+Outputs:
+  - model_reports/notification_send_plan.npz
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from models.notification_timing_model import (
+    DATA_PATH, FEATURE_COLS, MINUTES_PER_DAY, OUTPUT_DIR, predict_optimal_minutes
+)
+from models.notification_smoothing import smooth_send_times
+from utils.compiled_trees import load_scorer
+from utils.feature_store import load_columns
+from utils.geo_utils import minutes_to_time
+
+MODEL_PATH = os.path.join(OUTPUT_DIR, "notification_model_best.joblib")
+SEND_PLAN_PATH = os.path.join(OUTPUT_DIR, "notification_send_plan.npz")
+
+
+class SendSchedule:
+    """
+    Users bucketed by send minute (see module docstring for the layout).
+    Iterating yields (minute, user_ids) pairs in send order.
+    """
+
+    def __init__(self, minutes: np.ndarray, offsets: np.ndarray, user_ids: np.ndarray):
+        self.minutes = np.asarray(minutes, dtype=np.int16)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.user_ids = np.asarray(user_ids)
+        if self.user_ids.dtype == object:
+            # Fixed-width strings keep the plan loadable without pickle
+            self.user_ids = self.user_ids.astype(str)
+        if len(self.offsets) != len(self.minutes) + 1 or self.offsets[-1] != len(self.user_ids):
+            raise ValueError("offsets must have n_buckets + 1 entries ending at len(user_ids)")
+
+    @classmethod
+    def from_predictions(cls, user_ids, send_minutes) -> "SendSchedule":
+        """
+        Bucket users by predicted send minute.
+
+        Args:
+            user_ids:     (n,) user identifiers.
+            send_minutes: (n,) integer minutes since midnight.
+        """
+        send_minutes = np.asarray(send_minutes, dtype=np.int16)
+        user_ids = np.asarray(user_ids)
+        if len(user_ids) != len(send_minutes):
+            raise ValueError("user_ids and send_minutes must have the same length")
+        if len(send_minutes) and (send_minutes.min() < 0 or send_minutes.max() >= MINUTES_PER_DAY):
+            raise ValueError(f"send minutes must lie in [0, {MINUTES_PER_DAY})")
+        # Stable radix sort on int16 keeps users in input order within a minute
+        order = np.argsort(send_minutes, kind="stable")
+        counts = np.bincount(send_minutes, minlength=MINUTES_PER_DAY)
+        minutes = np.flatnonzero(counts)
+        offsets = np.concatenate([[0], np.cumsum(counts[minutes])])
+        return cls(minutes, offsets, user_ids[order])
+
+    @property
+    def n_users(self) -> int:
+        return len(self.user_ids)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Users per bucket."""
+        return np.diff(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.minutes)
+
+    def __iter__(self):
+        for i, minute in enumerate(self.minutes):
+            yield int(minute), self.user_ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def bucket(self, minute: int) -> np.ndarray:
+        """Users to notify at `minute` (empty array if none)."""
+        i = np.searchsorted(self.minutes, minute)
+        if i == len(self.minutes) or self.minutes[i] != minute:
+            return self.user_ids[:0]
+        return self.user_ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per user: send_minute, send_time ("HH:MM"), user_id."""
+        minute = np.repeat(self.minutes, self.counts)
+        labels = np.array([minutes_to_time(int(m)) for m in self.minutes], dtype=object)
+        return pd.DataFrame({"send_minute": minute,
+                             "send_time": np.repeat(labels, self.counts),
+                             "user_id": self.user_ids})
+
+    def save(self, path: str = SEND_PLAN_PATH) -> str:
+        """Write the plan's three arrays to a .npz file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(path, minutes=self.minutes, offsets=self.offsets, user_ids=self.user_ids)
+        return path
+
+    @classmethod
+    def load(cls, path: str = SEND_PLAN_PATH) -> "SendSchedule":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["minutes"], data["offsets"], data["user_ids"])
+
+
+def build_send_schedule(X, user_ids=None, path: str = MODEL_PATH, compiled: bool = False,
+                        smooth_window: int = None, capacity=None) -> SendSchedule:
+    """
+    Predict send minutes for all users and bucket them into a send plan.
+
+    Args:
+        X:        (n_users, len(FEATURE_COLS)) array in FEATURE_COLS order,
+                  a mapping of feature columns, or a DataFrame.
+        user_ids: (n_users,) identifiers; defaults to row positions.
+        path:     Saved notification model.
+        compiled: Score with the compiled tree artifact when present. Off by
+                  default: it wins on small requests, while sklearn's Cython
+                  predict is faster over millions of rows.
+        smooth_window: If set, flatten load peaks by moving users at most
+                  this many minutes (see notification_smoothing.py).
+        capacity: Per-minute send cap for smoothing (None = flattest
+                  profile the window allows).
+
+    Returns:
+        SendSchedule.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No trained notification model at {os.path.abspath(path)} — "
+                                "run models/notification_timing_model.py first")
+    minutes = predict_optimal_minutes(load_scorer(path, FEATURE_COLS, compiled), X)
+    if smooth_window:
+        minutes = smooth_send_times(minutes, smooth_window, capacity)
+    ids = np.arange(len(minutes)) if user_ids is None else user_ids
+    return SendSchedule.from_predictions(ids, minutes)
+
+
+def run(data_path: str = DATA_PATH, output_path: str = SEND_PLAN_PATH,
+        smooth_window: int = None) -> SendSchedule:
+    """Build and save the send plan for every user in the dataset."""
+    print("\n" + "="*60)
+    print("  MODEL 4: Notification Send Plan")
+    print("="*60)
+
+    columns = load_columns(data_path, FEATURE_COLS + ["user_id"])
+    user_ids = columns.pop("user_id")
+    schedule = build_send_schedule(columns, user_ids, smooth_window=smooth_window)
+    schedule.save(output_path)
+
+    peak = int(np.argmax(schedule.counts))
+    print(f"  Users scheduled : {schedule.n_users}")
+    print(f"  Send buckets    : {len(schedule)} "
+          f"({minutes_to_time(int(schedule.minutes[0]))}–{minutes_to_time(int(schedule.minutes[-1]))})")
+    print(f"  Busiest minute  : {minutes_to_time(int(schedule.minutes[peak]))} "
+          f"({schedule.counts[peak]} users)")
+    print(f"  💾 Send plan saved → {output_path}")
+    return schedule
+
+
+if __name__ == "__main__":
+    run()
@@ -46,7 +46,11 @@ from sklearn.pipeline import Pipeline
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from utils.evaluation_metrics import regression_report_dict, print_regression_report
+from utils.feature_store import load_frame
 from utils.geo_utils import minutes_to_time
+from utils.compiled_trees import compile_pipeline, is_compilable
+from utils.training import train_candidates
+from utils.inference import PipelineScorer
 
 try:
     import xgboost as xgb
@@ -67,11 +71,12 @@ FEATURE_COLS = [
     "overlap_score",
 ]
 TARGET_COL = "optimal_notify_minutes"
+MINUTES_PER_DAY = 24 * 60
 
 
 def load_and_prepare(path: str):
-    """Load and split dataset."""
-    df = pd.read_csv(path)
+    """Load features and target from the feature store and split."""
+    df = load_frame(path, FEATURE_COLS + [TARGET_COL])
     X = df[FEATURE_COLS]
     y = df[TARGET_COL]
     return train_test_split(X, y, test_size=0.2, random_state=42)
@@ -175,20 +180,38 @@ def plot_feature_importance(model_pipeline, feature_names: list, model_name: str
     print(f"  📊 Feature importance saved → {path}")
 
 
+def predict_optimal_minutes(model, X) -> np.ndarray:
+    """
+    Predict optimal notification times for a batch of users in one call.
+
+    Args:
+        model: Trained pipeline, or an already unpacked scorer
+               (PipelineScorer / CompiledTreeEnsemble).
+        X:     (n_users, len(FEATURE_COLS)) array in FEATURE_COLS order, a
+               mapping of feature columns, or a DataFrame with FEATURE_COLS.
+
+    Returns:
+        (n_users,) int16 array of minutes since midnight, rounded and clipped
+        to [0, MINUTES_PER_DAY - 1].
+    """
+    scorer = model if hasattr(model, "score_one") else PipelineScorer(model, FEATURE_COLS)
+    minutes = np.rint(scorer.score(X))
+    return np.clip(minutes, 0, MINUTES_PER_DAY - 1).astype(np.int16)
+
+
 def predict_optimal_time(model_pipeline, user_features: dict) -> str:
     """
     Predict optimal notification time for a single user.
 
     Args:
-        model_pipeline: Trained sklearn pipeline.
+        model_pipeline: Trained sklearn pipeline (or scorer).
         user_features:  Dict with keys matching FEATURE_COLS.
 
     Returns:
         Optimal notification time as "HH:MM" string.
     """
-    row = pd.DataFrame([{col: user_features.get(col, 0) for col in FEATURE_COLS}])
-    pred_minutes = model_pipeline.predict(row)[0]
-    return minutes_to_time(int(round(pred_minutes)))
+    row = {col: user_features.get(col, 0) for col in FEATURE_COLS}
+    return minutes_to_time(int(predict_optimal_minutes(model_pipeline, row)[0]))
 
 
 def run() -> dict:
@@ -203,17 +226,16 @@ def run() -> dict:
     print(f"  Target range: {int(y_train.min())}–{int(y_train.max())} mins "
           f"({minutes_to_time(int(y_train.min()))}–{minutes_to_time(int(y_train.max()))})")
 
-    # 2. Train models
+    # 2. Train models concurrently; test-set predictions are computed once
     models = build_models()
+    print(f"\n  Training {len(models)} models …")
     results = {}
 
-    for name, pipeline in models.items():
-        print(f"\n  Training {name} …")
-        pipeline.fit(X_train, y_train)
-        y_pred = pipeline.predict(X_test)
-        report = regression_report_dict(y_test, y_pred)
+    for name, fit in train_candidates(models, X_train, y_train, X_test).items():
+        report = regression_report_dict(y_test, fit["y_pred"])
+        print(f"\n  {name} trained in {fit['fit_seconds']:.1f}s")
         print_regression_report(name, report)
-        results[name] = (pipeline, report, y_pred)
+        results[name] = (fit["model"], report, fit["y_pred"])
 
     # 3. Save comparison table
     rows = [{"model": name, **report} for name, (_, report, _) in results.items()]
@@ -233,6 +255,10 @@ def run() -> dict:
     model_path = os.path.join(OUTPUT_DIR, "notification_model_best.joblib")
     joblib.dump(best_pipeline, model_path)
     print(f"  🏆 Best model ({best_name}) saved → {model_path}")
+    if is_compilable(best_pipeline):
+        compiled_path = os.path.join(OUTPUT_DIR, "notification_model_best_compiled")
+        compile_pipeline(best_pipeline, FEATURE_COLS).save(compiled_path)
+        print(f"  ⚡ Compiled tree model saved → {compiled_path}")
 
     # 6. Demo prediction
     demo_user = {
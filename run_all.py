@@ -25,17 +25,25 @@ print("\n[0/4] Generating synthetic dataset …")
 import data.generate_dataset  # executes on import
 print("  ✅ Dataset ready")
 
+# Maps from Models 1–2 are queued and rendered in the background while
+# Models 3–4 train
+from utils.render_queue import RenderQueue
+render_queue = RenderQueue(policy="all")
+
 # ── Model 1 ────────────────────────────────────────────────────────────────────
 t0 = time.time()
 from models.commute_overlap_model import run as run_overlap, HAS_HDBSCAN
-m1_result = run_overlap(use_hdbscan=HAS_HDBSCAN, sample_n=500)
+m1_result = run_overlap(use_hdbscan=HAS_HDBSCAN, render_queue=render_queue)
 print(f"  ✅ Model 1 done ({time.time()-t0:.1f}s)")
 
 # ── Model 2 ────────────────────────────────────────────────────────────────────
 t0 = time.time()
-from models.meeting_point_model import run_demo as run_meeting
-m2_result = run_meeting(n_groups=3)
+from models.meeting_point_model import run_demo as run_meeting, run_batch as run_meeting_batch
+from models.commute_overlap_model import load_data as load_commuters
+m2_result = run_meeting(n_groups=3, render_queue=render_queue)
+m2_batch = run_meeting_batch(m1_result["matched_pairs"], load_commuters())
 print(f"  ✅ Model 2 done ({time.time()-t0:.1f}s)")
+render_queue.flush(wait=False)
 
 # ── Model 3 ────────────────────────────────────────────────────────────────────
 t0 = time.time()
@@ -49,6 +57,10 @@ from models.notification_timing_model import run as run_notification
 m4_result = run_notification()
 print(f"  ✅ Model 4 done ({time.time()-t0:.1f}s)")
 
+render_stats = render_queue.wait()
+print(f"  ✅ Maps rendered: {render_stats['rendered']} "
+      f"(cached {render_stats['cached']}, skipped {render_stats['skipped']})")
+
 # ── Summary ────────────────────────────────────────────────────────────────────
 print("\n" + "█"*60)
 print("  PIPELINE COMPLETE — SUMMARY")
@@ -65,6 +77,7 @@ print(f"\n  Model 2 (Meeting Points):")
 for r in m2_result:
     b = r["best"]
     print(f"    Group {r['group']}: {b['name']} | avg {b['avg_dist_km']} km | score {b['score']:.4f}")
+print(f"    Batch: {len(m2_batch['meeting_points'])} carpool groups → {m2_batch['path']}")
 
 print(f"\n  Model 3 (Acceptance Prediction):")
 print(m3_result["reports"].to_string(index=False))
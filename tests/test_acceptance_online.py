@@ -0,0 +1,56 @@
+"""Per-user rate store of models/acceptance_online.py."""
+
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.acceptance_online import AcceptanceRateStore
+
+
+def test_users_added_by_update_start_without_history():
+    store = AcceptanceRateStore(capacity=4)
+    store.update(list("abcd"), [1, 0, 1, 0])
+    store.update(["a"] * 20, [1] * 20)
+    store.update(["e"], [0])          # grows the arrays past capacity
+    assert store.rates(["e"])[0] == 0.0
+    store.update(["f", "g", "h", "i", "j"], [1, 1, 0, 0, 1])
+    np.testing.assert_array_equal(store.rates(list("fghij")), [1, 1, 0, 0, 1])
+
+
+def test_growth_keeps_existing_rates():
+    store = AcceptanceRateStore(half_life=5, capacity=2)
+    rng = np.random.default_rng(0)
+    users = rng.integers(0, 50, 2_000).astype(str)
+    accepted = rng.random(2_000) < 0.3
+    store.update(users[:1_000], accepted[:1_000])
+    before = store.rates(np.unique(users[:1_000]))
+    store.update(np.char.add("new", users[1_000:]), accepted[1_000:])
+    np.testing.assert_array_equal(store.rates(np.unique(users[:1_000])), before)
+
+
+def test_matches_sequential_ewma():
+    store = AcceptanceRateStore(half_life=3, capacity=1)
+    rng = np.random.default_rng(1)
+    users = rng.integers(0, 5, 300).astype(str)
+    accepted = (rng.random(300) < 0.6).astype(int)
+    for start in range(0, 300, 37):
+        store.update(users[start:start + 37], accepted[start:start + 37])
+
+    acc, wt = {}, {}
+    for u, a in zip(users, accepted):
+        acc[u] = acc.get(u, 0.0) * store.decay + a
+        wt[u] = wt.get(u, 0.0) * store.decay + 1
+    uniq = sorted(acc)
+    expected = [acc[u] / wt[u] for u in uniq]
+    np.testing.assert_allclose(store.rates(uniq), expected, rtol=1e-5)
+
+
+def test_unknown_users_get_default_rate():
+    store = AcceptanceRateStore(default_rate=0.4)
+    store.update(["a"], [1])
+    np.testing.assert_array_equal(store.rates(["zz", "a"]), [0.4, 1.0])
+    assert len(store) == 1
@@ -0,0 +1,77 @@
+"""Vectorized extract_matched_pairs against the original per-cluster loop."""
+
+import os
+import sys
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.commute_overlap_model import (
+    build_feature_matrix, extract_matched_pairs, load_data, run_dbscan
+)
+from utils.geo_utils import haversine_distance
+
+
+def reference_pairs(df: pd.DataFrame, labels: np.ndarray, time_window_min: int = 15,
+                    max_dist_km: float = 5.0) -> pd.DataFrame:
+    """The combinations / iterrows implementation extract_matched_pairs replaced."""
+    df = df.copy()
+    df["cluster"] = labels
+    pairs = []
+    for cluster_id in sorted(set(labels)):
+        if cluster_id == -1:
+            continue
+        group = df[df["cluster"] == cluster_id]
+        if len(group) < 2:
+            continue
+        for (_, r1), (_, r2) in combinations(group.iterrows(), 2):
+            td = abs(r1["commute_time_minutes"] - r2["commute_time_minutes"])
+            if td > time_window_min:
+                continue
+            dist = haversine_distance(r1["home_lat"], r1["home_lon"],
+                                      r2["home_lat"], r2["home_lon"])
+            if dist > max_dist_km:
+                continue
+            pairs.append({
+                "cluster":      cluster_id,
+                "user_1":       r1["user_id"],
+                "user_2":       r2["user_id"],
+                "time_diff":    td,
+                "home_dist_km": round(dist, 3),
+                "overlap_prob": round(1 - td / time_window_min * 0.5 - dist / max_dist_km * 0.5, 4),
+            })
+    return pd.DataFrame(pairs)
+
+
+def sample(n: int, seed: int) -> tuple:
+    df = load_data(sample_n=n).sample(frac=1, random_state=seed)   # shuffled, non-range index
+    X, _ = build_feature_matrix(df)
+    return df, run_dbscan(X, eps=0.4, min_samples=4)
+
+
+@pytest.mark.parametrize("n, seed", [(500, 0), (2_000, 1)])
+def test_pairs_identical_to_reference(n, seed):
+    df, labels = sample(n, seed)
+    expected = reference_pairs(df, labels)
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(extract_matched_pairs(df, labels), expected)
+
+
+def test_thresholds_and_small_chunks():
+    df, labels = sample(800, 2)
+    expected = reference_pairs(df, labels, time_window_min=5, max_dist_km=2.0)
+    got = extract_matched_pairs(df, labels, time_window_min=5, max_dist_km=2.0, chunk_pairs=97)
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_all_noise_gives_no_pairs():
+    df, _ = sample(200, 3)
+    pairs = extract_matched_pairs(df, np.full(len(df), -1))
+    assert pairs.empty and reference_pairs(df, np.full(len(df), -1)).empty
+    assert list(pairs.columns) == ["cluster", "user_1", "user_2", "time_diff",
+                                   "home_dist_km", "overlap_prob"]
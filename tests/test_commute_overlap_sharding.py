@@ -0,0 +1,67 @@
+"""Sharded Model 1 clustering must reproduce a single global run."""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from models.commute_overlap_model import (
+    build_feature_matrix, density_eps, extract_matched_pairs, run_dbscan_sparse
+)
+from models.commute_overlap_sharding import run_sharded
+from bench_overlap_scaling import synthetic_users
+
+PAIR_COLS = ["user_1", "user_2", "time_diff", "home_dist_km", "overlap_prob"]
+
+
+def global_run(df: pd.DataFrame, eps: float) -> tuple:
+    X, _ = build_feature_matrix(df)
+    labels = run_dbscan_sparse(X, eps=eps, min_samples=5)
+    return labels, extract_matched_pairs(df, labels)
+
+
+def sorted_pairs(pairs: pd.DataFrame) -> pd.DataFrame:
+    return pairs[PAIR_COLS].sort_values(["user_1", "user_2"], ignore_index=True)
+
+
+@pytest.mark.parametrize("n, eps, seed", [(4_000, 0.4, 0), (4_000, 0.2, 1), (6_000, 0.12, 2)])
+def test_pairs_and_labels_match_global_run(n, eps, seed):
+    df = synthetic_users(n, seed)
+    labels, pairs = global_run(df, eps)
+    result = run_sharded(df, eps=eps, max_workers=1)
+
+    assert result["n_shards"] > 1
+    pd.testing.assert_frame_equal(sorted_pairs(result["matched_pairs"]), sorted_pairs(pairs))
+    # Same partition up to renumbering: the label pairs form a bijection
+    both = pd.DataFrame({"g": labels, "s": result["labels"]}).drop_duplicates()
+    assert ((both["g"] == -1) == (both["s"] == -1)).all()
+    assert both["g"].is_unique and both["s"].is_unique
+
+
+def test_process_pool_matches_serial():
+    df = synthetic_users(2_000, 3)
+    serial = run_sharded(df, eps=0.3, max_workers=1)
+    pooled = run_sharded(df, eps=0.3, max_workers=2)
+    np.testing.assert_array_equal(serial["labels"], pooled["labels"])
+    pd.testing.assert_frame_equal(serial["matched_pairs"], pooled["matched_pairs"])
+
+
+def test_duplicate_user_ids_rejected():
+    df = synthetic_users(100, 4)
+    df.loc[1, "user_id"] = df.loc[0, "user_id"]
+    with pytest.raises(ValueError, match="unique"):
+        run_sharded(df, max_workers=1)
+
+
+def test_default_eps_follows_density():
+    df = synthetic_users(3_000, 5)
+    labels, pairs = global_run(df, density_eps(len(df)))
+    result = run_sharded(df, max_workers=1)
+    assert result["n_clusters"] == len(set(labels.tolist()) - {-1}) > 1
+    pd.testing.assert_frame_equal(sorted_pairs(result["matched_pairs"]), sorted_pairs(pairs))
@@ -0,0 +1,60 @@
+"""Bounded-cost clustering metrics in utils/evaluation_metrics.py."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.evaluation_metrics import clustering_quality, stratified_sample_indices
+
+
+def blob_labels(n_clusters: int, n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    sizes = rng.multinomial(n - 2 * n_clusters, np.ones(n_clusters) / n_clusters) + 2
+    return rng.permutation(np.repeat(np.arange(n_clusters), sizes))
+
+
+@pytest.mark.parametrize("n_clusters, sample_size", [(5, 1_000), (300, 1_000), (499, 1_000),
+                                                     (20_000, 1_000), (20_000, 7)])
+def test_sample_size_is_a_hard_cap(n_clusters, sample_size):
+    labels = blob_labels(n_clusters, 100_000)
+    idx = stratified_sample_indices(labels, sample_size, np.random.default_rng(0))
+    assert len(idx) <= sample_size
+    assert len(np.unique(idx)) == len(idx)
+    per_cluster = np.bincount(labels[idx])
+    assert (per_cluster[per_cluster > 0] >= 2).all()
+    if 2 * n_clusters <= sample_size:
+        assert len(idx) == sample_size
+        assert (per_cluster > 0).sum() == n_clusters
+
+
+def test_sample_follows_cluster_proportions():
+    labels = np.repeat([0, 1, 2], [80_000, 15_000, 5_000])
+    idx = stratified_sample_indices(labels, 1_000, np.random.default_rng(1))
+    np.testing.assert_array_equal(np.bincount(labels[idx]), [800, 150, 50])
+
+
+def test_small_input_is_returned_whole():
+    labels = np.array([0, 0, 1, 1])
+    np.testing.assert_array_equal(stratified_sample_indices(labels, 10, np.random.default_rng()),
+                                  np.arange(4))
+
+
+def test_quality_with_many_clusters_is_bounded_and_seeded():
+    rng = np.random.default_rng(2)
+    labels = blob_labels(20_000, 200_000)
+    X = rng.normal(size=(len(labels), 3)) + labels[:, None] * 0.01
+    first = clustering_quality(X, labels, sample_size=500, n_repeats=3, seed=7)
+    again = clustering_quality(X, labels, sample_size=500, n_repeats=3, seed=7)
+    assert first["silhouette_score"] is not None and first == again
+
+
+def test_unscorable_sample_reports_none():
+    X = np.random.default_rng(3).normal(size=(1_000, 2))
+    labels = np.repeat([0, 1], 500)
+    metrics = clustering_quality(X, labels, sample_size=2, n_repeats=2)
+    assert metrics["silhouette_score"] is None and metrics["n_clusters"] == 2
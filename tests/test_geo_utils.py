@@ -0,0 +1,28 @@
+"""Vectorized haversine helpers in utils/geo_utils.py."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.geo_utils import (
+    haversine_distance, haversine_many_to_many, haversine_one_to_many, haversine_paired
+)
+
+LATS = np.array([28.61, 28.55, 28.70, 28.48])
+LONS = np.array([77.21, 77.10, 77.30, 77.05])
+
+
+@pytest.mark.parametrize("dtype", [np.float32, "float32", np.dtype("float32"), np.float64, "float64"])
+def test_dtype_accepts_any_spelling(dtype):
+    expected = [haversine_distance(28.6, 77.2, a, b) for a, b in zip(LATS, LONS)]
+    one = haversine_one_to_many(28.6, 77.2, LATS, LONS, dtype=dtype)
+    paired = haversine_paired(28.6, 77.2, LATS, LONS, dtype=dtype)
+    full = haversine_many_to_many([28.6], [77.2], LATS, LONS, dtype=dtype)[0]
+    for result in (one, paired, full):
+        assert result.dtype == np.dtype(dtype)
+        np.testing.assert_allclose(result, expected, rtol=1e-3, atol=0.01)
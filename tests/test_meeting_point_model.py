@@ -0,0 +1,85 @@
+"""Carpool grouping and batch meeting points in models/meeting_point_model.py."""
+
+import os
+import sys
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.commute_overlap_model import (
+    build_feature_matrix, density_eps, extract_matched_pairs, load_data, run_dbscan_sparse
+)
+from models.meeting_point_model import (
+    BATCH_COLUMNS, build_carpool_groups, pad_groups, suggest_meeting_points_batch
+)
+from utils.geo_utils import haversine_distance
+
+TIME_WINDOW_MIN, MAX_DIST_KM = 15, 5.0
+
+
+@pytest.fixture(scope="module")
+def matched():
+    df = load_data(sample_n=2_000)
+    X, _ = build_feature_matrix(df)
+    labels = run_dbscan_sparse(X, eps=density_eps(len(df)), min_samples=5)
+    return df, extract_matched_pairs(df, labels, TIME_WINDOW_MIN, MAX_DIST_KM)
+
+
+@pytest.mark.parametrize("max_group_size", [2, 4, 6])
+def test_every_member_pair_is_matched(matched, max_group_size):
+    df, pairs = matched
+    groups = build_carpool_groups(pairs, df, max_group_size=max_group_size)
+    matched_set = set(zip(pairs["user_1"], pairs["user_2"]))
+
+    assert len(groups) and groups["user_id"].is_unique
+    sizes = groups.groupby("group_id").size()
+    assert sizes.between(2, max_group_size).all()
+    for _, members in groups.groupby("group_id"):
+        for a, b in combinations(members.itertuples(index=False), 2):
+            assert (a.user_id, b.user_id) in matched_set or (b.user_id, a.user_id) in matched_set
+            assert abs(a.commute_time_minutes - b.commute_time_minutes) <= TIME_WINDOW_MIN
+            assert haversine_distance(a.home_lat, a.home_lon, b.home_lat, b.home_lon) <= MAX_DIST_KM
+
+
+def test_chain_is_not_one_group():
+    users = pd.DataFrame({"user_id": list("abc"), "home_lat": [28.60, 28.63, 28.66],
+                          "home_lon": [77.2] * 3, "commute_time_minutes": [480, 490, 500]})
+    pairs = pd.DataFrame({"user_1": ["a", "b"], "user_2": ["b", "c"]})
+    groups = build_carpool_groups(pairs, users)
+    assert groups.groupby("group_id").size().tolist() == [2]
+
+
+def test_no_pairs_gives_no_groups():
+    users = pd.DataFrame({"user_id": ["a"], "home_lat": [28.6], "home_lon": [77.2],
+                          "commute_time_minutes": [480]})
+    groups = build_carpool_groups(pd.DataFrame({"user_1": [], "user_2": []}), users)
+    assert groups.empty and list(groups.columns)[0] == "group_id"
+    assert np.issubdtype(groups["group_id"].dtype, np.integer)
+
+
+HUBS = [{"name": "Rajiv Chowk Metro", "lat": 28.6328, "lon": 77.2197},
+        {"name": "Saket Metro",       "lat": 28.5265, "lon": 77.2154},
+        {"name": "Inderlok Metro",    "lat": 28.6735, "lon": 77.1601}]
+
+
+@pytest.mark.parametrize("solver", [True, False])
+def test_batch_meeting_points(solver):
+    groups = [[(28.60, 77.20), (28.62, 77.22)], [(28.52, 77.21), (28.53, 77.22), (28.54, 77.20)]]
+    result = suggest_meeting_points_batch(groups, hubs=HUBS, solver=solver, k_hubs=2, snap_k=2,
+                                          chunk_size=1)
+    assert list(result.columns) == BATCH_COLUMNS
+    assert result["group"].tolist() == [0, 1]
+    assert (result["score"] >= result["pickup_score"]).all()
+    assert set(result["pickup_name"]) <= {h["name"] for h in HUBS}
+
+
+def test_no_groups_gives_empty_frame():
+    lats, lons, mask = pad_groups([])
+    assert lats.shape == lons.shape == mask.shape == (0, 0)
+    result = suggest_meeting_points_batch([], hubs=HUBS)
+    assert result.empty and list(result.columns) == BATCH_COLUMNS
@@ -0,0 +1,62 @@
+"""Send-time smoothing in models/notification_smoothing.py."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.notification_smoothing import (
+    load_profile, min_feasible_capacity, smooth_send_times, smoothing_report
+)
+
+
+def peaky_minutes(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    peaks = rng.choice([375, 420, 480], size=n)
+    return np.clip(peaks + rng.normal(0, 4, n), 0, 1439).astype(np.int16)
+
+
+@pytest.mark.parametrize("window", [1, 5, 15])
+def test_shift_bounded_by_window(window):
+    pred = peaky_minutes(5_000)
+    out = smooth_send_times(pred, window)
+    assert out.dtype == np.int16 and out.shape == pred.shape
+    assert np.abs(out.astype(int) - pred).max() <= window
+
+
+@pytest.mark.parametrize("capacity", [None, 60, 120])
+def test_feasible_capacity_is_respected(capacity):
+    pred = peaky_minutes(5_000, seed=1)
+    window = 15
+    assert capacity is None or capacity >= min_feasible_capacity(load_profile(pred), window)
+    out = smooth_send_times(pred, window, capacity)
+    cap = capacity or min_feasible_capacity(load_profile(pred), window)
+    assert load_profile(out).max() <= cap
+    assert load_profile(out).sum() == len(pred)
+
+
+def test_edges_of_the_day_stay_in_range():
+    pred = np.array([0] * 50 + [1439] * 50, dtype=np.int16)
+    out = smooth_send_times(pred, window=10)
+    assert out.min() >= 0 and out.max() <= 1439
+    assert load_profile(out).max() <= min_feasible_capacity(load_profile(pred), 10)
+
+
+def test_infeasible_cap_keeps_excess_at_predicted_minute():
+    pred = np.full(100, 600, dtype=np.int16)
+    out = smooth_send_times(pred, window=2, capacity=10)
+    profile = load_profile(out)
+    # Five reachable minutes take 10 users each; the other 50 stay put
+    assert np.abs(out.astype(int) - 600).max() <= 2
+    assert profile[598:603].tolist() == [10, 10, 60, 10, 10]
+    assert smoothing_report(pred, out)["moved"] == 40
+
+
+def test_empty_prediction():
+    out = smooth_send_times(np.array([], dtype=np.int16))
+    assert out.dtype == np.int16 and len(out) == 0
+    assert smoothing_report([], out)["peak_after"] == 0
@@ -0,0 +1,34 @@
+"""Radius and nearest-neighbour queries in utils/spatial_index.py."""
+
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.geo_utils import haversine_one_to_many
+from utils.spatial_index import SpatialIndex
+
+LATS = np.array([28.600, 28.601, 28.700, 28.701])
+LONS = np.array([77.200, 77.201, 77.300, 77.301])
+
+
+def test_query_radius_distances_are_one_per_query():
+    index = SpatialIndex(LATS, LONS)
+    # Every query has exactly two hits: a 2-D array would be easy to build by mistake
+    positions, dists = index.query_radius(LATS, LONS, 1.0, return_distance=True, sort_results=True)
+    assert dists.shape == positions.shape == (len(LATS),)
+    for i, (pos, d) in enumerate(zip(positions, dists)):
+        assert len(pos) == len(d) == 2
+        np.testing.assert_allclose(d, haversine_one_to_many(LATS[i], LONS[i], LATS[pos], LONS[pos]))
+
+
+def test_query_radius_flat_matches_per_query_lists():
+    index = SpatialIndex(LATS, LONS)
+    query_pos, index_pos, dist_km = index.query_radius_flat(LATS, LONS, 1.0)
+    positions = index.query_radius(LATS, LONS, 1.0)
+    assert np.bincount(query_pos).tolist() == [len(p) for p in positions]
+    assert sorted(zip(query_pos, index_pos)) == sorted((q, p) for q, ps in enumerate(positions) for p in ps)
+    assert (dist_km < 1.0).all()
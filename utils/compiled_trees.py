@@ -0,0 +1,394 @@
+"""
+compiled_trees.py
+-----------------
+Flattens trained tree ensembles (Random Forest, Gradient Boosting, XGBoost —
+classifiers or regressors, optionally behind a StandardScaler) into a few
+compact NumPy node arrays and evaluates them vectorized over rows × trees.
+
+The scaler is folded into the split thresholds (x_scaled <= t  ⇔
+x <= t·scale + mean), so compiled models take raw features directly. Both
+sklearn and XGBoost compare float32-rounded inputs, so each threshold is first
+moved to the float64 boundary that rounding implies; predictions then match
+the original pipeline to float tolerance. The artifact is a directory of .npy
+files plus meta.json that loads memory-mapped.
+
+    compiled = compile_pipeline(pipeline, FEATURE_COLS)
+    compiled.save(path)
+    compiled = CompiledTreeEnsemble.load(path)
+    compiled.score(X)   # P(class 1) for classifiers, prediction for regressors
+"""
+
+import json
+import os
+from functools import lru_cache
+
+import joblib
+import numpy as np
+from sklearn.ensemble import (
+    GradientBoostingClassifier, GradientBoostingRegressor,
+    RandomForestClassifier, RandomForestRegressor
+)
+
+from utils.inference import PipelineScorer, features_to_array
+
+try:
+    import xgboost as xgb
+    HAS_XGB = True
+except ImportError:
+    HAS_XGB = False
+
+ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+HEAP_MAX_DEPTH = 12      # deeper ensembles are walked node by node instead
+CHUNK_WALKERS = 32_768   # (row, tree) pairs evaluated per vectorized step
+
+
+class CompiledTreeEnsemble:
+    """
+    Tree ensemble as flat node arrays.
+
+    Node i of the ensemble splits on `feature[i]` (-1 for leaves) at
+    `threshold[i]`, going to `left[i]` when x <= threshold (x < threshold if
+    `strict`) and to `right[i]` otherwise; leaves carry `value[i]`. `roots`
+    holds each tree's first node.
+
+    The ensemble output is `base + sum(value)` (`aggregate="sum"`) or
+    `base + mean(value)` (`"mean"`), passed through a sigmoid when
+    `link="logistic"`.
+
+    Ensembles up to HEAP_MAX_DEPTH deep are scored through a padded heap
+    layout (fixed number of steps, no leaf checks); deeper ones walk the node
+    arrays directly.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, n_features: int,
+                 aggregate: str = "sum", link: str = "identity", base: float = 0.0,
+                 strict: bool = False, max_depth: int = None, feature_names: list = None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.n_features = int(n_features)
+        self.aggregate = aggregate
+        self.link = link
+        self.base = float(base)
+        self.strict = bool(strict)
+        self.max_depth = int(max_depth) if max_depth is not None else self._depth()
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self._heap = None
+
+    def _depth(self) -> int:
+        """Longest root-to-leaf path (number of splits)."""
+        depth, nodes = 0, np.asarray(self.roots)
+        while True:
+            inner = nodes[self.feature[nodes] >= 0]
+            if not len(inner):
+                return depth
+            nodes = np.concatenate([self.left[inner], self.right[inner]])
+            depth += 1
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _heap_layout(self) -> tuple:
+        """
+        The ensemble re-laid as perfect binary trees of depth `max_depth` in
+        heap order (children of slot p at 2p+1, 2p+2), built on first use.
+
+        Leaves above the full depth become pass-through splits (threshold +inf,
+        always left) whose subtree leaves all carry the leaf's value, so every
+        row takes exactly `max_depth` steps with no leaf checks.
+        """
+        if self._heap is None:
+            n_trees, depth = self.n_trees, self.max_depth
+            n_inner = 2 ** depth - 1
+            feature = np.zeros((n_trees, n_inner), dtype=np.intp)
+            threshold = np.full((n_trees, n_inner), np.inf)
+            src = np.asarray(self.roots)[:, None]
+            for d in range(depth):
+                level = slice(2 ** d - 1, 2 ** (d + 1) - 1)
+                f = np.asarray(self.feature)[src]
+                inner = f >= 0
+                feature[:, level] = np.where(inner, f, 0)
+                threshold[:, level] = np.where(inner, np.asarray(self.threshold)[src], np.inf)
+                left = np.where(inner, np.asarray(self.left)[src], src)
+                right = np.where(inner, np.asarray(self.right)[src], src)
+                src = np.stack([left, right], axis=2).reshape(n_trees, -1)
+            value = np.asarray(self.value)[src]
+            self._heap = (feature.ravel(), threshold.ravel(), value.ravel())
+        return self._heap
+
+    def raw_score(self, X, chunk_rows: int = None) -> np.ndarray:
+        """
+        Ensemble output before the link function, one value per row.
+
+        X is an array in feature order, or — when the ensemble knows its
+        `feature_names` — anything features_to_array accepts (dict, DataFrame).
+        """
+        if self.feature_names is not None:
+            X = features_to_array(X, self.feature_names)
+        else:
+            X = np.asarray(X, dtype=float)
+            X = X[None, :] if X.ndim == 1 else X
+            if X.shape[1] != self.n_features:
+                raise ValueError(f"expected {self.n_features} features, got {X.shape[1]}")
+
+        chunk_rows = chunk_rows or max(1, CHUNK_WALKERS // self.n_trees)
+        walk = self._walk_heap if self.max_depth <= HEAP_MAX_DEPTH else self._walk_nodes
+        out = np.empty(len(X))
+        for start in range(0, len(X), chunk_rows):
+            rows = np.ascontiguousarray(X[start:start + chunk_rows])
+            leaf = walk(rows).reshape(self.n_trees, len(rows))
+            out[start:start + len(rows)] = leaf.mean(axis=0) if self.aggregate == "mean" else leaf.sum(axis=0)
+        return out + self.base
+
+    def _walk_heap(self, rows: np.ndarray) -> np.ndarray:
+        """Leaf values for every (tree, row), tree-major, via the heap layout."""
+        feature, threshold, value = self._heap_layout()
+        n, n_trees, n_inner = len(rows), self.n_trees, 2 ** self.max_depth - 1
+        x = rows.ravel()
+        tree = np.repeat(np.arange(n_trees, dtype=np.intp), n)
+        row_base = np.tile(np.arange(n, dtype=np.intp) * self.n_features, n_trees)
+        # k is a global slot (tree·n_inner + p); a step maps p → 2p+1+go_right
+        step = 1 - tree * n_inner
+        k = tree * n_inner
+        col, go_right = np.empty_like(k), np.empty(len(k), dtype=bool)
+        compare = np.greater_equal if self.strict else np.greater
+        for _ in range(self.max_depth):
+            np.take(feature, k, out=col)
+            col += row_base
+            compare(x.take(col), threshold.take(k), out=go_right)
+            k *= 2
+            k += step
+            k += go_right
+        # Leaf slot p - n_inner of tree t sits at t·(n_inner+1) + p - n_inner
+        return value.take(k + tree - n_inner)
+
+    def _walk_nodes(self, rows: np.ndarray) -> np.ndarray:
+        """Leaf values for every (tree, row), tree-major, following child links."""
+        feature = np.asarray(self.feature)
+        threshold = np.asarray(self.threshold)
+        left, right = np.asarray(self.left), np.asarray(self.right)
+        n = len(rows)
+        x = rows.ravel()
+        node = np.repeat(np.asarray(self.roots), n)
+        row_base = np.tile(np.arange(n) * self.n_features, self.n_trees)
+        # One vectorized step per tree level over the walkers not yet at a leaf
+        active = np.flatnonzero(feature[node] >= 0)
+        while active.size:
+            cur = node[active]
+            xv = x[row_base[active] + feature[cur]]
+            go_left = xv < threshold[cur] if self.strict else xv <= threshold[cur]
+            nxt = np.where(go_left, left[cur], right[cur])
+            node[active] = nxt
+            active = active[feature[nxt] >= 0]
+        return np.asarray(self.value)[node]
+
+    def score(self, X) -> np.ndarray:
+        """P(class 1) for classifiers (logistic link / averaged probabilities), else predictions."""
+        raw = self.raw_score(X)
+        return 1.0 / (1.0 + np.exp(-raw)) if self.link == "logistic" else raw
+
+    def score_one(self, features) -> float:
+        """Score a single request (dict or sequence of feature values)."""
+        return float(self.score(features)[0])
+
+    # ── persistence ────────────────────────────────────────────────────────────
+
+    def save(self, path: str) -> str:
+        """Write the node arrays (.npy) and meta.json into directory `path`."""
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), np.asarray(getattr(self, name)))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"n_features": self.n_features, "aggregate": self.aggregate,
+                       "link": self.link, "base": self.base, "strict": self.strict,
+                       "max_depth": self.max_depth, "feature_names": self.feature_names},
+                      f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CompiledTreeEnsemble":
+        """Load a saved ensemble, memory-mapping the node arrays by default."""
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+                  for name in ARRAYS}
+        return cls(**arrays, **meta)
+
+
+# ── exporters ──────────────────────────────────────────────────────────────────
+
+def _concat_trees(trees: list, n_features: int, **kwargs) -> CompiledTreeEnsemble:
+    """Join per-tree (feature, threshold, left, right, value) arrays into one ensemble."""
+    offsets = np.cumsum([0] + [len(t[0]) for t in trees[:-1]])
+    feature, threshold, left, right, value = ([] for _ in range(5))
+    for off, (f, t, l, r, v) in zip(offsets, trees):
+        leaf = f < 0
+        feature.append(np.where(leaf, -1, f).astype(np.int32))
+        threshold.append(np.where(leaf, 0.0, t))
+        left.append(np.where(leaf, -1, l + off).astype(np.int32))
+        right.append(np.where(leaf, -1, r + off).astype(np.int32))
+        value.append(v.astype(float))
+    return CompiledTreeEnsemble(np.concatenate(feature), np.concatenate(threshold),
+                                np.concatenate(left), np.concatenate(right),
+                                np.concatenate(value), offsets.astype(np.int32),
+                                n_features, **kwargs)
+
+
+def _sklearn_tree(tree, leaf_value: np.ndarray) -> tuple:
+    t = tree.tree_
+    return t.feature, t.threshold, t.children_left, t.children_right, leaf_value
+
+
+def compile_estimator(est, n_features: int) -> CompiledTreeEnsemble:
+    """Compile a fitted tree-ensemble estimator (no scaler, features in training order)."""
+    if isinstance(est, RandomForestClassifier):
+        if len(est.classes_) != 2:
+            raise ValueError("only binary classifiers are supported")
+        trees = []
+        for tree in est.estimators_:
+            counts = tree.tree_.value[:, 0, :]
+            trees.append(_sklearn_tree(tree, counts[:, 1] / counts.sum(axis=1)))
+        return _concat_trees(trees, n_features, aggregate="mean")
+
+    if isinstance(est, RandomForestRegressor):
+        trees = [_sklearn_tree(t, t.tree_.value[:, 0, 0]) for t in est.estimators_]
+        return _concat_trees(trees, n_features, aggregate="mean")
+
+    if isinstance(est, (GradientBoostingClassifier, GradientBoostingRegressor)):
+        if est.estimators_.shape[1] != 1:
+            raise ValueError("only binary / single-output gradient boosting is supported")
+        lr = est.learning_rate
+        trees = [_sklearn_tree(t, lr * t.tree_.value[:, 0, 0]) for t in est.estimators_[:, 0]]
+        # Constant initial prediction, recovered through the public API
+        x0 = np.zeros((1, n_features))
+        raw0 = est.decision_function(x0) if hasattr(est, "decision_function") else est.predict(x0)
+        tree_sum = lr * sum(float(tr.predict(x0)[0]) for tr in est.estimators_[:, 0])
+        base = float(np.ravel(raw0)[0]) - tree_sum
+        link = "logistic" if isinstance(est, GradientBoostingClassifier) else "identity"
+        return _concat_trees(trees, n_features, aggregate="sum", link=link, base=base)
+
+    if HAS_XGB and isinstance(est, (xgb.XGBClassifier, xgb.XGBRegressor)):
+        return _compile_xgboost(est, n_features)
+
+    raise TypeError(f"cannot compile {type(est).__name__}")
+
+
+def _compile_xgboost(est, n_features: int) -> CompiledTreeEnsemble:
+    """Compile an XGBoost binary classifier / regressor from its JSON tree dump."""
+    booster = est.get_booster()
+    names = booster.feature_names or [f"f{i}" for i in range(n_features)]
+    position = {name: i for i, name in enumerate(names)}
+
+    trees = []
+    for dump in booster.get_dump(dump_format="json"):
+        nodes, stack = {}, [json.loads(dump)]
+        while stack:
+            node = stack.pop()
+            nodes[node["nodeid"]] = node
+            stack.extend(node.get("children", []))
+        n = max(nodes) + 1
+        f, t = np.full(n, -1), np.zeros(n)
+        l, r, v = np.full(n, -1), np.full(n, -1), np.zeros(n)
+        for i, node in nodes.items():
+            if "leaf" in node:
+                v[i] = node["leaf"]
+            else:
+                f[i] = position[node["split"]]
+                t[i] = node["split_condition"]
+                l[i], r[i] = node["yes"], node["no"]
+        trees.append((f, t, l, r, v))
+
+    config = json.loads(booster.save_config())
+    base = float(str(config["learner"]["learner_model_param"]["base_score"]).strip("[]"))
+    objective = config["learner"]["objective"]["name"]
+    if objective == "binary:logistic":
+        return _concat_trees(trees, n_features, aggregate="sum", link="logistic",
+                             base=float(np.log(base / (1.0 - base))), strict=True)
+    if objective.startswith("reg:squarederror") or objective == "reg:linear":
+        return _concat_trees(trees, n_features, aggregate="sum", base=base, strict=True)
+    raise ValueError(f"unsupported XGBoost objective: {objective}")
+
+
+def _float32_boundary(threshold: np.ndarray, strict: bool) -> np.ndarray:
+    """
+    Float64 bound b with  [float32(x) <= t]  (or  [float32(x) < t]  if strict)
+    ⇔  x < b  — the midpoint between the last float32 value taking the left
+    branch and the next float32 value.
+    """
+    t32 = threshold.astype(np.float32)
+    if strict:
+        t32 = np.nextafter(t32, np.float32(-np.inf))
+    else:
+        too_big = t32.astype(float) > threshold
+        t32[too_big] = np.nextafter(t32[too_big], np.float32(-np.inf))
+    above = np.nextafter(t32, np.float32(np.inf))
+    return (t32.astype(float) + above.astype(float)) / 2.0
+
+
+def compile_pipeline(pipeline, feature_names: list) -> CompiledTreeEnsemble:
+    """
+    Compile a fitted `[StandardScaler →] tree ensemble` pipeline.
+
+    The scaler is folded into the thresholds and feature indices are remapped
+    to `feature_names` order, so the result scores raw feature arrays in that
+    order exactly like pipeline.predict_proba(...)[:, 1] / pipeline.predict(...).
+    """
+    unpacked = PipelineScorer(pipeline, feature_names, n_jobs=None)
+    compiled = compile_estimator(unpacked.estimator, len(feature_names))
+
+    inner = compiled.feature >= 0
+    f = compiled.feature[inner]
+    bound = _float32_boundary(compiled.threshold[inner], compiled.strict)
+    compiled.threshold = compiled.threshold.copy()
+    compiled.threshold[inner] = bound * unpacked._scale[f] + unpacked._mean[f]
+    compiled.feature = compiled.feature.copy()
+    compiled.feature[inner] = unpacked._order[f]
+    compiled.strict = True
+    compiled.feature_names = list(feature_names)
+    return compiled
+
+
+def is_compilable(pipeline) -> bool:
+    """True if the pipeline's final estimator is a supported tree ensemble."""
+    est = pipeline.steps[-1][1] if hasattr(pipeline, "steps") else pipeline
+    types = (RandomForestClassifier, RandomForestRegressor,
+             GradientBoostingClassifier, GradientBoostingRegressor)
+    if HAS_XGB:
+        types += (xgb.XGBClassifier, xgb.XGBRegressor)
+    return isinstance(est, types)
+
+
+# ── loading ────────────────────────────────────────────────────────────────────
+
+def compiled_path_for(path: str) -> str:
+    """Directory of the compiled tree artifact saved next to a .joblib model."""
+    return os.path.splitext(path)[0] + "_compiled"
+
+
+@lru_cache(maxsize=8)
+def _load_scorer(path: str, mtime: float, feature_names: tuple, use_compiled: bool):
+    if use_compiled:
+        return CompiledTreeEnsemble.load(compiled_path_for(path))
+    return PipelineScorer(joblib.load(path), list(feature_names))
+
+
+def load_scorer(path: str, feature_names: list, compiled: bool = True):
+    """
+    Scorer for a saved .joblib pipeline, cached per process and reloaded only
+    if the file changes. Prefers the compiled tree artifact next to it when
+    that is at least as new as the pipeline.
+
+    Returns:
+        CompiledTreeEnsemble or PipelineScorer (both expose score / score_one).
+    """
+    path = os.path.abspath(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No trained model at {path}")
+    mtime = os.path.getmtime(path)
+    meta = os.path.join(compiled_path_for(path), "meta.json")
+    use_compiled = compiled and os.path.exists(meta) and os.path.getmtime(meta) >= mtime
+    return _load_scorer(path, mtime, tuple(feature_names), use_compiled)
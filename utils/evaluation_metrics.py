@@ -1,15 +1,19 @@
 """
 evaluation_metrics.py
 ---------------------
-Reusable evaluation functions for classification and regression models
-used across CommuteSync AI components.
+Reusable evaluation functions for classification, regression and clustering
+models used across CommuteSync AI components.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+from scipy import stats
+from scipy.spatial.distance import cdist
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score,
     f1_score, roc_auc_score, confusion_matrix,
-    mean_absolute_error, mean_squared_error
+    mean_absolute_error, mean_squared_error, silhouette_score
 )
 
 
@@ -76,3 +80,150 @@ def print_regression_report(model_name: str, report: dict):
     for k, v in report.items():
         print(f"  {k:<6}: {v}")
     print(f"{'='*50}\n")
+
+
+def stratified_sample_indices(labels: np.ndarray, sample_size: int,
+                              rng: np.random.Generator) -> np.ndarray:
+    """
+    Draw at most `sample_size` row indices whose cluster proportions follow
+    `labels`, keeping at least two rows per sampled cluster so each can be scored.
+
+    When there are fewer than 2 × n_clusters rows to spend, only
+    sample_size // 2 clusters (drawn by size) are sampled, two rows each;
+    otherwise every cluster gets two rows and the rest is split by size.
+
+    Args:
+        labels:      Cluster label per row.
+        sample_size: Maximum total sample size.
+        rng:         NumPy random generator (seeded by the caller).
+
+    Returns:
+        Sorted array of sampled row indices.
+    """
+    _, inv, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    if sample_size >= len(labels):
+        return np.arange(len(labels))
+    k = len(counts)
+    if 2 * k > sample_size:
+        quota = np.zeros(k, dtype=np.int64)
+        picked = rng.choice(k, size=sample_size // 2, replace=False, p=counts / counts.sum())
+        quota[picked] = np.minimum(counts[picked], 2)
+    else:
+        quota = np.minimum(counts, 2)
+        extra = counts - quota
+        # Top each cluster up towards its proportional share, scaled to the budget
+        budget = sample_size - quota.sum()
+        share = np.clip(counts * sample_size / len(labels) - quota, 0, extra)
+        share *= budget / share.sum() if budget else 0.0
+        add = np.floor(share).astype(np.int64)
+        # Largest remainders take the rows left over after flooring
+        left = budget - add.sum()
+        add[np.argsort(add - share, kind="stable")[:left]] += 1
+        quota += np.minimum(add, extra)
+
+    # Random key per row, ranked within its cluster; keep ranks below the quota
+    order = np.lexsort((rng.random(len(labels)), inv))
+    rank = np.arange(len(labels)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.sort(order[rank < quota[inv[order]]])
+
+
+def sampled_silhouette(X: np.ndarray, labels: np.ndarray, sample_size: int = 1000,
+                       n_repeats: int = 5, seed: int = 42,
+                       confidence: float = 0.95) -> dict:
+    """
+    Silhouette score estimated on seeded, cluster-stratified samples.
+
+    Cost is O(n_repeats · sample_size²) no matter how large X is, and the same
+    seed always gives the same estimate.
+
+    Returns:
+        Dictionary with mean, ci_low, ci_high (t-interval over repeats),
+        n_repeats and sample_size.
+    """
+    rng = np.random.default_rng(seed)
+    scores = []
+    for _ in range(n_repeats):
+        idx = stratified_sample_indices(labels, sample_size, rng)
+        scores.append(silhouette_score(X[idx], labels[idx]))
+    scores = np.asarray(scores)
+
+    mean = float(scores.mean())
+    if n_repeats > 1:
+        half = float(stats.t.ppf(0.5 + confidence / 2, n_repeats - 1) * scores.std(ddof=1) / np.sqrt(n_repeats))
+    else:
+        half = 0.0
+    return {
+        "mean":        round(mean, 4),
+        "ci_low":      round(mean - half, 4),
+        "ci_high":     round(mean + half, 4),
+        "n_repeats":   n_repeats,
+        "sample_size": int(min(sample_size, len(labels))),
+    }
+
+
+def centroid_davies_bouldin(X: np.ndarray, labels: np.ndarray, block_size: int = 1024) -> float:
+    """
+    Davies–Bouldin index from per-cluster centroids and mean intra-cluster
+    distances, computed with bincount in one pass over X. The K×K centroid
+    comparison runs in row blocks so memory stays O(block_size · K).
+
+    Returns:
+        Davies–Bouldin index (lower = better separated clusters).
+    """
+    _, inv, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    k = len(counts)
+    centroids = np.column_stack([np.bincount(inv, weights=X[:, j], minlength=k)
+                                 for j in range(X.shape[1])]) / counts[:, None]
+    spread = np.bincount(inv, weights=np.linalg.norm(X - centroids[inv], axis=1),
+                         minlength=k) / counts
+
+    worst = np.zeros(k)
+    for start in range(0, k, block_size):
+        stop = min(start + block_size, k)
+        dist = cdist(centroids[start:stop], centroids)
+        dist[dist == 0] = np.inf  # also masks each cluster against itself
+        worst[start:stop] = ((spread[start:stop, None] + spread[None, :]) / dist).max(axis=1)
+    return float(worst.mean())
+
+
+def clustering_quality(X: np.ndarray, labels: np.ndarray, sample_size: int = 1000,
+                       n_repeats: int = 5, seed: int = 42) -> dict:
+    """
+    Bounded-cost clustering metrics on non-noise points (label != -1).
+
+    Returns:
+        Dictionary with n_clusters, n_noise and, when at least two clusters
+        exist, silhouette_score (+ 95% CI) and davies_bouldin_index.
+    """
+    mask = labels != -1
+    n_clusters = len(np.unique(labels[mask]))
+    metrics = {"n_clusters": n_clusters, "n_noise": int((~mask).sum())}
+
+    if n_clusters >= 2 and mask.sum() >= n_clusters + 1:
+        try:
+            sil = sampled_silhouette(X[mask], labels[mask], sample_size=sample_size,
+                                     n_repeats=n_repeats, seed=seed)
+            metrics["silhouette_score"] = sil["mean"]
+            metrics["silhouette_ci"] = (sil["ci_low"], sil["ci_high"])
+            metrics["davies_bouldin_index"] = round(centroid_davies_bouldin(X[mask], labels[mask]), 4)
+        except Exception:
+            metrics["silhouette_score"] = None
+            metrics["silhouette_ci"] = None
+            metrics["davies_bouldin_index"] = None
+    return metrics
+
+
+def clustering_quality_async(X: np.ndarray, labels: np.ndarray, executor=None, **kwargs):
+    """
+    Start clustering_quality in a background thread (NumPy / sklearn release
+    the GIL for the heavy parts) so callers can extract pairs meanwhile.
+
+    Returns:
+        concurrent.futures.Future resolving to the metrics dict.
+    """
+    if executor is not None:
+        return executor.submit(clustering_quality, X, labels, **kwargs)
+    pool = ThreadPoolExecutor(max_workers=1)
+    future = pool.submit(clustering_quality, X, labels, **kwargs)
+    pool.shutdown(wait=False)
+    return future
@@ -0,0 +1,144 @@
+"""
+feature_store.py
+----------------
+Columnar cache of the commuter dataset. The CSV is parsed once and every
+column is written as its own typed .npy file; later loads memory-map only
+the requested columns instead of re-parsing the text file.
+
+    outputs/cache/features_<sha1 of the CSV bytes>/
+        meta.json            column names, kinds and dtypes, row count
+        col<i>.npy           one array per column, by position
+        col<i>.na.npy        missing-value mask (text columns with gaps only)
+
+Numeric columns come back as read-only views of the mapped files (zero copy);
+text columns are stored as fixed-width unicode and turned into pandas strings
+on load. The content hash is memoized per (path, size, mtime), so a process
+hashes the file once and re-hashes only when it changes on disk.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "dummy_commute_data.csv")
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "outputs", "cache")
+
+
+@lru_cache(maxsize=16)
+def _cached_digest(path: str, size: int, mtime_ns: int) -> str:
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """SHA-1 of the file's bytes (memoized until its size or mtime changes)."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return _cached_digest(path, stat.st_size, stat.st_mtime_ns)
+
+
+def _column_file(store_dir: str, i: int, suffix: str = "") -> str:
+    # Positional names: column labels may not be valid file names
+    return os.path.join(store_dir, f"col{i:03d}{suffix}.npy")
+
+
+def build_store(path: str, store_dir: str) -> None:
+    """Parse `path` once and write its columns to `store_dir`."""
+    df = pd.read_csv(path)
+    tmp_dir = f"{store_dir}.tmp{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    columns = []
+    for i, (name, series) in enumerate(df.items()):
+        if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            kind = "numeric"
+            values = series.to_numpy()
+        else:
+            kind = "text"
+            missing = series.isna().to_numpy()
+            values = series.astype(object).where(~missing, "").to_numpy().astype(str)
+            if missing.any():
+                np.save(_column_file(tmp_dir, i, ".na"), missing)
+        np.save(_column_file(tmp_dir, i), values)
+        columns.append({"name": name, "kind": kind, "dtype": values.dtype.str,
+                        "has_na": kind == "text" and bool(missing.any())})
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump({"source": os.path.basename(path), "n_rows": len(df), "columns": columns}, f)
+    try:
+        os.replace(tmp_dir, store_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)   # another process built it first
+
+
+@lru_cache(maxsize=4)
+def _open_store(store_dir: str) -> tuple:
+    """meta and {name: (column position, meta entry)} for a built store."""
+    with open(os.path.join(store_dir, "meta.json")) as f:
+        meta = json.load(f)
+    return meta, {c["name"]: (i, c) for i, c in enumerate(meta["columns"])}
+
+
+def store_dir_for(path: str = DATA_PATH, cache_dir: str = CACHE_DIR) -> str:
+    """Cache directory of `path`, converting the CSV on first use."""
+    store_dir = os.path.join(os.path.abspath(cache_dir), f"features_{file_digest(path)}")
+    if not os.path.exists(os.path.join(store_dir, "meta.json")):
+        os.makedirs(os.path.abspath(cache_dir), exist_ok=True)
+        build_store(os.path.abspath(path), store_dir)
+    return store_dir
+
+
+def load_columns(path: str = DATA_PATH, columns: list = None, mmap: bool = True,
+                 cache_dir: str = CACHE_DIR) -> dict:
+    """
+    Load columns of a CSV through the columnar cache.
+
+    Args:
+        path:    Source CSV.
+        columns: Column names to load (None = all, in file order).
+        mmap:    Memory-map the .npy files (read-only, zero copy) instead of
+                 reading them into memory.
+
+    Returns:
+        {name: np.ndarray}; text columns are fixed-width unicode arrays.
+    """
+    store_dir = store_dir_for(path, cache_dir)
+    meta, by_name = _open_store(store_dir)
+    names = [c["name"] for c in meta["columns"]] if columns is None else list(columns)
+    missing = [c for c in names if c not in by_name]
+    if missing:
+        raise KeyError(f"columns not in {meta['source']}: {missing}")
+    out = {}
+    for name in names:
+        i, _ = by_name[name]
+        values = np.load(_column_file(store_dir, i), mmap_mode="r" if mmap else None,
+                         allow_pickle=False)
+        out[name] = values.view(np.ndarray) if mmap else values
+    return out
+
+
+def load_frame(path: str = DATA_PATH, columns: list = None,
+               cache_dir: str = CACHE_DIR) -> pd.DataFrame:
+    """
+    DataFrame equivalent to `pd.read_csv(path)[columns]`, built from the
+    columnar cache. Numeric columns wrap the mapped arrays without copying
+    (pandas copy-on-write keeps them read-only).
+    """
+    store_dir = store_dir_for(path, cache_dir)
+    _, by_name = _open_store(store_dir)
+    arrays = load_columns(path, columns, cache_dir=cache_dir)
+    data = {}
+    for name, values in arrays.items():
+        i, col = by_name[name]
+        if col["kind"] == "text":
+            values = pd.Series(values, dtype="str")
+            if col["has_na"]:
+                values[np.load(_column_file(store_dir, i, ".na"))] = np.nan
+        data[name] = values
+    return pd.DataFrame(data, copy=False)
@@ -2,12 +2,15 @@
 geo_utils.py
 ------------
 Utility functions for geographic computations used across CommuteSync models.
-Includes Haversine distance, centroid calculation, and coordinate normalization.
+Includes Haversine distance (scalar and NumPy-vectorized kernels), centroid
+calculation, and coordinate normalization.
 """
 
 import numpy as np
 import math
 
+EARTH_RADIUS_KM = 6371.0  # Earth's radius in kilometers
+
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -21,7 +24,7 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     Returns:
         Distance in kilometers.
     """
-    R = 6371.0  # Earth's radius in kilometers
+    R = EARTH_RADIUS_KM
 
     phi1, phi2 = math.radians(lat1), math.radians(lat2)
     dphi = math.radians(lat2 - lat1)
@@ -33,23 +36,93 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return R * c
 
 
-def haversine_matrix(coords: np.ndarray) -> np.ndarray:
+def _haversine_terms(phi1, lam1, phi2, lam2) -> np.ndarray:
+    """Haversine great-circle distance (km) for broadcastable arrays in radians."""
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin((lam2 - lam1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def haversine_paired(lats1, lons1, lats2, lons2, dtype=np.float64) -> np.ndarray:
+    """
+    Element-wise Haversine distance between two coordinate arrays of equal
+    (or NumPy-broadcastable) shape.
+
+    Args:
+        lats1, lons1: Coordinates of the first points (decimal degrees).
+        lats2, lons2: Coordinates of the second points (same / broadcastable shape).
+        dtype:        Floating dtype for the computation (np.float32 halves memory).
+
+    Returns:
+        Array of distances in kilometers, one per pair.
+    """
+    phi1, lam1, phi2, lam2 = (np.radians(np.asarray(v, dtype=dtype))
+                              for v in (lats1, lons1, lats2, lons2))
+    return _haversine_terms(phi1, lam1, phi2, lam2)
+
+
+def haversine_one_to_many(lat: float, lon: float, lats, lons, dtype=np.float64) -> np.ndarray:
+    """
+    Haversine distance from a single point to many points.
+
+    Args:
+        lat, lon:   Reference point (decimal degrees).
+        lats, lons: Arrays of target coordinates.
+        dtype:      Floating dtype for the computation.
+
+    Returns:
+        Array of distances in kilometers, shaped like `lats`.
+    """
+    phi2 = np.radians(np.asarray(lats, dtype=dtype))
+    lam2 = np.radians(np.asarray(lons, dtype=dtype))
+    return _haversine_terms(np.asarray(np.radians(lat), dtype=dtype),
+                            np.asarray(np.radians(lon), dtype=dtype), phi2, lam2)
+
+
+def haversine_many_to_many(lats1, lons1, lats2=None, lons2=None,
+                           block_size: int = 2048, dtype=np.float64) -> np.ndarray:
+    """
+    Haversine distance matrix between two point sets, computed in row blocks so
+    temporary arrays never exceed `block_size` × M elements.
+
+    Args:
+        lats1, lons1: Coordinates of the N row points (decimal degrees).
+        lats2, lons2: Coordinates of the M column points (defaults to the row points).
+        block_size:   Number of row points processed per block.
+        dtype:        Floating dtype of the computation and of the result.
+
+    Returns:
+        Distance matrix of shape (N, M) in kilometers.
+    """
+    if lats2 is None:
+        lats2, lons2 = lats1, lons1
+    phi1 = np.radians(np.asarray(lats1, dtype=dtype))
+    lam1 = np.radians(np.asarray(lons1, dtype=dtype))
+    phi2 = np.radians(np.asarray(lats2, dtype=dtype))[None, :]
+    lam2 = np.radians(np.asarray(lons2, dtype=dtype))[None, :]
+
+    out = np.empty((len(phi1), phi2.shape[1]), dtype=dtype)
+    for start in range(0, len(phi1), block_size):
+        stop = start + block_size
+        out[start:stop] = _haversine_terms(phi1[start:stop, None], lam1[start:stop, None], phi2, lam2)
+    return out
+
+
+def haversine_matrix(coords: np.ndarray, block_size: int = 2048, dtype=np.float64) -> np.ndarray:
     """
     Compute pairwise Haversine distance matrix for an array of (lat, lon) coordinates.
 
     Args:
-        coords: numpy array of shape (N, 2) with columns [lat, lon].
+        coords:     numpy array of shape (N, 2) with columns [lat, lon].
+        block_size: Rows per block (bounds temporary memory).
+        dtype:      Floating dtype of the result.
 
     Returns:
         Distance matrix of shape (N, N) in kilometers.
     """
-    n = len(coords)
-    dist_matrix = np.zeros((n, n))
-    for i in range(n):
-        for j in range(i + 1, n):
-            d = haversine_distance(coords[i, 0], coords[i, 1], coords[j, 0], coords[j, 1])
-            dist_matrix[i, j] = d
-            dist_matrix[j, i] = d
+    coords = np.asarray(coords)
+    dist_matrix = haversine_many_to_many(coords[:, 0], coords[:, 1],
+                                         block_size=block_size, dtype=dtype)
+    np.fill_diagonal(dist_matrix, 0.0)
     return dist_matrix
 
 
@@ -86,6 +159,93 @@ def weighted_midpoint(lats: list, lons: list, weights: list = None) -> tuple:
     return float(np.dot(weights, lats)), float(np.dot(weights, lons))
 
 
+def _to_unit_vectors(lats, lons) -> np.ndarray:
+    """(lat, lon) in degrees → 3-D unit vectors, shape (..., 3)."""
+    phi, lam = np.radians(lats), np.radians(lons)
+    cos_phi = np.cos(phi)
+    return np.stack([cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)], axis=-1)
+
+
+def _from_unit_vectors(v: np.ndarray) -> tuple:
+    """3-D vectors (normalized here) → (lats, lons) in degrees."""
+    v = v / np.linalg.norm(v, axis=-1, keepdims=True)
+    return (np.degrees(np.arcsin(np.clip(v[..., 2], -1.0, 1.0))),
+            np.degrees(np.arctan2(v[..., 1], v[..., 0])))
+
+
+def spherical_geometric_median(lats, lons, mask=None, max_iter: int = 20,
+                               tol_km: float = 1e-2) -> tuple:
+    """
+    Point minimizing the sum of great-circle distances to each group's points
+    (Weiszfeld iteration on unit vectors), solved for many groups at once.
+
+    Args:
+        lats, lons: Padded coordinates of shape (n_groups, n_points), or 1-D
+                    for a single group.
+        mask:       Optional bool array (same shape); False marks padding.
+        max_iter:   Iteration cap.
+        tol_km:     Stop once no group's estimate moves more than this.
+
+    Returns:
+        (median_lats, median_lons) arrays of shape (n_groups,) (scalars for 1-D input).
+    """
+    lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+    single = lats.ndim == 1
+    lats, lons = np.atleast_2d(lats), np.atleast_2d(lons)
+    mask = np.ones(lats.shape, dtype=bool) if mask is None else np.atleast_2d(mask)
+    points = _to_unit_vectors(lats, lons) * mask[..., None]
+
+    # Start from the (spherical) mean and re-weight by inverse distance; at
+    # commute scales the chord length equals the great-circle arc to ~1e-8
+    median = points.sum(axis=1)
+    median /= np.linalg.norm(median, axis=-1, keepdims=True)
+    for _ in range(max_iter):
+        d = np.linalg.norm(points - median[:, None, :], axis=-1)
+        w = np.where(mask, 1.0 / np.maximum(d, 1e-12), 0.0)
+        new = (points * w[..., None]).sum(axis=1)
+        new /= np.linalg.norm(new, axis=-1, keepdims=True)
+        step = np.linalg.norm(new - median, axis=-1) * EARTH_RADIUS_KM
+        median = new
+        if step.max() < tol_km:
+            break
+    med_lat, med_lon = _from_unit_vectors(median)
+
+    return (float(med_lat[0]), float(med_lon[0])) if single else (med_lat, med_lon)
+
+
+def spherical_minimax_point(lats, lons, mask=None, n_iter: int = 50) -> tuple:
+    """
+    Point minimizing the largest great-circle distance to each group's points
+    (approximate 1-center via Badoiu–Clarkson steps toward the farthest point),
+    solved for many groups at once.
+
+    Args:
+        lats, lons: Padded coordinates of shape (n_groups, n_points), or 1-D.
+        mask:       Optional bool array (same shape); False marks padding.
+        n_iter:     Number of steps; the error shrinks roughly as 1/sqrt(n_iter).
+
+    Returns:
+        (center_lats, center_lons) arrays of shape (n_groups,) (scalars for 1-D input).
+    """
+    lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+    single = lats.ndim == 1
+    lats, lons = np.atleast_2d(lats), np.atleast_2d(lons)
+    mask = np.ones(lats.shape, dtype=bool) if mask is None else np.atleast_2d(mask)
+    points = _to_unit_vectors(lats, lons)
+    rows = np.arange(len(lats))
+
+    center = (points * mask[..., None]).sum(axis=1)
+    center /= np.linalg.norm(center, axis=-1, keepdims=True)
+    for t in range(1, n_iter + 1):
+        # Farthest point = smallest dot product with the current center
+        far = np.where(mask, np.einsum("gpk,gk->gp", points, center), np.inf).argmin(axis=1)
+        center = center + (points[rows, far] - center) / (t + 1)
+        center /= np.linalg.norm(center, axis=-1, keepdims=True)
+
+    c_lat, c_lon = _from_unit_vectors(center)
+    return (float(c_lat[0]), float(c_lon[0])) if single else (c_lat, c_lon)
+
+
 def time_to_minutes(time_str: str) -> int:
     """
     Convert a time string (HH:MM) to minutes since midnight.
@@ -118,7 +278,8 @@ def minutes_to_time(minutes: int) -> str:
 def normalize_coords_for_clustering(lats: np.ndarray, lons: np.ndarray,
                                      times_minutes: np.ndarray,
                                      spatial_weight: float = 1.0,
-                                     temporal_weight: float = 0.5) -> np.ndarray:
+                                     temporal_weight: float = 0.5,
+                                     ref_lat: float = None) -> np.ndarray:
     """
     Combine spatial (lat/lon) and temporal (commute time) features into a
     normalized feature matrix suitable for clustering.
@@ -129,13 +290,18 @@ def normalize_coords_for_clustering(lats: np.ndarray, lons: np.ndarray,
         times_minutes: Array of commute times in minutes.
         spatial_weight: Scaling factor for spatial features.
         temporal_weight: Scaling factor for temporal features (in km-equivalent).
+        ref_lat: Latitude used for the longitude-to-km factor. Defaults to the
+                 mean of `lats`; pass a fixed value to keep features of users
+                 added later on the same scale.
 
     Returns:
         Feature matrix of shape (N, 3).
     """
     # Convert degrees to approximate km (1 degree lat ≈ 111 km)
     lat_km = lats * 111.0 * spatial_weight
-    lon_km = lons * 111.0 * np.cos(np.radians(lats.mean())) * spatial_weight
+    if ref_lat is None:
+        ref_lat = lats.mean()
+    lon_km = lons * 111.0 * np.cos(np.radians(ref_lat)) * spatial_weight
     # Scale time: each minute ≈ temporal_weight km equivalent
     time_scaled = times_minutes * temporal_weight / 60.0
     return np.column_stack([lat_km, lon_km, time_scaled])
@@ -0,0 +1,154 @@
+"""
+hub_catalog.py
+--------------
+Catalog of pickup locations (metro stations, bus stops, landmarks) loaded
+from a local CSV, Parquet or GeoJSON file. The Haversine ball tree over the
+catalog is built once, cached on disk next to the other model artifacts, and
+reused until the source file changes — so looking up the k hubs nearest to a
+group costs O(log n) however large the catalog grows.
+
+Expected columns (CSV / Parquet): name, lat, lon and optionally kind.
+GeoJSON: Point features with `name` (and optionally `kind`) properties.
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+import joblib
+import pandas as pd
+
+from utils.spatial_index import SpatialIndex
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+HUB_CATALOG_PATH = os.path.join(ROOT, "data", "transit_hubs.csv")
+CACHE_DIR = os.path.join(ROOT, "outputs", "cache")
+
+HUB_COLUMNS = ["name", "lat", "lon", "kind"]
+
+
+def _read_geojson(path: str) -> pd.DataFrame:
+    """Flatten the Point features of a GeoJSON FeatureCollection."""
+    with open(path) as f:
+        features = json.load(f).get("features", [])
+    rows = []
+    for feat in features:
+        geom = feat.get("geometry") or {}
+        if geom.get("type") != "Point":
+            continue
+        props = feat.get("properties") or {}
+        lon, lat = geom["coordinates"][:2]
+        rows.append({"name": props.get("name"), "lat": lat, "lon": lon,
+                     "kind": props.get("kind", props.get("type"))})
+    return pd.DataFrame(rows, columns=HUB_COLUMNS)
+
+
+def read_hub_file(path: str) -> pd.DataFrame:
+    """
+    Read a hub file into a clean DataFrame (name, lat, lon, kind).
+
+    The format is chosen from the extension: .csv, .parquet / .pq,
+    .geojson / .json. Rows without valid coordinates are dropped.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        df = pd.read_csv(path)
+    elif ext in (".parquet", ".pq"):
+        df = pd.read_parquet(path)
+    elif ext in (".geojson", ".json"):
+        df = _read_geojson(path)
+    else:
+        raise ValueError(f"Unsupported hub catalog format: {ext}")
+
+    missing = {"lat", "lon"} - set(df.columns)
+    if missing:
+        raise ValueError(f"Hub catalog {path} is missing columns: {sorted(missing)}")
+    if "kind" not in df.columns:
+        df["kind"] = "hub"
+    if "name" not in df.columns:
+        df["name"] = [f"Hub {i}" for i in range(len(df))]
+
+    df = df[HUB_COLUMNS].copy()
+    df["lat"] = pd.to_numeric(df["lat"], errors="coerce")
+    df["lon"] = pd.to_numeric(df["lon"], errors="coerce")
+    df = df[df["lat"].between(-90, 90) & df["lon"].between(-180, 180)]
+    df["name"] = df["name"].fillna("Unnamed hub").astype(str)
+    df["kind"] = df["kind"].fillna("hub").astype(str)
+    return df.reset_index(drop=True)
+
+
+class HubCatalog:
+    """
+    Pickup locations plus their spatial index.
+
+    Positions returned by the index index into `names`, `kinds`, `lats`, `lons`.
+    """
+
+    def __init__(self, hubs: pd.DataFrame, index: SpatialIndex = None):
+        # Fixed-width strings (not object arrays) keep the on-disk cache fast to load
+        self.names = hubs["name"].to_numpy().astype(str)
+        self.kinds = hubs["kind"].to_numpy().astype(str)
+        self.lats = hubs["lat"].to_numpy(dtype=float)
+        self.lons = hubs["lon"].to_numpy(dtype=float)
+        self.index = index or SpatialIndex(self.lats, self.lons, ids=self.names)
+
+    @classmethod
+    def from_records(cls, hubs: list) -> "HubCatalog":
+        """Build a catalog from a list of {"name", "lat", "lon"[, "kind"]} dicts."""
+        df = pd.DataFrame(hubs)
+        if "kind" not in df.columns:
+            df["kind"] = "hub"
+        return cls(df[HUB_COLUMNS])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def record(self, pos: int) -> dict:
+        """The hub at `pos` as a {"name", "lat", "lon", "kind"} dict."""
+        return {"name": str(self.names[pos]), "lat": float(self.lats[pos]),
+                "lon": float(self.lons[pos]), "kind": str(self.kinds[pos])}
+
+    def nearest(self, lat: float, lon: float, k: int = 5) -> list:
+        """The `k` hubs closest to (lat, lon) as dicts, nearest first."""
+        _, positions = self.index.query_knn(lat, lon, k=k)
+        return [self.record(p) for p in positions[0]]
+
+
+def _file_key(path: str) -> str:
+    """Cache key: the source path plus its size and modification time."""
+    stat = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=4)
+def _cached_catalog(path: str, key: str, cache_dir: str) -> HubCatalog:
+    cache_path = os.path.join(cache_dir, f"hub_catalog_{key}.joblib")
+    if os.path.exists(cache_path):
+        try:
+            return joblib.load(cache_path)
+        except Exception:
+            pass  # stale or unreadable cache: rebuild below
+
+    catalog = HubCatalog(read_hub_file(path))
+    os.makedirs(cache_dir, exist_ok=True)
+    joblib.dump(catalog, cache_path)
+    return catalog
+
+
+def load_hub_catalog(path: str = HUB_CATALOG_PATH, cache_dir: str = CACHE_DIR) -> HubCatalog:
+    """
+    Load a hub catalog and its spatial index.
+
+    The built catalog is pickled to `cache_dir` (keyed by the file's path,
+    size and mtime) and memoized in-process, so the index is only rebuilt
+    when the source file changes.
+    """
+    path = os.path.abspath(path)
+    return _cached_catalog(path, _file_key(path), os.path.abspath(cache_dir))
+
+
+def clear_catalog_cache() -> None:
+    """Drop the in-process catalogs; the next load reads the on-disk cache."""
+    _cached_catalog.cache_clear()
@@ -0,0 +1,130 @@
+"""
+inference.py
+------------
+Low-overhead inference for the fitted scikit-learn pipelines saved by the
+models (StandardScaler + estimator).
+
+The pipeline is unpacked once: scaler statistics are applied in plain NumPy,
+linear models are reduced to a single dot product with the scaler folded into
+the weights, and other estimators are called directly on validated NumPy
+arrays — no one-row DataFrames, no per-call pipeline / feature-name checks.
+"""
+
+import copy
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression, LogisticRegression, Ridge, SGDClassifier
+from sklearn.pipeline import Pipeline
+
+
+def features_to_array(X, feature_names: list) -> np.ndarray:
+    """
+    Validate input and return a float (n, len(feature_names)) array.
+
+    Accepts a dict for one request, a mapping of columns, a DataFrame, or
+    an array / nested sequence already in `feature_names` order.
+    """
+    if isinstance(X, pd.DataFrame):
+        missing = set(feature_names) - set(X.columns)
+        if missing:
+            raise KeyError(f"missing features: {sorted(missing)}")
+        arr = X[feature_names].to_numpy(dtype=float)
+    elif isinstance(X, Mapping):
+        missing = set(feature_names) - set(X)
+        if missing:
+            raise KeyError(f"missing features: {sorted(missing)}")
+        arr = np.column_stack([np.atleast_1d(np.asarray(X[f], dtype=float))
+                               for f in feature_names])
+    else:
+        arr = np.asarray(X, dtype=float)
+        if arr.ndim == 1:
+            arr = arr[None, :]
+    if arr.ndim != 2 or arr.shape[1] != len(feature_names):
+        raise ValueError(f"expected {len(feature_names)} features "
+                         f"({list(feature_names)}), got shape {arr.shape}")
+    if not np.isfinite(arr).all():
+        raise ValueError("features contain NaN or infinite values")
+    return arr
+
+
+class PipelineScorer:
+    """
+    Fast scorer for a fitted `[scaler →] estimator` pipeline.
+
+    Args:
+        pipeline:      Fitted Pipeline (or bare estimator).
+        feature_names: Feature order callers use. Must contain the same
+                       columns the pipeline was trained on (any order).
+        n_jobs:        Override the estimator's n_jobs; 1 avoids thread-pool
+                       start-up cost on small requests.
+    """
+
+    def __init__(self, pipeline, feature_names: list, n_jobs: int = 1):
+        self.pipeline = pipeline
+        self.feature_names = list(feature_names)
+        steps = pipeline.steps if isinstance(pipeline, Pipeline) else [("clf", pipeline)]
+        self.estimator = steps[-1][1]
+        if n_jobs is not None and hasattr(self.estimator, "n_jobs"):
+            # Shallow copy: shares the fitted trees but leaves the pipeline untouched
+            self.estimator = copy.copy(self.estimator)
+            self.estimator.n_jobs = n_jobs
+
+        # Map caller feature order → training order
+        trained = list(getattr(pipeline, "feature_names_in_", self.feature_names))
+        if sorted(trained) != sorted(self.feature_names):
+            raise ValueError(f"pipeline was trained on {trained}, not {self.feature_names}")
+        self._order = np.array([self.feature_names.index(f) for f in trained])
+
+        n = len(trained)
+        self._mean, self._scale = np.zeros(n), np.ones(n)
+        for _, step in steps[:-1]:
+            if not (hasattr(step, "mean_") and hasattr(step, "scale_")):
+                raise TypeError(f"unsupported pipeline step: {type(step).__name__}")
+            mean = step.mean_ if step.with_mean else np.zeros(n)
+            scale = step.scale_ if step.with_std else np.ones(n)
+            # Compose successive standardizations
+            self._mean = self._mean + mean * self._scale
+            self._scale = self._scale * scale
+
+        self.is_classifier = hasattr(self.estimator, "predict_proba")
+        self._weights = None
+        est = self.estimator
+        is_logistic = isinstance(est, LogisticRegression) or (
+            isinstance(est, SGDClassifier) and est.loss == "log_loss")
+        if is_logistic and est.coef_.shape[0] == 1:
+            coef, intercept = est.coef_[0], est.intercept_[0]
+        elif isinstance(est, (LinearRegression, Ridge)) and np.ndim(est.coef_) == 1:
+            coef, intercept = est.coef_, est.intercept_
+        else:
+            coef = None
+        if coef is not None:
+            # Fold the scaler into the weights: w·(x - m)/s + b = (w/s)·x + (b - w·m/s)
+            self._weights = coef / self._scale
+            self._bias = float(intercept - np.dot(coef, self._mean / self._scale))
+
+    def as_array(self, X) -> np.ndarray:
+        """Validated (n, n_features) float array in the pipeline's training order."""
+        return features_to_array(X, self.feature_names)[:, self._order]
+
+    def transform(self, X) -> np.ndarray:
+        """Scaled feature matrix, as the pipeline's estimator sees it."""
+        return (self.as_array(X) - self._mean) / self._scale
+
+    def score(self, X) -> np.ndarray:
+        """
+        Positive-class probability (classifiers) or prediction (regressors)
+        for each row of X.
+        """
+        if self._weights is not None:
+            z = self.as_array(X) @ self._weights + self._bias
+            return 1.0 / (1.0 + np.exp(-z)) if self.is_classifier else z
+        Xs = self.transform(X)
+        if self.is_classifier:
+            return self.estimator.predict_proba(Xs)[:, 1]
+        return self.estimator.predict(Xs)
+
+    def score_one(self, features) -> float:
+        """Score a single request (dict or sequence of feature values)."""
+        return float(self.score(features)[0])
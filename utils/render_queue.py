@@ -0,0 +1,180 @@
+"""
+render_queue.py
+---------------
+Deferred, parallel rendering of maps and plots.
+
+Models submit render jobs (a module-level plotting function, its output path
+and arguments) instead of drawing inline. On flush the queue applies a render
+policy, skips jobs whose inputs hash to what already produced the file on
+disk, and runs the rest in a process pool — optionally without waiting, so
+rendering happens off the critical path.
+
+Policies:
+  • "all"   — render every job
+  • "top_n" — render only the `top_n` highest-priority jobs (or job groups,
+              e.g. the PNG and HTML map of one carpool group)
+  • "none"  — render nothing
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), "..", "outputs", "cache",
+                             "render_manifest.json")
+RENDER_POLICIES = ("all", "top_n", "none")
+
+
+def _digest(obj, h) -> None:
+    """Feed a stable fingerprint of `obj` into hash object `h`."""
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr(list(obj.columns)).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            _digest(item, h)
+    elif isinstance(obj, dict):
+        for key in sorted(obj, key=str):
+            h.update(str(key).encode())
+            _digest(obj[key], h)
+    else:
+        h.update(pickle.dumps(obj))
+
+
+def job_key(fn, args: tuple, kwargs: dict) -> str:
+    """Hash of a render job's function and inputs."""
+    h = hashlib.sha1(f"{fn.__module__}.{fn.__qualname__}".encode())
+    _digest(list(args), h)
+    _digest(kwargs, h)
+    return h.hexdigest()
+
+
+def _render(job) -> str:
+    """Worker: run one render job, writing to its output path."""
+    fn, path, args, kwargs = job
+    fn(*args, path=path, **kwargs)
+    return path
+
+
+class RenderQueue:
+    """
+    Collects render jobs and renders them according to a policy.
+
+    Render functions must be module-level (picklable) and accept a `path`
+    keyword argument naming the file they write.
+    """
+
+    def __init__(self, policy: str = "all", top_n: int = 3, max_workers: int = None,
+                 manifest_path: str = MANIFEST_PATH):
+        if policy not in RENDER_POLICIES:
+            raise ValueError(f"policy must be one of {RENDER_POLICIES}, got {policy!r}")
+        self.policy = policy
+        self.top_n = top_n
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.manifest_path = manifest_path
+        self.manifest = self._load_manifest()
+        self._jobs = []
+        self._pool = None
+        self._pending = []
+        self.stats = {"rendered": 0, "cached": 0, "skipped": 0}
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self) -> None:
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        with open(self.manifest_path, "w") as f:
+            json.dump(self.manifest, f, indent=1)
+
+    def submit(self, fn, path: str, *args, priority: float = 0.0, group=None, **kwargs) -> None:
+        """
+        Queue `fn(*args, path=path, **kwargs)`.
+
+        Under "top_n", higher `priority` wins; jobs sharing a `group` key are
+        kept or dropped together and count once.
+        """
+        group = ("job", len(self._jobs)) if group is None else group
+        self._jobs.append((priority, group, fn, os.path.abspath(path), args, kwargs))
+
+    def flush(self, wait: bool = True) -> list:
+        """
+        Apply the policy and render queued jobs, skipping cached outputs.
+
+        Args:
+            wait: Block until rendering finishes; with False, call wait()
+                  (or leave the `with` block) later.
+
+        Returns:
+            Output paths whose render was started.
+        """
+        jobs, self._jobs = self._jobs, []
+        if self.policy == "none":
+            self.stats["skipped"] += len(jobs)
+            return []
+        if self.policy == "top_n":
+            best = {}
+            for priority, group, *_ in jobs:
+                best[group] = max(priority, best.get(group, -np.inf))
+            keep = set(sorted(best, key=lambda g: -best[g])[:self.top_n])
+            kept = [j for j in jobs if j[1] in keep]
+            self.stats["skipped"] += len(jobs) - len(kept)
+            jobs = kept
+
+        todo = []
+        for _, _, fn, path, args, kwargs in jobs:
+            key = job_key(fn, args, kwargs)
+            if self.manifest.get(path) == key and os.path.exists(path):
+                self.stats["cached"] += 1
+                continue
+            todo.append(((fn, path, args, kwargs), key))
+
+        if self.max_workers > 1 and len(todo) > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._pending += [(self._pool.submit(_render, job), job[1], key) for job, key in todo]
+        else:
+            for job, key in todo:
+                _render(job)
+                self.manifest[job[1]] = key
+                self.stats["rendered"] += 1
+            if todo:
+                self._save_manifest()
+
+        if wait:
+            self.wait()
+        return [job[1] for job, _ in todo]
+
+    def wait(self) -> dict:
+        """Wait for background renders, record them in the manifest, and return stats."""
+        for future, path, key in self._pending:
+            future.result()
+            self.manifest[path] = key
+            self.stats["rendered"] += 1
+        if self._pending:
+            self._save_manifest()
+        self._pending = []
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        return self.stats
+
+    def __enter__(self) -> "RenderQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush(wait=True)
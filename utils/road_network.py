@@ -0,0 +1,231 @@
+"""
+road_network.py
+---------------
+Offline road-network travel times for meeting-point scoring.
+
+A road graph is loaded from a local GraphML file (e.g. one saved earlier with
+osmnx.save_graphml — no network access needed) into a sparse CSR matrix.
+Shortest travel times *to* every hub are then precomputed once with Dijkstra
+on the reversed graph and stored as a float32 (n_hubs × n_nodes) .npy matrix,
+which is memory-mapped at query time: scoring a hub for a user is a single
+array lookup instead of a path search.
+
+Edge weights: `travel_time` (seconds) when present, otherwise
+`length` (meters) at the edge's `speed_kph` (or DEFAULT_SPEED_KPH).
+"""
+
+import hashlib
+import json
+import os
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+
+import joblib
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from utils.spatial_index import SpatialIndex
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "outputs", "cache")
+DEFAULT_SPEED_KPH = 25.0   # typical Delhi urban driving speed
+GRAPHML_NS = "{http://graphml.graphdrawing.org/xmlns}"
+
+
+def _graphml_float(value, default=np.nan) -> float:
+    """Parse a GraphML attribute; osmnx may store lists like '[30, 40]'."""
+    if value is None:
+        return default
+    value = value.strip()
+    if value.startswith("["):
+        parts = [p for p in value.strip("[]").replace("'", "").split(",") if p.strip()]
+        return float(np.mean([float(p) for p in parts])) if parts else default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def read_graphml(path: str) -> tuple:
+    """
+    Parse nodes and edges from a GraphML file.
+
+    Returns:
+        (node_ids, node_lats, node_lons, src, dst, weight_s, directed) where
+        src/dst are positions into the node arrays and weight_s is travel
+        time in seconds.
+    """
+    root = ET.parse(path).getroot()
+    keys = {k.get("id"): k.get("attr.name") for k in root.iter(f"{GRAPHML_NS}key")}
+    graph = root.find(f"{GRAPHML_NS}graph")
+    directed = graph.get("edgedefault", "directed") == "directed"
+
+    def attrs(elem) -> dict:
+        return {keys.get(d.get("key"), d.get("key")): d.text for d in elem.findall(f"{GRAPHML_NS}data")}
+
+    node_ids, lats, lons = [], [], []
+    for node in graph.iter(f"{GRAPHML_NS}node"):
+        a = attrs(node)
+        node_ids.append(node.get("id"))
+        lats.append(_graphml_float(a.get("y", a.get("lat"))))
+        lons.append(_graphml_float(a.get("x", a.get("lon"))))
+    position = {nid: i for i, nid in enumerate(node_ids)}
+
+    src, dst, weight = [], [], []
+    for edge in graph.iter(f"{GRAPHML_NS}edge"):
+        a = attrs(edge)
+        seconds = _graphml_float(a.get("travel_time"))
+        if np.isnan(seconds):
+            speed = _graphml_float(a.get("speed_kph"), DEFAULT_SPEED_KPH)
+            seconds = _graphml_float(a.get("length"), 0.0) / 1000.0 / speed * 3600.0
+        src.append(position[edge.get("source")])
+        dst.append(position[edge.get("target")])
+        weight.append(seconds)
+
+    return (np.array(node_ids), np.array(lats), np.array(lons),
+            np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64),
+            np.array(weight, dtype=float), directed)
+
+
+class RoadNetwork:
+    """
+    Road graph as a CSR matrix of travel times (seconds) plus a node index
+    used to snap coordinates to their nearest graph node.
+    """
+
+    def __init__(self, node_ids, node_lats, node_lons, src, dst, weight_s, directed=True):
+        self.node_ids = np.asarray(node_ids)
+        self.node_lats = np.asarray(node_lats, dtype=float)
+        self.node_lons = np.asarray(node_lons, dtype=float)
+        if not directed:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+            weight_s = np.concatenate([weight_s, weight_s])
+
+        # Parallel edges (osmnx MultiDiGraphs): keep the fastest one. Zero
+        # weights are nudged up because CSR would drop them as missing edges.
+        order = np.lexsort((weight_s, dst, src))
+        src, dst, weight_s = src[order], dst[order], weight_s[order]
+        first = np.ones(len(src), dtype=bool)
+        first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+        n = len(self.node_ids)
+        self.graph = csr_matrix((np.maximum(weight_s[first], 1e-3), (src[first], dst[first])),
+                                shape=(n, n))
+        self.node_index = SpatialIndex(self.node_lats, self.node_lons, ids=self.node_ids)
+
+    @classmethod
+    def from_graphml(cls, path: str) -> "RoadNetwork":
+        """Load a road network from a local GraphML file."""
+        return cls(*read_graphml(path))
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def snap(self, lats, lons) -> tuple:
+        """
+        Nearest graph node for each coordinate.
+
+        Returns:
+            (node_positions, snap_dist_km)
+        """
+        dist_km, pos = self.node_index.query_knn(lats, lons, k=1)
+        return pos[:, 0], dist_km[:, 0]
+
+
+def precompute_hub_travel_times(network: RoadNetwork, hub_lats, hub_lons, out_dir: str,
+                                chunk_hubs: int = 64) -> str:
+    """
+    Travel time (seconds) from every graph node to every hub, written to
+    `out_dir/travel_times.npy` as a float32 (n_hubs × n_nodes) matrix.
+
+    Dijkstra runs on the reversed graph from `chunk_hubs` hubs at a time, and
+    rows are streamed into a memory-mapped file, so peak memory stays at
+    chunk_hubs × n_nodes however many hubs there are. Unreachable entries are inf.
+
+    Returns:
+        out_dir
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    hub_nodes, snap_km = network.snap(hub_lats, hub_lons)
+    reverse = network.graph.T.tocsr()
+
+    matrix = np.lib.format.open_memmap(os.path.join(out_dir, "travel_times.npy"), mode="w+",
+                                       dtype=np.float32, shape=(len(hub_nodes), len(network)))
+    for start in range(0, len(hub_nodes), chunk_hubs):
+        chunk = hub_nodes[start:start + chunk_hubs]
+        matrix[start:start + len(chunk)] = dijkstra(reverse, directed=True, indices=chunk)
+    matrix.flush()
+    del matrix
+
+    np.save(os.path.join(out_dir, "hub_nodes.npy"), hub_nodes)
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump({"n_hubs": int(len(hub_nodes)), "n_nodes": int(len(network)),
+                   "max_hub_snap_km": float(snap_km.max()) if len(snap_km) else 0.0}, f)
+    return out_dir
+
+
+class HubTravelTimes:
+    """
+    Memory-mapped hub travel-time matrix with O(1) lookups.
+
+    Rows follow the hub order used at precompute time (e.g. a HubCatalog's
+    positions); columns are road-network nodes.
+    """
+
+    def __init__(self, network: RoadNetwork, out_dir: str):
+        self.network = network
+        self.matrix = np.load(os.path.join(out_dir, "travel_times.npy"), mmap_mode="r")
+        self.hub_nodes = np.load(os.path.join(out_dir, "hub_nodes.npy"))
+        if self.matrix.shape[1] != len(network):
+            raise ValueError("travel-time matrix was computed for a different road network")
+
+    def minutes_to_hubs(self, hub_positions, lats, lons) -> np.ndarray:
+        """
+        Travel time in minutes from each (lat, lon) to each hub.
+
+        Returns:
+            Array of shape (len(hub_positions), len(lats)).
+        """
+        nodes, _ = self.network.snap(lats, lons)
+        hub_positions = np.asarray(hub_positions)
+        return self.matrix[hub_positions[:, None], nodes[None, :]].astype(float) / 60.0
+
+
+@lru_cache(maxsize=2)
+def _cached_network(path: str, mtime_ns: int, cache_dir: str) -> RoadNetwork:
+    cache_path = os.path.join(cache_dir, f"road_network_{_key(path, mtime_ns)}.joblib")
+    if os.path.exists(cache_path):
+        try:
+            return joblib.load(cache_path)
+        except Exception:
+            pass  # stale or unreadable cache: rebuild below
+    network = RoadNetwork.from_graphml(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    joblib.dump(network, cache_path)
+    return network
+
+
+def _key(*parts) -> str:
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:16]
+
+
+def load_road_network(path: str, cache_dir: str = CACHE_DIR) -> RoadNetwork:
+    """Load a GraphML road network, parsed once and cached on disk / in-process."""
+    path = os.path.abspath(path)
+    return _cached_network(path, os.stat(path).st_mtime_ns, os.path.abspath(cache_dir))
+
+
+def load_hub_travel_times(graphml_path: str, hub_lats, hub_lons,
+                          cache_dir: str = CACHE_DIR) -> HubTravelTimes:
+    """
+    Travel-time lookups for the given hubs on a local road graph, computing
+    the matrix on first use and reusing it from `cache_dir` afterwards (keyed
+    by the graph file and the hub coordinates).
+    """
+    network = load_road_network(graphml_path, cache_dir)
+    hubs = np.column_stack([np.asarray(hub_lats, dtype=float), np.asarray(hub_lons, dtype=float)])
+    out_dir = os.path.join(os.path.abspath(cache_dir), "travel_times_" + _key(
+        os.path.abspath(graphml_path), os.stat(graphml_path).st_mtime_ns,
+        hashlib.sha1(hubs.tobytes()).hexdigest()))
+    if not os.path.exists(os.path.join(out_dir, "meta.json")):
+        precompute_hub_travel_times(network, hubs[:, 0], hubs[:, 1], out_dir)
+    return HubTravelTimes(network, out_dir)
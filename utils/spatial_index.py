@@ -0,0 +1,148 @@
+"""
+spatial_index.py
+----------------
+Ball-tree spatial index over (lat, lon) points using the Haversine metric.
+Built once from commuter home / office coordinates (or transit hubs) and then
+answers radius and k-nearest-neighbour queries in bulk, so looking up who
+lives near a user no longer requires re-clustering or an all-pairs scan.
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+from utils.feature_store import load_frame
+from utils.geo_utils import EARTH_RADIUS_KM
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "dummy_commute_data.csv")
+
+
+def _to_radians(lats, lons) -> np.ndarray:
+    """Stack latitude/longitude arrays (degrees) into an (N, 2) radian matrix."""
+    return np.radians(np.column_stack([np.atleast_1d(lats), np.atleast_1d(lons)]).astype(float))
+
+
+class SpatialIndex:
+    """
+    Haversine ball tree over a fixed set of points.
+
+    Positions returned by queries index into `lats`, `lons` and `ids`.
+    All distances are in kilometers.
+    """
+
+    def __init__(self, lats, lons, ids=None, leaf_size: int = 40):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.ids = np.asarray(ids) if ids is not None else np.arange(len(self.lats))
+        self._tree = BallTree(_to_radians(self.lats, self.lons),
+                              leaf_size=leaf_size, metric="haversine")
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, lat_col: str, lon_col: str,
+                   id_col: str = "user_id", **kwargs) -> "SpatialIndex":
+        """Build an index from two coordinate columns of a DataFrame."""
+        ids = df[id_col].to_numpy() if id_col in df.columns else None
+        return cls(df[lat_col].to_numpy(), df[lon_col].to_numpy(), ids=ids, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def query_radius(self, lats, lons, radius_km: float,
+                     return_distance: bool = False, sort_results: bool = False):
+        """
+        Find all indexed points within `radius_km` of each query point.
+
+        Args:
+            lats, lons:      Query coordinates (scalars or arrays, decimal degrees).
+            radius_km:       Search radius in kilometers.
+            return_distance: Also return the distances (km) of each hit.
+            sort_results:    Sort each hit list by distance (requires return_distance).
+
+        Returns:
+            Object array of position arrays, one per query point
+            (plus a matching array of distance arrays if return_distance).
+        """
+        result = self._tree.query_radius(
+            _to_radians(lats, lons), r=radius_km / EARTH_RADIUS_KM,
+            return_distance=return_distance, sort_results=sort_results
+        )
+        if not return_distance:
+            return result
+        positions, dists = result
+        dist_km = np.empty(len(dists), dtype=object)  # stays 1-D even when hit counts match
+        for i, d in enumerate(dists):
+            dist_km[i] = d * EARTH_RADIUS_KM
+        return positions, dist_km
+
+    def query_radius_flat(self, lats, lons, radius_km: float):
+        """
+        Radius query returning flat arrays instead of per-query lists.
+
+        Returns:
+            (query_pos, index_pos, dist_km) — one entry per (query, hit) pair.
+        """
+        positions, dists = self._tree.query_radius(
+            _to_radians(lats, lons), r=radius_km / EARTH_RADIUS_KM, return_distance=True
+        )
+        counts = np.fromiter((len(p) for p in positions), dtype=np.int64, count=len(positions))
+        if counts.sum() == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        query_pos = np.repeat(np.arange(len(positions)), counts)
+        return (query_pos, np.concatenate(positions).astype(np.int64),
+                np.concatenate(dists) * EARTH_RADIUS_KM)
+
+    def query_knn(self, lats, lons, k: int = 5):
+        """
+        Find the `k` nearest indexed points to each query point.
+
+        Returns:
+            (dist_km, positions), both of shape (n_queries, k), sorted by distance.
+        """
+        k = min(k, len(self))
+        dists, positions = self._tree.query(_to_radians(lats, lons), k=k)
+        return dists * EARTH_RADIUS_KM, positions
+
+    def query_pairs(self, radius_km: float):
+        """
+        All index pairs (i, j), i < j, whose points lie within `radius_km`.
+
+        Returns:
+            (i, j, dist_km) flat arrays.
+        """
+        i, j, dist = self.query_radius_flat(self.lats, self.lons, radius_km)
+        keep = i < j
+        return i[keep], j[keep], dist[keep]
+
+
+def build_commuter_indexes(df: pd.DataFrame) -> dict:
+    """
+    Build home and office spatial indexes for a commuter DataFrame.
+
+    Returns:
+        {"home": SpatialIndex, "office": SpatialIndex}
+    """
+    return {
+        "home":   SpatialIndex.from_frame(df, "home_lat", "home_lon"),
+        "office": SpatialIndex.from_frame(df, "office_lat", "office_lon"),
+    }
+
+
+@lru_cache(maxsize=4)
+def _cached_commuter_indexes(path: str, mtime: float):
+    df = load_frame(path)
+    return df, build_commuter_indexes(df)
+
+
+def load_commuter_indexes(path: str = DATA_PATH):
+    """
+    Load the commuter dataset and its home/office indexes, building them once
+    per process (rebuilt automatically if the CSV changes on disk).
+
+    Returns:
+        (df, {"home": SpatialIndex, "office": SpatialIndex})
+    """
+    path = os.path.abspath(path)
+    return _cached_commuter_indexes(path, os.path.getmtime(path))
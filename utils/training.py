@@ -0,0 +1,86 @@
+"""
+training.py
+-----------
+Fits a dict of candidate pipelines concurrently and computes each model's
+test-set predictions exactly once, for reuse by reports, plots and best-model
+selection.
+
+Cores are budgeted across models: with `w` models fitting at once on a budget
+of `c` cores, every estimator's n_jobs (and its BLAS / OpenMP pools) is capped
+at c // w, so RF / XGBoost `n_jobs=-1` inside a parallel comparison does not
+oversubscribe the machine. The original n_jobs values are restored on the
+returned models.
+"""
+
+import time
+
+import joblib
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+
+
+def core_budget(n_jobs: int = -1) -> int:
+    """Cores to use, resolving joblib-style negative values (-1 = all cores)."""
+    n_cpus = joblib.cpu_count()
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, n_cpus + 1 + n_jobs)
+    return min(n_jobs, n_cpus)
+
+
+def _n_jobs_params(model) -> dict:
+    """Every (nested) n_jobs parameter explicitly set on an estimator / pipeline."""
+    return {k: v for k, v in model.get_params(deep=True).items()
+            if k.endswith("n_jobs") and v is not None}
+
+
+def fit_and_predict(model, X_train, y_train, X_test, threads: int = 1) -> dict:
+    """
+    Fit one model with at most `threads` cores and predict the test set.
+
+    Returns:
+        Dict with model (fitted), y_pred, y_score (positive-class probability
+        or decision value for classifiers, else None) and fit_seconds.
+    """
+    original = _n_jobs_params(model)
+    model.set_params(**{k: threads for k in original})
+    with threadpool_limits(limits=threads):
+        t0 = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - t0
+        y_pred = model.predict(X_test)
+        if hasattr(model, "predict_proba"):
+            y_score = model.predict_proba(X_test)[:, 1]
+        elif hasattr(model, "decision_function"):
+            y_score = model.decision_function(X_test)
+        else:
+            y_score = None
+    model.set_params(**original)
+    return {"model": model, "y_pred": y_pred, "y_score": y_score, "fit_seconds": fit_seconds}
+
+
+def train_candidates(models: dict, X_train, y_train, X_test, n_jobs: int = -1,
+                     max_workers: int = None) -> dict:
+    """
+    Fit every candidate concurrently within a core budget.
+
+    Args:
+        models:      Dict of name → unfitted estimator / pipeline.
+        n_jobs:      Total core budget (joblib convention, -1 = all cores).
+        max_workers: Models fitted at once (default: one per core, up to
+                     the number of models).
+
+    Returns:
+        Dict of name → fit_and_predict() result, in the order of `models`.
+    """
+    budget = core_budget(n_jobs)
+    workers = max(1, min(max_workers or budget, len(models), budget))
+    threads = max(1, budget // workers)
+    if workers == 1:
+        fits = [fit_and_predict(m, X_train, y_train, X_test, threads) for m in models.values()]
+    else:
+        fits = Parallel(n_jobs=workers, backend="loky")(
+            delayed(fit_and_predict)(m, X_train, y_train, X_test, threads) for m in models.values()
+        )
+    return dict(zip(models, fits))
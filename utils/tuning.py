@@ -0,0 +1,166 @@
+"""
+tuning.py
+---------
+Hyperparameter search with on-disk caching of cross-validation results.
+
+A search is keyed by a fingerprint of the training data, the estimator's
+parameters, the search space and the search settings. Re-running with the same
+inputs loads the stored CV results instead of refitting anything; changing
+the data or the grid triggers a fresh search.
+
+Methods:
+  • "halving" — successive halving over the grid (sklearn's
+                HalvingGridSearchCV): every config starts on a small sample,
+                only the best third advance to 3× more data
+  • "random"  — randomized search that stops after `patience` consecutive
+                samples fail to beat the best mean CV score by `min_delta`
+  • "grid"    — exhaustive GridSearchCV
+
+Only the best parameters and CV table are returned; the caller applies them
+with set_params() and fits the final model once, on the full training set.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import (
+    GridSearchCV, HalvingGridSearchCV, ParameterGrid, ParameterSampler, StratifiedKFold, cross_validate
+)
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "outputs", "cache", "tuning")
+SEARCH_METHODS = ("halving", "random", "grid")
+
+
+def data_fingerprint(X, y) -> str:
+    """Content hash of a feature matrix and target (column names, dtypes, values, index)."""
+    h = hashlib.sha1()
+    for obj in (X, y):
+        if isinstance(obj, (pd.DataFrame, pd.Series)):
+            cols = list(obj.columns) if isinstance(obj, pd.DataFrame) else [obj.name]
+            h.update(repr(cols).encode())
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        else:
+            arr = np.ascontiguousarray(obj)
+            h.update(f"{arr.dtype}{arr.shape}".encode())
+            h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def search_key(estimator, param_space: dict, X, y, **settings) -> str:
+    """Cache key for one search: data, estimator params, search space and settings."""
+    params = {k: v for k, v in estimator.get_params(deep=True).items()
+              if not hasattr(v, "get_params") and not k.endswith("n_jobs")}
+    payload = {
+        "estimator": type(estimator).__name__,
+        "params": repr(sorted(params.items())),
+        "space": repr(sorted(param_space.items())),
+        "settings": repr(sorted(settings.items())),
+        "data": data_fingerprint(X, y),
+        "sklearn": sklearn.__version__,
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _with_n_jobs(estimator, n_jobs: int):
+    """Clone with every nested n_jobs set — the search parallelizes instead."""
+    est = clone(estimator)
+    est.set_params(**{k: n_jobs for k in est.get_params(deep=True) if k.endswith("n_jobs")})
+    return est
+
+
+def _random_search(estimator, param_space: dict, X, y, cv, scoring: str, n_iter: int,
+                   patience: int, min_delta: float, random_state: int, n_jobs: int) -> tuple:
+    """Randomized search with early stopping; returns (cv_results DataFrame, best_params)."""
+    if all(isinstance(v, (list, tuple)) for v in param_space.values()):
+        n_iter = min(n_iter, len(ParameterGrid(param_space)))
+    rows, best, since_best = [], -np.inf, 0
+    for params in ParameterSampler(param_space, n_iter=n_iter, random_state=random_state):
+        est = clone(estimator).set_params(**params)
+        scores = cross_validate(est, X, y, cv=cv, scoring=scoring, n_jobs=n_jobs)["test_score"]
+        rows.append({"params": params, "mean_test_score": scores.mean(),
+                     "std_test_score": scores.std()})
+        if scores.mean() > best + min_delta:
+            best, since_best = scores.mean(), 0
+        else:
+            since_best += 1
+            if since_best >= patience:
+                break
+    results = pd.DataFrame(rows)
+    results["rank_test_score"] = results["mean_test_score"].rank(ascending=False, method="min").astype(int)
+    return results, results.loc[results["mean_test_score"].idxmax(), "params"]
+
+
+def tune(estimator, param_space: dict, X, y, method: str = "halving", cv: int = 3,
+         scoring: str = "roc_auc", n_iter: int = 20, patience: int = 5,
+         min_delta: float = 1e-3, random_state: int = 42, n_jobs: int = -1,
+         cache_dir: str = CACHE_DIR) -> dict:
+    """
+    Search `param_space` for `estimator`, reusing cached CV results when the
+    data, estimator and search settings are unchanged.
+
+    Args:
+        estimator:   Unfitted estimator or Pipeline (parameters may use the
+                     `step__param` form).
+        param_space: Dict of parameter name → list of candidate values.
+        method:      "halving", "random" or "grid" (see module docstring).
+        cv:          Number of stratified folds.
+        n_iter:      Max configs sampled by "random".
+        patience:    "random" stops after this many non-improving configs.
+        n_jobs:      Workers for fitting candidates / folds in parallel; the
+                     estimator's own n_jobs is forced to 1 during the search.
+        cache_dir:   Where results are stored; None disables caching.
+
+    Returns:
+        Dict with best_params, best_score, cv_results (DataFrame), n_candidates,
+        seconds (search time, 0 on a cache hit) and cached (bool).
+    """
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"method must be one of {SEARCH_METHODS}, got {method!r}")
+    settings = {"method": method, "cv": cv, "scoring": scoring, "random_state": random_state}
+    if method == "random":
+        settings.update(n_iter=n_iter, patience=patience, min_delta=min_delta)
+    cache_path = None
+    if cache_dir:
+        key = search_key(estimator, param_space, X, y, **settings)
+        cache_path = os.path.join(cache_dir, f"{key}.joblib")
+        if os.path.exists(cache_path):
+            return {**joblib.load(cache_path), "seconds": 0.0, "cached": True}
+
+    t0 = time.perf_counter()
+    est = _with_n_jobs(estimator, 1)
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    if method == "random":
+        cv_results, best_params = _random_search(est, param_space, X, y, folds, scoring, n_iter,
+                                                 patience, min_delta, random_state, n_jobs)
+        best_score = cv_results["mean_test_score"].max()
+    else:
+        if method == "halving":
+            search = HalvingGridSearchCV(est, param_space, cv=folds, scoring=scoring, factor=3,
+                                         random_state=random_state, n_jobs=n_jobs)
+        else:
+            search = GridSearchCV(est, param_space, cv=folds, scoring=scoring, n_jobs=n_jobs)
+        search.fit(X, y)
+        cv_results = pd.DataFrame(search.cv_results_)
+        best_params, best_score = search.best_params_, search.best_score_
+    cv_results = cv_results[[c for c in cv_results.columns
+                             if c in ("params", "iter", "n_resources", "mean_test_score",
+                                      "std_test_score", "rank_test_score")]]
+
+    result = {
+        "best_params": dict(best_params),
+        "best_score": float(best_score),
+        "cv_results": cv_results.reset_index(drop=True),
+        "n_candidates": int(cv_results["params"].map(repr).nunique()),
+    }
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        joblib.dump(result, cache_path)
+    return {**result, "seconds": time.perf_counter() - t0, "cached": False}